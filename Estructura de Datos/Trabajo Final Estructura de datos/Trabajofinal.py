@@ -7,49 +7,164 @@ Funciones principales:
 - RegistrarUsuario()
 - VerificarContrasena()
 - GenerarAlertas()
-- Autenticación básica y almacenamiento en users.json con hash PBKDF2 (no se guarda la contraseña en texto plano).
+- Autenticación básica y almacenamiento con hash PBKDF2 (no se guarda la contraseña en texto plano).
+  Los usuarios se guardan en users.log (almacén indexado de solo-anexado, ver
+  almacen_usuarios.py); un users.json antiguo se migra automáticamente la primera vez.
+- Sin argumentos abre el menú interactivo; con un subcomando
+  (`python Trabajofinal.py auth < pares.jsonl`, ver linea_comandos.py) procesa
+  las operaciones por lotes sin preguntar nada y escribe resultados JSONL.
+
+Arranque: importar el módulo solo carga lo que necesita cualquier acción. El
+analizador de fuerza (con la lista de bloqueo y el estimador de patrones),
+las sesiones, el pool de procesos y getpass se cargan la primera vez que se
+usan, y el almacén se abre una vez por proceso y se reutiliza.
 """
 
-import json
 import os
-import re
-import hashlib
-import secrets
-import getpass
-from typing import Dict, Tuple, List
+import hmac
+from itertools import repeat
+from typing import TYPE_CHECKING, Dict, Tuple, List, Iterable, Iterator, Optional
+
+from almacen_usuarios import UserStore, migrar_desde_json
+from kdf import cargar_parametros, derivar_clave
+from limitador import LimitadorIntentos
 
-USERS_FILE = "users.json"
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    from analizador_fuerza import AnalizadorFuerza
+    from sesiones import GestorSesiones
+
+USERS_FILE = "users.json"  # formato antiguo: solo se lee para migrar
+USERS_LOG = "users.log"
+USERS_LOG_FORMAT = "json"  # "json" o "binario" (más compacto; ver registro_binario.py)
+KDF_CONFIG_FILE = "kdf.json"  # generado con: python kdf.py --guardar kdf.json
+# Política KDF para hashes nuevos; los hashes con otros parámetros se
+# actualizan tras un login correcto.
+KDF_PARAMS = cargar_parametros(KDF_CONFIG_FILE)
+# Límite de intentos de login por usuario y por origen, comprobado antes del KDF.
+LIMITADOR = LimitadorIntentos()
+# Sesiones opcionales (IniciarSesion / ValidarSesion) para no repetir el KDF;
+# se crean en el primer uso (ver _get_sesiones).
+SESIONES: Optional["GestorSesiones"] = None
 COMMON_PASSWORDS = {
     # una lista corta de ejemplos; en un proyecto real ampliar esta lista
     "123456", "password", "12345678", "qwerty", "abc123", "111111", "123456789", "12345", "iloveyou"
 }
+# Lista grande de contraseñas filtradas (opcional), generada con:
+#   python lista_bloqueo.py wordlist.txt comunes.idx
+#   python filtro_bloom.py wordlist.txt comunes.bloom
+# Se abren con mmap en la primera consulta; el filtro de Bloom descarta la
+# mayoría de contraseñas y solo los posibles aciertos consultan el índice.
+# Si no existen, solo se usa COMMON_PASSWORDS.
+BLOCKLIST_FILE = "comunes.idx"
+BLOOM_FILE = "comunes.bloom"
+# Estimador de patrones (ver estimador_patrones.py): una contraseña que cumple
+# los criterios pero se adivina en menos de ~10^8 intentos no es fuerte. Solo
+# se consulta si la contraseña alcanza el umbral y sus extremos no descartan
+# ya que sea adivinable. Con False solo se cuentan clases y comunes (más rápido).
+ESTIMAR_PATRONES = True
+# Analizador de una sola pasada (ver analizador_fuerza.py), creado una vez
+# en la primera verificación (ver _get_analizador).
+_ANALIZADOR: Optional["AnalizadorFuerza"] = None
+
+def _get_analizador() -> "AnalizadorFuerza":
+    """Crea el analizador (y carga sus módulos) la primera vez que se verifica una contraseña."""
+    global _ANALIZADOR
+    if _ANALIZADOR is None:
+        from analizador_fuerza import AnalizadorFuerza
+        from estimador_patrones import estimador_por_defecto
+        from filtro_bloom import FiltroBloom
+        from lista_bloqueo import ListaBloqueo
+
+        _ANALIZADOR = AnalizadorFuerza(
+            mensajes={
+                "longitud": "La contraseña tiene menos de 12 caracteres.",
+                "mayuscula": "Falta letra mayúscula.",
+                "minuscula": "Falta letra minúscula.",
+                "digito": "Falta número.",
+                "especial": "Falta carácter especial (p. ej. !@#$).",
+                "comun": "La contraseña es demasiado común.",
+                "diccionario": "Contiene una palabra o contraseña muy conocida.",
+                "teclado": "Contiene un recorrido de teclado (p. ej. qwerty o asdf).",
+                "repeticion": "Contiene repeticiones (p. ej. aaa o abcabc).",
+                "secuencia": "Contiene una secuencia (p. ej. abc o 1234).",
+                "fecha": "Contiene una fecha o un año.",
+                "adivinable": "Es fácil de adivinar: alárgala o hazla menos predecible.",
+            },
+            longitud_minima=12,
+            comunes=COMMON_PASSWORDS,
+            lista_bloqueo=ListaBloqueo(BLOCKLIST_FILE, filtro=FiltroBloom(BLOOM_FILE)),
+            umbral=4,  # criterio configurable
+            estimador=estimador_por_defecto() if ESTIMAR_PATRONES else None,
+        )
+    return _ANALIZADOR
+
+def _get_sesiones() -> "GestorSesiones":
+    global SESIONES
+    if SESIONES is None:
+        from sesiones import GestorSesiones
+        SESIONES = GestorSesiones()
+    return SESIONES
 
 # ---------- Helpers para almacenamiento seguro ----------
+_store = None
+
+def _get_store() -> UserStore:
+    """Abre el almacén una vez por proceso (migrando users.json si hace falta)."""
+    global _store
+    if _store is None:
+        if not os.path.exists(USERS_LOG) and os.path.exists(USERS_FILE):
+            try:
+                migrar_desde_json(USERS_FILE, USERS_LOG, formato=USERS_LOG_FORMAT)
+            except FileExistsError:
+                pass  # otro proceso lo migró primero
+        _store = UserStore(USERS_LOG, formato=USERS_LOG_FORMAT)
+    return _store
+
 def _load_users() -> Dict[str, Dict]:
-    if not os.path.exists(USERS_FILE):
-        return {}
-    with open(USERS_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Devuelve el almacén (se usa como un dict; las lecturas son por clave)."""
+    return _get_store()
 
 def _save_users(users: Dict[str, Dict]) -> None:
-    with open(USERS_FILE, "w", encoding="utf-8") as f:
-        json.dump(users, f, indent=2)
+    store = _get_store()
+    if users is store:
+        # las altas ya se anexaron (con fsync) al escribir en el almacén
+        store.flush()
+    else:
+        store.replace_all(users)
 
-def _hash_password(password: str, salt: str = None) -> Tuple[str, str]:
+def _hash_password(password: str, salt: str = None, params: Dict = None) -> Tuple[str, str]:
     """
-    Devuelve (salt_hex, hash_hex). Usa PBKDF2-HMAC-SHA256.
+    Devuelve (salt_hex, hash_hex). Usa la política KDF_PARAMS
+    (por defecto PBKDF2-HMAC-SHA256) salvo que se indiquen otros `params`.
     """
     if salt is None:
+        import secrets
         salt = secrets.token_bytes(16)
     else:
         salt = bytes.fromhex(salt)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 200_000)
+    dk = derivar_clave(password, salt, params or KDF_PARAMS)
     return salt.hex(), dk.hex()
 
-def _verify_hash(password: str, salt_hex: str, hash_hex: str) -> bool:
-    salt = bytes.fromhex(salt_hex)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 200_000)
-    return dk.hex() == hash_hex
+def _verify_raw(password: str, salt: bytes, expected: bytes, params: Dict = None) -> bool:
+    """
+    Verifica contra salt/hash en bytes crudos con comparación de tiempo constante.
+    `params` son los parámetros KDF del registro (None = registro antiguo).
+    """
+    dk = derivar_clave(password, salt, params)
+    return hmac.compare_digest(dk, expected)
+
+def _verify_hash(password: str, salt_hex: str, hash_hex: str, params: Dict = None) -> bool:
+    return _verify_raw(password, bytes.fromhex(salt_hex), bytes.fromhex(hash_hex), params)
+
+def _needs_rehash(kdf: Optional[Dict]) -> bool:
+    """True si el hash se calculó con parámetros distintos de la política actual."""
+    return kdf != KDF_PARAMS
+
+def _update_hash(store: UserStore, username: str, salt_hex: str, hash_hex: str) -> None:
+    info = store[username]
+    info["salt"], info["hash"], info["kdf"] = salt_hex, hash_hex, dict(KDF_PARAMS)
+    store[username] = info
 
 # ---------- Funciones requeridas ----------
 def VerificarContrasena(password: str) -> Dict[str, object]:
@@ -67,92 +182,209 @@ def VerificarContrasena(password: str) -> Dict[str, object]:
       - Carácter especial
       - No estar en lista de comunes
     """
-    detalles: List[str] = []
-    puntuacion = 0
-
-    if len(password) >= 12:
-        puntuacion += 1
-    else:
-        detalles.append("La contraseña tiene menos de 12 caracteres.")
-
-    if re.search(r"[A-Z]", password):
-        puntuacion += 1
-    else:
-        detalles.append("Falta letra mayúscula.")
-
-    if re.search(r"[a-z]", password):
-        puntuacion += 1
-    else:
-        detalles.append("Falta letra minúscula.")
+    return _get_analizador().analizar(password)
 
-    if re.search(r"[0-9]", password):
-        puntuacion += 1
-    else:
-        detalles.append("Falta número.")
+def _texto_alerta(username: str, info: Dict) -> Optional[str]:
+    # no tenemos la contraseña en texto; asumimos que guardamos un marcador 'last_strength' si existe
+    # en este ejemplo, almacenamos 'evaluacion' al guardar. Si no existe, generamos alerta 'sin evaluación'.
+    evaluacion = info.get("evaluacion")
+    if evaluacion is None:
+        return f"[{username}] No se ha verificado la fortaleza de la contraseña."
+    if not evaluacion.get("fuerte", False):
+        detalles = evaluacion.get("detalles", [])
+        return f"[{username}] CONTRASEÑA DÉBIL. Razones: {', '.join(detalles)}"
+    return None
 
-    if re.search(r"[^\w\s]", password):  # carácter especial
-        puntuacion += 1
-    else:
-        detalles.append("Falta carácter especial (p. ej. !@#$).")
+def GenerarAlertas(users: Dict[str, Dict]) -> Iterator[str]:
+    """
+    Genera (como generador) las alertas de contraseñas débiles.
+    Con el almacén de usuarios solo se visitan las cuentas de su índice de
+    cuentas débiles, y el almacén guarda el texto de cada alerta hasta que
+    el registro cambie (UserStore.memo_debil). Con un dict normal se
+    recorren todos los usuarios.
+    """
+    for _, texto in _alertas(users):
+        yield texto
 
-    if password.lower() in COMMON_PASSWORDS:
-        detalles.append("La contraseña es demasiado común.")
-        # penaliza si es común: reduce puntuacion si es alta
-        if puntuacion > 0:
-            puntuacion -= 1
+def _alertas(users: Dict[str, Dict]) -> Iterator[Tuple[str, str]]:
+    """(usuario, texto de la alerta) de cada contraseña débil, como GenerarAlertas."""
+    if not isinstance(users, UserStore):
+        for username, info in users.items():
+            texto = _texto_alerta(username, info)
+            if texto is not None:
+                yield username, texto
+        return
 
-    fuerte = puntuacion >= 4  # criterio configurable
-    return {"fuerte": fuerte, "puntuacion": puntuacion, "detalles": detalles}
+    for username in users.usuarios_debiles():
+        texto = users.memo_debil(username, _texto_alerta)
+        if texto is not None:
+            yield username, texto
 
-def GenerarAlertas(users: Dict[str, Dict]) -> List[str]:
-    """
-    Recorre los usuarios y genera alertas para contraseñas débiles.
-    Devuelve una lista de mensajes de alerta.
-    """
-    alertas = []
-    for username, info in users.items():
-        # no tenemos la contraseña en texto; asumimos que guardamos un marcador 'last_strength' si existe
-        # en este ejemplo, almacenamos 'evaluacion' al guardar. Si no existe, generamos alerta 'sin evaluación'.
-        evaluacion = info.get("evaluacion")
-        if evaluacion is None:
-            alertas.append(f"[{username}] No se ha verificado la fortaleza de la contraseña.")
-        else:
-            if not evaluacion.get("fuerte", False):
-                detalles = evaluacion.get("detalles", [])
-                alertas.append(f"[{username}] CONTRASEÑA DÉBIL. Razones: {', '.join(detalles)}")
-    return alertas
+def _nuevo_registro(password: str, params: Dict = None) -> Dict:
+    """Registro de un usuario nuevo: salt+hash, parámetros KDF y evaluación de fuerza."""
+    params = params or KDF_PARAMS
+    salt_hex, hash_hex = _hash_password(password, params=params)
+    return {
+        "salt": salt_hex,
+        "hash": hash_hex,
+        "kdf": dict(params),
+        "evaluacion": VerificarContrasena(password)
+    }
 
 def RegistrarUsuario(username: str, password: str, confirm: bool = True) -> Tuple[bool, str]:
     """
     Registra un usuario (si no existe).
     - verifica fuerza con VerificarContrasena
-    - guarda salt+hash en users.json junto con evaluación de fuerza
+    - guarda salt+hash en el almacén de usuarios junto con evaluación de fuerza
     Devuelve (exito, mensaje)
     """
     users = _load_users()
     if username in users:
         return False, "El usuario ya existe."
 
-    ver = VerificarContrasena(password)
-    salt_hex, hash_hex = _hash_password(password)
-    users[username] = {
-        "salt": salt_hex,
-        "hash": hash_hex,
-        "evaluacion": ver
-    }
+    registro = _nuevo_registro(password)
+    if not users.add(username, registro):
+        # otro proceso lo registró mientras se calculaba el hash
+        return False, "El usuario ya existe."
     _save_users(users)
+    return True, _mensaje_registro(registro["evaluacion"])
+
+def _mensaje_registro(ver: Dict) -> str:
     if ver["fuerte"]:
-        return True, "Usuario registrado correctamente. Contraseña considerada FUERTE."
+        return "Usuario registrado correctamente. Contraseña considerada FUERTE."
     else:
-        return True, "Usuario registrado, pero la contraseña es DÉBIL. " + " ".join(ver["detalles"])
+        return "Usuario registrado, pero la contraseña es DÉBIL. " + " ".join(ver["detalles"])
 
 # ---------- Funciones adicionales útiles ----------
-def AutenticarUsuario(username: str, password: str) -> bool:
-    users = _load_users()
-    info = users.get(username)
-    if not info:
+def AutenticarUsuario(username: str, password: str, origen: Optional[str] = None) -> bool:
+    """
+    Verifica la contraseña. Si es correcta y el hash usa parámetros KDF
+    antiguos, lo recalcula con la política actual de forma transparente.
+    Los intentos que superan LIMITADOR (por usuario y por `origen`) se
+    rechazan sin calcular ningún hash.
+    """
+    if not LIMITADOR.permitir(username, origen):
         return False
-    return _verify_hash(password, info["salt"], info["hash"])
+    store = _get_store()
+    record = store.get_record(username)
+    if record is None:
+        return False
+    if not _verify_raw(password, record.salt, record.hash, record.kdf):
+        return False
+    LIMITADOR.exito(username)
+    if _needs_rehash(record.kdf):
+        _update_hash(store, username, *_hash_password(password))
+    return True
+
+def IniciarSesion(username: str, password: str, origen: Optional[str] = None) -> Optional[str]:
+    """
+    Autentica (con KDF) y, si es correcto, devuelve un token de sesión de
+    vida corta para ValidarSesion. Devuelve None si la autenticación falla.
+    """
+    if not AutenticarUsuario(username, password, origen):
+        return None
+    # tras un posible rehash: el token queda ligado al hash ya actualizado
+    record = _get_store().get_record(username)
+    if record is None:
+        return None  # el usuario se borró entre la autenticación y la emisión
+    return _get_sesiones().emitir(username, record.hash)
+
+def ValidarSesion(username: str, token: str) -> bool:
+    """
+    Comprueba un token de IniciarSesion sin calcular el KDF: solo un HMAC
+    contra el registro ya decodificado en memoria. Caduca con el TTL de
+    SESIONES y se invalida si el hash del usuario cambia.
+    """
+    record = _get_store().get_record(username)
+    if record is None:
+        return False
+    return _get_sesiones().validar(username, token, record.hash)
+
+def CerrarSesion(token: str) -> None:
+    _get_sesiones().cerrar(token)
+
+_pool = None
+_pool_workers = 0
+
+def _get_pool(workers: int) -> "ProcessPoolExecutor":
+    """Pool de procesos reutilizado entre lotes (se recrea si cambia el tamaño)."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown()
+        from concurrent.futures import ProcessPoolExecutor
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+def AutenticarUsuarios(pairs: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+                       origen: Optional[str] = None) -> List[bool]:
+    """
+    Autentica un lote de pares (usuario, contraseña).
+    - los pares repetidos se comprueban una sola vez
+    - aplica LIMITADOR (por usuario y por `origen`) antes de encolar ningún
+      KDF: solo se comprueban los pares que caben en las fichas disponibles,
+      y después solo los fallos gastan ficha (un acierto devuelve al usuario
+      su cupo), así que un lote legítimo no se bloquea a sí mismo; los pares
+      limitados cuentan como fallidos
+    - lee el almacén una sola vez por lote
+    - reparte el cálculo del KDF entre `workers` procesos (por defecto, todos los núcleos)
+    - actualiza, igual que AutenticarUsuario, los hashes con parámetros antiguos
+    Devuelve una lista de bool en el mismo orden que la entrada.
+    """
+    store = _get_store()
+    pairs = list(pairs)
+    posiciones: Dict[Tuple[str, str], List[int]] = {}  # par distinto -> posiciones en la entrada
+    for pos, (username, password) in enumerate(pairs):
+        posiciones.setdefault((username, password), []).append(pos)
+    resultados = [False] * len(pairs)
+    distintos = list(posiciones)
+    usernames: List[str] = []  # pares que requieren calcular el hash
+    passwords: List[str] = []
+    salts: List[bytes] = []
+    hashes: List[bytes] = []
+    kdfs: List[Optional[Dict]] = []
+    for (username, password), permitido in zip(distintos, LIMITADOR.permitidos((u for u, _ in distintos), origen)):
+        if not permitido:
+            continue
+        record = store.get_record(username)
+        if record is None:
+            LIMITADOR.fallo(username, origen)  # usuario inexistente: no se calcula el hash
+            continue
+        usernames.append(username)
+        passwords.append(password)
+        salts.append(record.salt)
+        hashes.append(record.hash)
+        kdfs.append(record.kdf)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    usar_pool = workers > 1 and len(passwords) > 1
+    if usar_pool:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        verificados = _get_pool(workers).map(_verify_raw, passwords, salts, hashes, kdfs, chunksize=chunksize)
+    else:
+        verificados = map(_verify_raw, passwords, salts, hashes, kdfs)
+
+    rehash: Dict[str, str] = {}  # usuario -> contraseña correcta con hash antiguo
+    for i, ok in enumerate(verificados):
+        if not ok:
+            LIMITADOR.fallo(usernames[i], origen)
+            continue
+        for pos in posiciones[usernames[i], passwords[i]]:
+            resultados[pos] = True
+        LIMITADOR.exito(usernames[i])
+        if _needs_rehash(kdfs[i]):
+            rehash[usernames[i]] = passwords[i]
+    if rehash:
+        nuevos_args = (list(rehash.values()), repeat(None), repeat(KDF_PARAMS))
+        if usar_pool and len(rehash) > 1:
+            nuevos = _get_pool(workers).map(_hash_password, *nuevos_args)
+        else:
+            nuevos = map(_hash_password, *nuevos_args)
+        for username, (salt_hex, hash_hex) in zip(rehash, nuevos):
+            _update_hash(store, username, salt_hex, hash_hex)
+    return resultados
 
 def listar_usuarios() -> List[str]:
     users = _load_users()
@@ -171,6 +403,7 @@ def menu():
     print("0) Salir")
 
 def main_loop():
+    import getpass
     while True:
         menu()
         opcion = input("Elige una opción: ").strip()
@@ -196,14 +429,14 @@ def main_loop():
                 for u in users:
                     print(" -", u)
         elif opcion == "4":
-            users = _load_users()
-            alertas = GenerarAlertas(users)
-            if not alertas:
+            hay_alertas = False
+            for a in GenerarAlertas(_load_users()):
+                if not hay_alertas:
+                    print("ALERTAS:")
+                    hay_alertas = True
+                print(a)
+            if not hay_alertas:
                 print("No hay alertas. Todas las contraseñas tienen evaluación o no hay usuarios.")
-            else:
-                print("ALERTAS:")
-                for a in alertas:
-                    print(a)
         elif opcion == "5":
             username = input("Usuario a consultar: ").strip()
             users = _load_users()
@@ -226,5 +459,12 @@ def evaluacion_get(evaluacion, key):
     """Pequeña función para evitar KeyError."""
     return evaluacion.get(key) if evaluacion else None
 
-if __name__ == "_main_":
- main_loop()    
\ No newline at end of file
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        # Con argumentos: línea de comandos no interactiva (ver linea_comandos.py).
+        # Se registra este módulo como Trabajofinal para no cargarlo dos veces.
+        sys.modules.setdefault("Trabajofinal", sys.modules[__name__])
+        from linea_comandos import main
+        sys.exit(main(sys.argv[1:]))
+    main_loop()
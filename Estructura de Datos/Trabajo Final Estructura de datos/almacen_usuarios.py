@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+"""
+Almacén de usuarios indexado y de solo-anexado (append-only).
+
+Sustituye la reescritura completa de users.json: cada alta o modificación
+se anexa como una línea JSON al registro (users.log) y un índice en memoria
+guarda el desplazamiento de la última versión de cada usuario.
+
+- Búsqueda por usuario: O(1) (una lectura sobre el archivo mapeado con mmap).
+- Apertura sin materializar registros: de cada línea solo se extraen el
+  usuario y la marca de cuenta débil ("d"); el registro se decodifica al pedirlo.
+- Alta / modificación: O(1) (una escritura al final del archivo).
+- Compactación periódica cuando las versiones obsoletas ocupan demasiado.
+- Índice secundario de cuentas débiles (sin evaluación o con fuerte=False),
+  que se construye en la misma pasada de apertura y se mantiene en cada escritura.
+- migrar_desde_json(): migración única desde el users.json existente.
+
+Seguridad ante fallos y concurrencia:
+- El propio registro hace de diario (write-ahead): cada escritura es una
+  línea completa terminada en '\\n' seguida de fsync. Una escritura cortada
+  por un fallo deja una última línea incompleta, que se descarta (trunca)
+  al abrir o antes de la siguiente escritura. Una entrada dañada en medio
+  del archivo se salta como espacio muerto (la compactación la elimina);
+  solo se trunca lo que está dañado al final.
+- Las reescrituras (compactación, replace_all, migración) se hacen en un
+  temporal con fsync y os.replace atómico.
+- Un archivo de bloqueo (users.log.lock) serializa a los escritores de
+  todos los procesos; cada proceso detecta lo que otros anexaron,
+  compactaron o modificaron (inodo / tamaño / mtime) y actualiza su índice
+  antes de operar.
+
+Formato de línea: {"u": usuario, "d": 0|1, "r": registro}, o
+{"u": usuario, "r": null} para un borrado. Las líneas sin "d" (versiones
+anteriores) se leen decodificándolas enteras.
+
+Con formato="binario" los archivos nuevos y las reescrituras usan el
+formato compacto de registro_binario (salt y hash en binario, evaluación
+empaquetada). El formato de un archivo existente se detecta al abrirlo, así
+que compact() con el otro formato configurado convierte el archivo.
+
+Uso como script (migración):
+    python almacen_usuarios.py users.json users.log [json|binario]
+"""
+
+import json
+import mmap
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from json.decoder import scanstring
+from typing import Callable, Dict, Iterable, Iterator, List, MutableMapping, Optional, Tuple, TypeVar
+
+from registro_binario import MAGIA, FormatoBinario
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+T = TypeVar("T")
+
+# Compacta cuando los bytes obsoletos superan esta fracción del archivo...
+COMPACT_RATIO = 0.5
+# ...y además superan este mínimo (evita compactar archivos pequeños).
+COMPACT_MIN_BYTES = 1 << 20
+
+
+def _es_debil(record: Dict) -> bool:
+    """Cuenta que debe generar alerta: sin evaluación o con contraseña no fuerte."""
+    evaluacion = record.get("evaluacion")
+    return evaluacion is None or not evaluacion.get("fuerte", False)
+
+
+def _encode_line(username: str, record) -> bytes:
+    """Serializa una entrada del registro como una línea JSON terminada en '\\n'."""
+    if record is None:
+        entry = {"u": username, "r": None}
+    else:
+        entry = {"u": username, "d": int(_es_debil(record)), "r": record}
+    return (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+_PREFIJO = b'{"u":"'
+
+
+def _cabecera(line: bytes) -> Optional[Tuple[str, bool, bool]]:
+    """
+    Lee (usuario, débil, borrado) del principio de una línea sin decodificar
+    el registro. Devuelve None si la línea no sigue el formato actual.
+    """
+    if not line.startswith(_PREFIJO):
+        return None
+    fin = line.find(b'"', 6)
+    if fin < 0:
+        return None
+    if b"\\" in line[6:fin]:
+        # nombre con escapes: se decodifica la cadena JSON completa
+        text = line.decode("utf-8")
+        username, pos = scanstring(text, 6)
+        resto = text[pos:pos + 11].encode("utf-8")
+    else:
+        username = line[6:fin].decode("utf-8")
+        resto = line[fin + 1:fin + 12]
+    if resto.startswith(b',"d":') and resto[6:11] == b',"r":':
+        return username, resto[5:6] == b"1", False
+    if resto.startswith(b',"r":null}'):
+        return username, False, True
+    return None
+
+
+class FormatoJSON:
+    """Codificador del formato de líneas JSON (misma interfaz que FormatoBinario)."""
+    nombre = "json"
+    cabecera = b""
+
+    def codificar(self, username: str, record: Dict, debil: bool,
+                  nuevos: Dict) -> Tuple[bytes, bytes]:
+        return b"", _encode_line(username, record)
+
+    def borrado(self, username: str) -> bytes:
+        return _encode_line(username, None)
+
+    def confirmar(self, nuevos: Dict) -> None:
+        pass
+
+    def serializar(self, items: Iterable[Tuple[str, Dict]], es_debil) -> Iterator[bytes]:
+        return (_encode_line(u, r) for u, r in items)
+
+    def recorrer(self, fh, desde: int) -> Iterator[Tuple[int, int, Optional[str], bool, bool]]:
+        """
+        Produce (offset, longitud, usuario, débil, borrado) por línea completa;
+        una línea corrupta produce usuario None y borrado True (espacio muerto).
+        """
+        offset = desde
+        for line in fh:
+            length = len(line)
+            if not line.endswith(b"\n"):
+                return
+            cabecera = _cabecera(line)
+            if cabecera is None:
+                try:
+                    entry = json.loads(line)
+                    record = entry["r"]
+                    cabecera = (entry["u"], record is not None and _es_debil(record), record is None)
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    cabecera = (None, False, True)
+            yield (offset, length) + cabecera
+            offset += length
+
+    def decodificar(self, datos: bytes) -> Dict:
+        return json.loads(datos)["r"]
+
+
+FORMATOS = {"json": FormatoJSON, "binario": FormatoBinario}
+
+
+# ---------- Bloqueo entre procesos ----------
+def _flock(fd: int, exclusivo: bool) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+        return
+    # msvcrt no tiene bloqueos compartidos: en Windows todos son exclusivos.
+    os.lseek(fd, 0, os.SEEK_SET)
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue  # LK_LOCK se rinde tras ~10 s; se sigue esperando
+
+
+def _funlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def _bloqueo_archivo(path: str):
+    """Bloqueo exclusivo sobre `path` + '.lock' (para operaciones sin UserStore abierto)."""
+    fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        _flock(fd, True)
+        try:
+            yield
+        finally:
+            _funlock(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directorio(path: str) -> None:
+    """Hace duradero un os.replace (en Windows no se puede abrir un directorio)."""
+    if fcntl is None:
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _reemplazar_atomico(path: str, lines: Iterable[bytes]) -> None:
+    """Escribe `lines` (cualquier secuencia de bytes) en un temporal y lo coloca con os.replace."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for line in lines:
+            f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_directorio(path)
+
+
+class UserRecord:
+    """
+    Registro de usuario decodificado para la ruta de verificación: salt y
+    hash como bytes crudos, de modo que cada login no decodifica hex ni
+    crea cadenas temporales. `kdf` son los parámetros con los que se
+    calculó el hash (None en registros antiguos).
+    """
+    __slots__ = ("salt", "hash", "kdf")
+
+    def __init__(self, salt: bytes, hash: bytes, kdf: Optional[Dict] = None):
+        self.salt = salt
+        self.hash = hash
+        self.kdf = kdf
+
+    @classmethod
+    def from_dict(cls, info: Dict) -> "UserRecord":
+        return cls(bytes.fromhex(info["salt"]), bytes.fromhex(info["hash"]), info.get("kdf"))
+
+
+class UserStore(MutableMapping):
+    """
+    Diccionario persistente usuario -> registro respaldado por un archivo
+    de solo-anexado. Se comporta como el Dict[str, Dict] que devolvía
+    _load_users(), pero sin cargar todos los registros en memoria.
+    Es seguro entre hilos y entre procesos que abran el mismo archivo.
+    Con durable=True cada escritura hace fsync antes de volver. `formato`
+    ("json" o "binario") se usa para archivos nuevos y reescrituras.
+    """
+
+    def __init__(self, path: str, compact_ratio: float = COMPACT_RATIO,
+                 compact_min_bytes: int = COMPACT_MIN_BYTES, durable: bool = True,
+                 formato: str = "json"):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de almacén desconocido: {formato!r}")
+        self.path = path
+        self.formato = formato
+        self._formato = FORMATOS[formato]()  # formato del archivo abierto
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.durable = durable
+        self._index: Dict[str, Tuple[int, int]] = {}  # usuario -> (offset, longitud)
+        self._records: Dict[str, UserRecord] = {}  # registros ya decodificados
+        self._debiles: Dict[str, None] = {}  # cuentas débiles (dict como conjunto ordenado)
+        self._memo: Dict[str, object] = {}  # valor calculado para cada cuenta débil (ver memo_debil)
+        self._dead = 0  # bytes ocupados por versiones obsoletas o borrados
+        self._generacion = 0  # cambia cuando puede haber cambiado el conjunto de usuarios (ver generacion)
+        self._end = 0  # fin de la última entrada completa conocida
+        self._visto = None  # (inodo, tamaño, mtime) del archivo ya incorporado al índice
+        self._fh = None
+        self._mm: Optional[mmap.mmap] = None  # mapa de solo lectura para _read
+        self._mapeado = 0
+        self._mutex = threading.RLock()
+        self._lock_fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock_depth = 0
+        with self._bloqueo(exclusivo=True):
+            self._recuperar()
+
+    # ---------- Bloqueo ----------
+    @contextmanager
+    def _bloqueo(self, exclusivo: bool):
+        """
+        Bloqueo entre hilos (RLock) y entre procesos (archivo .lock).
+        Es reentrante; un bloqueo anidado reutiliza el exterior, así que no
+        debe pedirse exclusivo dentro de uno compartido.
+        """
+        with self._mutex:
+            if self._lock_depth == 0:
+                _flock(self._lock_fd, exclusivo)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    _funlock(self._lock_fd)
+
+    # ---------- Apertura, recuperación e índice ----------
+    def _open(self) -> None:
+        # "a+b": las escrituras siempre van al final; se puede leer con seek.
+        self._fh = open(self.path, "a+b")
+        self._scan(0)
+        self._anotar_estado(os.fstat(self._fh.fileno()))
+
+    def _anotar_estado(self, st: os.stat_result) -> None:
+        self._visto = (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _cerrar_mapa(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+            self._mapeado = 0
+
+    def _cerrar_archivo(self) -> None:
+        self._cerrar_mapa()
+        self._fh.close()
+
+    def _recuperar(self) -> None:
+        """Apertura con el bloqueo exclusivo: descarta temporales y colas incompletas."""
+        tmp = self.path + ".tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)  # reescritura interrumpida antes del os.replace
+        self._open()
+        self._truncar_cola()
+
+    def _truncar_cola(self) -> None:
+        """Elimina una última línea a medio escribir (escritura cortada por un fallo)."""
+        if os.fstat(self._fh.fileno()).st_size > self._end:
+            self._cerrar_mapa()
+            self._fh.truncate(self._end)
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def _detectar_formato(self):
+        """Formato del archivo según su cabecera; si está vacío, el configurado."""
+        self._fh.seek(0)
+        inicio = self._fh.read(len(MAGIA))
+        if inicio == MAGIA:
+            return FormatoBinario()
+        if not inicio or MAGIA.startswith(inicio):
+            return FORMATOS[self.formato]()  # vacío o cabecera cortada
+        return FormatoJSON()
+
+    def _scan(self, desde: int) -> None:
+        """
+        Recorre el archivo desde `desde` actualizando el índice de
+        desplazamientos (desde=0 lo reconstruye entero). Se detiene en una
+        entrada incompleta: está a medio escribir o cortada por un fallo.
+        """
+        if desde == 0:
+            self._index.clear()
+            self._records.clear()
+            self._debiles.clear()
+            self._memo.clear()
+            self._dead = 0
+            self._formato = self._detectar_formato()
+        self._fh.seek(desde)
+        index, records, debiles, memo = self._index, self._records, self._debiles, self._memo
+        end = desde
+        for offset, length, username, debil, borrado in self._formato.recorrer(self._fh, desde):
+            end = offset + length
+            if username is None:
+                if borrado:
+                    self._dead += length  # línea corrupta: se ignora
+            elif borrado:
+                old = index.pop(username, None)
+                if old is not None:
+                    self._dead += old[1]
+                records.pop(username, None)
+                debiles.pop(username, None)
+                memo.pop(username, None)
+                self._dead += length  # lápida (usuario borrado)
+            else:
+                # _indexar() en línea: es el bucle más caliente de la apertura
+                old = index.get(username)
+                if old is not None:
+                    self._dead += old[1]
+                    records.pop(username, None)
+                    memo.pop(username, None)
+                index[username] = (offset, length)
+                if debil:
+                    debiles[username] = None
+                elif username in debiles:
+                    del debiles[username]
+        if desde == 0 or end != desde:
+            self._generacion += 1  # altas o bajas de otro proceso (o índice reconstruido)
+        self._end = end
+
+    def _refrescar(self) -> None:
+        """
+        Incorpora lo que otros procesos anexaron, compactaron o modificaron
+        desde la última operación. Si inodo, tamaño y mtime no cambiaron, el
+        índice sigue siendo válido y no se hace nada más que un stat().
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if (st.st_ino, st.st_size, st.st_mtime_ns) == self._visto:
+            return
+        with self._bloqueo(exclusivo=False):
+            if st.st_ino != self._visto[0]:
+                self._cerrar_archivo()
+                self._open()  # compactado o reemplazado por otro proceso
+                return
+            if st.st_size > self._end:
+                self._scan(self._end)  # anexado por otro proceso
+            elif st.st_size < self._end or st.st_size == self._visto[1]:
+                # truncado o modificado en el sitio: el índice ya no vale
+                self._cerrar_mapa()
+                self._scan(0)
+            self._anotar_estado(st)
+
+    def _marcar_debil(self, username: str, debil: bool) -> None:
+        if debil:
+            self._debiles.setdefault(username, None)
+        else:
+            self._debiles.pop(username, None)
+
+    def _read(self, offset: int, length: int) -> Dict:
+        if offset + length > self._mapeado:
+            # el archivo creció desde que se mapeó: se vuelve a mapear entero
+            self._cerrar_mapa()
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapeado = len(self._mm)
+        return self._formato.decodificar(self._mm[offset:offset + length])
+
+    def _append(self, data: bytes) -> int:
+        """
+        Anexa `data` (con el bloqueo exclusivo tomado y el índice al día) y
+        devuelve su offset. En un archivo vacío escribe antes la cabecera del formato.
+        """
+        self._truncar_cola()
+        prefijo = self._formato.cabecera if self._end == 0 else b""
+        self._fh.seek(0, os.SEEK_END)
+        offset = self._fh.tell() + len(prefijo)
+        self._fh.write(prefijo + data)
+        self._fh.flush()
+        if self.durable:
+            os.fsync(self._fh.fileno())
+        self._end = offset + len(data)
+        self._anotar_estado(os.fstat(self._fh.fileno()))
+        return offset
+
+    def _codificar(self, username: str, record: Dict, nuevos: Dict) -> Tuple[bytes, bytes, bool]:
+        """(entradas previas, entrada del registro, débil) en el formato del archivo abierto."""
+        debil = _es_debil(record)
+        previos, entrada = self._formato.codificar(username, record, debil, nuevos)
+        return previos, entrada, debil
+
+    def _indexar(self, username: str, debil: bool, offset: int, length: int) -> None:
+        old = self._index.get(username)
+        if old is not None:
+            self._dead += old[1]
+        else:
+            self._generacion += 1  # usuario nuevo
+        self._index[username] = (offset, length)
+        self._records.pop(username, None)
+        self._memo.pop(username, None)
+        self._marcar_debil(username, debil)
+
+    # ---------- Interfaz de diccionario ----------
+    def __getitem__(self, username: str) -> Dict:
+        with self._mutex:
+            self._refrescar()
+            offset, length = self._index[username]
+            return self._read(offset, length)
+
+    def __setitem__(self, username: str, record: Dict) -> None:
+        if record is None:
+            raise ValueError("El registro de un usuario no puede ser None.")
+        with self._bloqueo(exclusivo=True):
+            self._refrescar()
+            nuevos = {}
+            previos, entrada, debil = self._codificar(username, record, nuevos)
+            offset = self._append(previos + entrada) + len(previos)
+            self._formato.confirmar(nuevos)
+            self._indexar(username, debil, offset, len(entrada))
+            self._maybe_compact()
+
+    def add(self, username: str, record: Dict) -> bool:
+        """
+        Alta atómica: guarda el registro solo si el usuario no existe (también
+        frente a otros procesos). Devuelve False si ya existía.
+        """
+        with self._bloqueo(exclusivo=True):
+            self._refrescar()
+            if username in self._index:
+                return False
+            nuevos = {}
+            previos, entrada, debil = self._codificar(username, record, nuevos)
+            offset = self._append(previos + entrada) + len(previos)
+            self._formato.confirmar(nuevos)
+            self._indexar(username, debil, offset, len(entrada))
+            return True
+
+    def put_many(self, items: Iterable[Tuple[str, Dict]], solo_nuevos: bool = False) -> int:
+        """
+        Guarda varios registros con una sola escritura y un solo fsync
+        (un lote queda entero en disco o no queda). Devuelve cuántos guardó.
+        Con solo_nuevos=True no sobrescribe a nadie: los usuarios que ya
+        existen al tomar el bloqueo (o repetidos en `items`) se omiten.
+        """
+        items = list(items)
+        return len(items) - len(self._guardar_lote(items, solo_nuevos))
+
+    def add_many(self, items: Iterable[Tuple[str, Dict]]) -> List[str]:
+        """Como add() para un lote (put_many con solo_nuevos=True); devuelve los usuarios omitidos."""
+        return self._guardar_lote(list(items), solo_nuevos=True)
+
+    def _guardar_lote(self, items: List[Tuple[str, Dict]], solo_nuevos: bool) -> List[str]:
+        if not items:
+            return []
+        omitidos = []
+        with self._bloqueo(exclusivo=True):
+            self._refrescar()
+            if solo_nuevos:
+                vistos = set()
+                nuevos_items = []
+                for username, record in items:
+                    if username in self._index or username in vistos:
+                        omitidos.append(username)
+                    else:
+                        vistos.add(username)
+                        nuevos_items.append((username, record))
+                items = nuevos_items
+                if not items:
+                    return omitidos
+            nuevos = {}
+            entradas = [(username,) + self._codificar(username, record, nuevos) for username, record in items]
+            offset = self._append(b"".join(previos + entrada for _, previos, entrada, _ in entradas))
+            self._formato.confirmar(nuevos)
+            for username, previos, entrada, debil in entradas:
+                offset += len(previos)
+                self._indexar(username, debil, offset, len(entrada))
+                offset += len(entrada)
+            self._maybe_compact()
+        return omitidos
+
+    def __delitem__(self, username: str) -> None:
+        with self._bloqueo(exclusivo=True):
+            self._refrescar()
+            old = self._index.pop(username)
+            self._generacion += 1
+            self._records.pop(username, None)
+            self._debiles.pop(username, None)
+            self._memo.pop(username, None)
+            line = self._formato.borrado(username)
+            self._append(line)
+            self._dead += old[1] + len(line)
+            self._maybe_compact()
+
+    def __contains__(self, username) -> bool:
+        with self._mutex:
+            self._refrescar()
+            return username in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        with self._mutex:
+            self._refrescar()
+            return len(self._index)
+
+    def generacion(self) -> int:
+        """
+        Número que cambia cada vez que puede haber cambiado el conjunto de
+        usuarios (altas y bajas, propias o de otro proceso). Sirve para saber
+        si una copia de keys() sigue valiendo: el tamaño no basta, porque una
+        baja seguida de un alta lo deja igual.
+        """
+        with self._mutex:
+            self._refrescar()
+            return self._generacion
+
+    def keys(self):
+        with self._mutex:
+            self._refrescar()
+            return list(self._index)
+
+    def items(self) -> List[Tuple[str, Dict]]:
+        """Todos los (usuario, registro) con una sola comprobación del archivo."""
+        with self._mutex:
+            self._refrescar()
+            return [(u, self._read(off, ln)) for u, (off, ln) in self._index.items()]
+
+    def usuarios_debiles(self) -> List[str]:
+        """Usuarios cuya contraseña es débil o no tiene evaluación (sin recorrer el archivo)."""
+        with self._mutex:
+            self._refrescar()
+            return list(self._debiles)
+
+    def memo_debil(self, username: str, calcular: Callable[[str, Dict], T]) -> T:
+        """
+        calcular(usuario, registro) de una cuenta débil (p. ej. el texto de su
+        alerta), guardado en el almacén hasta que el registro cambie, se borre,
+        deje de ser débil o se reescriba el archivo.
+        """
+        with self._mutex:
+            self._refrescar()
+            if username in self._memo:
+                return self._memo[username]
+            valor = calcular(username, self._read(*self._index[username]))
+            if username in self._debiles:
+                self._memo[username] = valor
+            return valor
+
+    def get_record(self, username: str) -> Optional[UserRecord]:
+        """Devuelve el registro decodificado (se decodifica una sola vez y se conserva)."""
+        with self._mutex:
+            self._refrescar()
+            record = self._records.get(username)
+            if record is None:
+                location = self._index.get(username)
+                if location is None:
+                    return None
+                record = self._records[username] = UserRecord.from_dict(self._read(*location))
+            return record
+
+    # ---------- Mantenimiento ----------
+    def flush(self) -> None:
+        with self._mutex:
+            self._fh.flush()
+
+    def close(self) -> None:
+        with self._mutex:
+            if self._fh is not None:
+                self._cerrar_archivo()
+                self._fh = None
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+    def _maybe_compact(self) -> None:
+        if self._dead >= self.compact_min_bytes and self._dead > self._end * self.compact_ratio:
+            self._rewrite(self.items())
+
+    def _rewrite(self, items) -> None:
+        """
+        Escribe `items` (usuario, registro) en un temporal, en el formato
+        configurado, y lo coloca de forma atómica.
+        """
+        _reemplazar_atomico(self.path, FORMATOS[self.formato]().serializar(items, _es_debil))
+        self._cerrar_archivo()
+        self._open()
+
+    def compact(self) -> None:
+        """Reescribe el archivo dejando solo la última versión de cada usuario."""
+        with self._bloqueo(exclusivo=True):
+            self._refrescar()
+            self._rewrite(self.items())
+
+    def replace_all(self, users: Dict[str, Dict]) -> None:
+        """Sustituye todo el contenido (compatibilidad con _save_users(dict))."""
+        items = list(users.items())  # `users` podría ser este mismo almacén
+        with self._bloqueo(exclusivo=True):
+            self._rewrite(items)
+
+
+# ---------- Migración ----------
+def migrar_desde_json(json_path: str, log_path: str, overwrite: bool = False,
+                      formato: str = "json") -> int:
+    """
+    Migra (una sola vez) un users.json con formato {usuario: registro} al
+    registro de solo-anexado, en el `formato` indicado. No modifica el JSON original.
+    Devuelve el número de usuarios migrados.
+    """
+    with _bloqueo_archivo(log_path):
+        if not overwrite and os.path.exists(log_path) and os.path.getsize(log_path) > 0:
+            raise FileExistsError(f"{log_path} ya existe; usa overwrite=True para reemplazarlo.")
+        with open(json_path, "r", encoding="utf-8") as f:
+            users = json.load(f)
+        _reemplazar_atomico(log_path, FORMATOS[formato]().serializar(users.items(), _es_debil))
+    return len(users)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4) or sys.argv[3:] and sys.argv[3] not in FORMATOS:
+        print("Uso: python almacen_usuarios.py <users.json> <users.log> [json|binario]")
+        sys.exit(2)
+    n = migrar_desde_json(sys.argv[1], sys.argv[2], formato=sys.argv[3] if len(sys.argv) == 4 else "json")
+    print(f"Migrados {n} usuarios a {sys.argv[2]}.")
@@ -0,0 +1,164 @@
+"""
+Analizador de fuerza de contraseñas compartido.
+
+Sustituye la cascada de re.search (una búsqueda por criterio) por una sola
+pasada de clasificación: str.translate convierte cada carácter en su clase
+(mayúscula, minúscula, dígito, especial) con una tabla precalculada y la
+presencia de cada clase se comprueba sobre ese resultado en C.
+
+Lo usan VerificarContrasena (Trabajofinal.py) y
+PasswordManager.check_password_strength (Trabajo_Final_contraseñas_seguras.py),
+cada uno con su propia política y mensajes. Si se le pasa un estimador
+(estimador_patrones.py), las contraseñas que superan los criterios de
+clases pero son fáciles de adivinar por sus patrones dejan de ser fuertes.
+"""
+
+from typing import Container, Dict, FrozenSet, Iterable, List, Optional
+
+from estimador_patrones import EstimadorPatrones, mensajes_patrones
+
+# Bits de clase de carácter (y de longitud suficiente)
+MAYUSCULA = 1
+MINUSCULA = 2
+DIGITO = 4
+ESPECIAL = 8
+LONGITUD_OK = 16
+
+# Criterios en el orden en que se evalúan por defecto
+LONGITUD = "longitud"
+COMUN = "comun"
+_CRITERIO_BIT = {LONGITUD: LONGITUD_OK, "mayuscula": MAYUSCULA, "minuscula": MINUSCULA,
+                 "digito": DIGITO, "especial": ESPECIAL}
+
+
+class _TablaClases(dict):
+    """
+    Tabla para str.translate: punto de código -> chr(bit de clase).
+    Los caracteres ASCII se precalculan; el resto se clasifica la primera
+    vez que aparece y queda guardado.
+    """
+
+    def __init__(self, especiales: Optional[str]):
+        super().__init__()
+        self._especiales = especiales
+        for cp in range(128):
+            self[cp] = chr(self._clase(chr(cp)))
+
+    def _clase(self, c: str) -> int:
+        # Misma semántica que los patrones originales: [A-Z], [a-z] y [0-9]
+        # son solo ASCII; "especial" es [^\w\s] o el conjunto indicado.
+        if "A" <= c <= "Z":
+            return MAYUSCULA
+        if "a" <= c <= "z":
+            return MINUSCULA
+        if "0" <= c <= "9":
+            return DIGITO
+        if self._especiales is None:
+            if not (c.isalnum() or c == "_" or c.isspace()):
+                return ESPECIAL
+        elif c in self._especiales:
+            return ESPECIAL
+        return 0
+
+    def __missing__(self, cp: int) -> str:
+        valor = self[cp] = chr(self._clase(chr(cp)))
+        return valor
+
+
+class AnalizadorFuerza:
+    """
+    Evalúa una contraseña en una sola pasada y devuelve
+    {'fuerte': bool, 'puntuacion': int, 'detalles': [str, ...]}.
+
+    - longitud_minima: longitud exigida.
+    - especiales: caracteres que cuentan como especiales (None = [^\\w\\s]).
+    - comunes: contraseñas prohibidas (se comparan en minúsculas); si la
+      contraseña es común se añade el detalle y se resta un punto.
+    - lista_bloqueo: contenedor adicional de contraseñas comunes (p. ej. una
+      ListaBloqueo en disco); solo se consulta si no está en `comunes`.
+    - umbral: puntuación mínima para considerarla fuerte.
+    - estimador: EstimadorPatrones que se consulta solo si la contraseña
+      alcanza el umbral y su comprobación barata (puede_bajar_de) no la
+      descarta; si su puntuación (0-4) es menor que
+      `minimo_estimado`, se añaden los detalles de sus patrones (claves
+      "diccionario", "teclado", ..., "adivinable" de `mensajes`, con texto
+      por defecto) y la puntuación queda en umbral - 1.
+    - mensajes: texto del detalle para cada criterio que falla.
+    - orden: orden en que se comprueban los criterios (y se listan los detalles).
+    """
+
+    def __init__(self, mensajes: Dict[str, str], longitud_minima: int = 12,
+                 especiales: Optional[str] = None, comunes: Iterable[str] = (),
+                 lista_bloqueo: Optional[Container[str]] = None, umbral: int = 4,
+                 orden: Iterable[str] = (LONGITUD, "mayuscula", "minuscula", "digito", "especial"),
+                 estimador: Optional[EstimadorPatrones] = None, minimo_estimado: int = 3):
+        self.mensajes = mensajes
+        self.longitud_minima = longitud_minima
+        self.comunes: FrozenSet[str] = frozenset(comunes)
+        self.lista_bloqueo = lista_bloqueo
+        self.umbral = umbral
+        self.orden = tuple(orden)
+        self.estimador = estimador
+        self.minimo_estimado = minimo_estimado
+        self._tabla = _TablaClases(especiales)
+        self._pasos = tuple((_CRITERIO_BIT[c], mensajes[c]) for c in self.orden)
+        self._todos = 0
+        for bit, _ in self._pasos:
+            self._todos |= bit
+
+    def clasificar(self, password: str) -> int:
+        """Devuelve la máscara de bits con las clases de carácter presentes."""
+        t = password.translate(self._tabla)
+        return ((("\x01" in t) * MAYUSCULA) | (("\x02" in t) * MINUSCULA)
+                | (("\x04" in t) * DIGITO) | (("\x08" in t) * ESPECIAL))
+
+    def es_comun(self, password: str, mascara: int) -> bool:
+        if not self.comunes and self.lista_bloqueo is None:
+            return False
+        # Sin mayúsculas ASCII y con solo ASCII, lower() no cambia nada: se evita la copia.
+        if mascara & MAYUSCULA or not password.isascii():
+            password = password.lower()
+        if password in self.comunes:
+            return True
+        return self.lista_bloqueo is not None and password in self.lista_bloqueo
+
+    def patrones_debiles(self, password: str) -> Optional[int]:
+        """Bits de patrones si el estimador la considera adivinable; None si no."""
+        if not self.estimador.puede_bajar_de(password, self.minimo_estimado):
+            return None  # descartada por los extremos, sin descomponerla
+        estimacion = self.estimador.estimar(password)
+        if estimacion.puntuacion < self.minimo_estimado:
+            return estimacion.patrones
+        return None
+
+    def detalles_patrones(self, patrones: int) -> List[str]:
+        return mensajes_patrones(patrones, self.mensajes)
+
+    def analizar(self, password: str) -> Dict[str, object]:
+        mascara = self.clasificar(password)
+        if len(password) >= self.longitud_minima:
+            mascara |= LONGITUD_OK
+        detalles: List[str] = []
+        if mascara & self._todos == self._todos:
+            puntuacion = len(self._pasos)  # cumple todos los criterios
+        else:
+            puntuacion = 0
+            for bit, mensaje in self._pasos:
+                if mascara & bit:
+                    puntuacion += 1
+                else:
+                    detalles.append(mensaje)
+
+        if self.es_comun(password, mascara):
+            detalles.append(self.mensajes[COMUN])
+            # penaliza si es común: reduce puntuacion si es alta
+            if puntuacion > 0:
+                puntuacion -= 1
+
+        if self.estimador is not None and puntuacion >= self.umbral:
+            patrones = self.patrones_debiles(password)
+            if patrones is not None:
+                detalles.extend(self.detalles_patrones(patrones))
+                puntuacion = self.umbral - 1
+
+        return {"fuerte": puntuacion >= self.umbral, "puntuacion": puntuacion, "detalles": detalles}
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Auditoría masiva de contraseñas candidatas con la política de un AnalizadorFuerza.
+
+Para auditar volcados enormes, llamar a VerificarContrasena (o a
+check_password_strength) una vez por contraseña cuesta una llamada Python
+por fila. AuditorMasivo evalúa bloques enteros con NumPy:
+- el bloque se decodifica de una vez a un array de puntos de código; cada
+  carácter se convierte en su clase con una tabla (los no ASCII, una vez por
+  carácter distinto) y las clases se combinan por fila con bitwise_or.reduceat;
+- la longitud sale de las posiciones de los saltos de línea;
+- el indicador de contraseña común se calcula comparando en bloque las filas
+  con la longitud de alguna contraseña de `comunes`, y buscando los hashes de
+  las filas en la lista de bloqueo con searchsorted;
+- la puntuación y `fuerte` se obtienen con operaciones sobre los arrays;
+- el estimador de patrones no se vectoriza: solo se estiman las filas que
+  salen fuertes, una vez por contraseña distinta, y se degradan como en
+  analizar().
+La clasificación usa la tabla del propio analizador y las filas con
+caracteres no ASCII (cuyo lower() depende de Unicode) comprueban si son
+comunes con analizador.es_comun, así que el resultado coincide exactamente
+con AnalizadorFuerza.analizar (y con VerificarContrasena o
+check_password_strength). El estimador cuesta unas cien veces más que todo
+lo demás; rapido=True (--rapido) no lo consulta y da la política por clases,
+que puede marcar como fuertes contraseñas que analizar() no acepta. Sin
+NumPy, cada fila se evalúa con el analizador.
+
+Entrada: texto con una contraseña por línea (se quita el '\\r\\n' final; las
+secuencias que no son UTF-8 se leen como U+FFFD). Se lee por bloques, así
+que la memoria no depende del tamaño del archivo.
+
+Uso como script:
+    python auditoria.py candidatos.txt [--politica registro|gui] [--bloque MiB] [--rapido]
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import time
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional
+
+from analizador_fuerza import COMUN, LONGITUD_OK, AnalizadorFuerza
+from lista_bloqueo import ListaBloqueo
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: se evalúa fila a fila
+    np = None
+
+TAM_BLOQUE = 8 << 20  # bytes leídos del archivo por bloque
+_NO_ASCII = 0x80  # marca auxiliar: carácter (o fila) con algo no ASCII
+
+
+class AuditorMasivo:
+    """
+    Evalúa contraseñas en bloque con la política de `analizador`.
+    Cada bloque devuelve arrays alineados por fila:
+        longitud   (int)   longitud en caracteres
+        mascara    (uint8) bits de analizador_fuerza presentes (clases y LONGITUD_OK)
+        comun      (bool)  está en `comunes` o en la lista de bloqueo
+        puntuacion (int)   la de analizar()
+        fuerte     (bool)  la de analizar()
+        patrones   (int16) bits de patrones si el estimador la degradó; -1 si no
+    Los detalles de una fila se reconstruyen con detalles(mascara, comun, patrones).
+    Con rapido=True no se consulta el estimador del analizador.
+    """
+
+    MAX_CACHE_PATRONES = 100_000
+
+    def __init__(self, analizador: AnalizadorFuerza, rapido: bool = False):
+        self.analizador = analizador
+        self.patrones = not rapido and analizador.estimador is not None
+        self._cache_patrones: Dict[str, int] = {}
+        self._todos = 0
+        for bit, _ in analizador._pasos:
+            self._todos |= bit
+        self._comunes = {c.encode("utf-8") for c in analizador.comunes if c.isascii()}
+        if np is not None:
+            self._preparar_tablas()
+
+    def _preparar_tablas(self) -> None:
+        tabla = self.analizador._tabla
+        # índice 128: cualquier carácter no ASCII (se clasifica aparte)
+        self._clases = np.array([ord(tabla[c]) for c in range(128)] + [_NO_ASCII], dtype=np.uint8)
+        self._minusculas = np.frombuffer(bytes(range(128)).lower(), dtype=np.uint8)
+        self._puntos = np.array([bin(m & self._todos).count("1") for m in range(256)], dtype=np.int8)
+        # Claves de comparación de `comunes`: longitud (módulo 256) + bytes con
+        # relleno fijo, para que una contraseña con '\0' al final no coincida.
+        self._largo_comun = max((len(c) for c in self._comunes), default=0)
+        self._largos_comunes = np.array(sorted({len(c) for c in self._comunes}), dtype=np.int64)
+        self._claves_comunes = np.array(
+            [bytes((len(c) % 256,)) + c.ljust(self._largo_comun, b"\0") for c in self._comunes],
+            dtype=f"S{self._largo_comun + 1}")
+
+    # ---------- Detalles ----------
+    def detalles(self, mascara: int, comun: bool, patrones: int = -1) -> List[str]:
+        """Lista de detalles que devolvería analizar() para esa fila."""
+        detalles = [mensaje for bit, mensaje in self.analizador._pasos if not mascara & bit] \
+            if int(mascara) & self._todos != self._todos else []
+        if comun:
+            detalles.append(self.analizador.mensajes[COMUN])
+        if patrones >= 0:
+            detalles.extend(self.analizador.detalles_patrones(int(patrones)))
+        return detalles
+
+    def como_dict(self, resultado: Dict, fila: int) -> Dict[str, object]:
+        """La fila `fila` de un bloque como dict {'fuerte', 'puntuacion', 'detalles'} (el de analizar() salvo con rapido=True)."""
+        return {"fuerte": bool(resultado["fuerte"][fila]),
+                "puntuacion": int(resultado["puntuacion"][fila]),
+                "detalles": self.detalles(resultado["mascara"][fila], bool(resultado["comun"][fila]),
+                                          int(resultado["patrones"][fila]))}
+
+    # ---------- Evaluación ----------
+    def _fila(self, fila: bytes):
+        """(contraseña, máscara, común) de una fila con el analizador."""
+        password = fila.decode("utf-8", "replace")
+        mascara = self.analizador.clasificar(password)
+        if len(password) >= self.analizador.longitud_minima:
+            mascara |= LONGITUD_OK
+        return password, mascara, self.analizador.es_comun(password, mascara)
+
+    def _patrones(self, password: str) -> int:
+        """Bits de patrones si el estimador degrada una fila fuerte; -1 si no."""
+        patrones = self._cache_patrones.get(password)
+        if patrones is None:
+            if len(self._cache_patrones) >= self.MAX_CACHE_PATRONES:
+                self._cache_patrones.clear()
+            patrones = self.analizador.patrones_debiles(password)
+            patrones = self._cache_patrones[password] = -1 if patrones is None else patrones
+        return patrones
+
+    def _auditar_filas(self, filas: List[bytes]) -> Dict[str, list]:
+        """Evaluación fila a fila (sin NumPy)."""
+        resultado = {"longitud": [], "mascara": [], "comun": [], "puntuacion": [], "fuerte": [], "patrones": []}
+        umbral = self.analizador.umbral
+        for fila in filas:
+            password, mascara, comun = self._fila(fila)
+            puntuacion = bin(mascara & self._todos).count("1")
+            if comun and puntuacion > 0:
+                puntuacion -= 1
+            patrones = -1
+            if self.patrones and puntuacion >= umbral:
+                patrones = self._patrones(password)
+                if patrones >= 0:
+                    puntuacion = umbral - 1
+            resultado["longitud"].append(len(password))
+            resultado["mascara"].append(mascara)
+            resultado["comun"].append(comun)
+            resultado["puntuacion"].append(puntuacion)
+            resultado["fuerte"].append(puntuacion >= umbral)
+            resultado["patrones"].append(patrones)
+        return resultado
+
+    def auditar(self, passwords) -> Dict:
+        """Evalúa una columna de contraseñas (lista de str o bytes, o array NumPy de bytes)."""
+        filas = [p.encode("utf-8") if isinstance(p, str) else bytes(p) for p in passwords]
+        if any(b"\n" in f for f in filas):
+            # el bloque separa filas por '\n': esas contraseñas se evalúan aparte
+            return self._auditar_filas(filas) if np is None else \
+                {k: np.asarray(v) for k, v in self._auditar_filas(filas).items()}
+        return self.auditar_bloque(b"\n".join(filas) + b"\n", quitar_cr=False)
+
+    def auditar_bloque(self, datos: bytes, quitar_cr: bool = True) -> Dict:
+        """Evalúa `datos`: filas terminadas en '\\n' (el bloque debe acabar en '\\n')."""
+        if np is None:
+            filas = datos.split(b"\n")[:-1]
+            return self._auditar_filas([f[:-1] if quitar_cr and f.endswith(b"\r") else f for f in filas])
+
+        # Un elemento por carácter: las longitudes son las de len(str)
+        texto = datos.decode("utf-8", "replace")
+        cp = np.frombuffer(texto.encode("utf-32-le"), dtype=np.uint32)
+        fines = np.flatnonzero(cp == 10)
+        if not len(fines):
+            vacio = np.zeros(0, dtype=np.int64)
+            return {"longitud": vacio, "mascara": vacio.astype(np.uint8), "comun": vacio.astype(bool),
+                    "puntuacion": vacio.astype(np.int8), "fuerte": vacio.astype(bool),
+                    "patrones": vacio.astype(np.int16)}
+        inicios = np.empty_like(fines)
+        inicios[0] = 0
+        inicios[1:] = fines[:-1] + 1
+        clases = self._clasificar(cp)
+        clases[fines] = 0
+        longitudes = fines - inicios
+        if quitar_cr:
+            cr = (longitudes > 0) & (cp[fines - 1] == 13)
+            clases[fines[cr] - 1] = 0
+            longitudes -= cr
+        mascara = np.bitwise_or.reduceat(clases, inicios)
+        mascara[longitudes >= self.analizador.longitud_minima] |= LONGITUD_OK
+        comun = self._marcar_comunes(texto, cp, inicios, longitudes, mascara)
+        mascara &= ~np.uint8(_NO_ASCII)
+
+        puntos = self._puntos[mascara]
+        puntuacion = puntos - (comun & (puntos > 0))
+        fuerte = puntuacion >= self.analizador.umbral
+        patrones = np.full(len(fines), -1, dtype=np.int16)
+        if self.patrones:
+            # El estimador no se vectoriza: solo se consulta para las filas fuertes
+            for i, inicio, n in zip(*(a[fuerte].tolist() for a in (np.arange(len(fines)), inicios, longitudes))):
+                patrones[i] = self._patrones(texto[inicio:inicio + n])
+            degradadas = patrones >= 0
+            puntuacion[degradadas] = self.analizador.umbral - 1
+            fuerte &= ~degradadas
+        return {"longitud": longitudes, "mascara": mascara, "comun": comun,
+                "puntuacion": puntuacion, "fuerte": fuerte, "patrones": patrones}
+
+    def _clasificar(self, cp):
+        """Clase de cada carácter; los no ASCII se clasifican una vez por carácter distinto."""
+        clases = self._clases[np.minimum(cp, 128)]
+        no_ascii = np.flatnonzero(clases == _NO_ASCII)
+        if len(no_ascii):
+            tabla = self.analizador._tabla
+            distintos, inversa = np.unique(cp[no_ascii], return_inverse=True)
+            propias = np.array([ord(tabla[c]) for c in distintos.tolist()], dtype=np.uint8)
+            clases[no_ascii] = propias[inversa] | _NO_ASCII
+        return clases
+
+    def _marcar_comunes(self, texto: str, cp, inicios, longitudes, mascara):
+        """Indicador de contraseña común por fila."""
+        ascii_ = (mascara & _NO_ASCII) == 0
+        comun = np.zeros(len(inicios), dtype=bool)
+        candidatas = np.flatnonzero(ascii_ & np.isin(longitudes, self._largos_comunes))
+        if len(candidatas):
+            # Matriz (filas x largo) en minúsculas con la longitud delante, comparable con las claves
+            columnas = np.arange(self._largo_comun)
+            posiciones = np.minimum(inicios[candidatas, None] + columnas, len(cp) - 1)
+            letras = np.where(columnas < longitudes[candidatas, None],
+                              self._minusculas[cp[posiciones] & 0x7F], 0)
+            claves = np.empty((len(candidatas), self._largo_comun + 1), dtype=np.uint8)
+            claves[:, 0] = longitudes[candidatas] % 256
+            claves[:, 1:] = letras
+            claves = claves.view(f"S{self._largo_comun + 1}").ravel()
+            comun[candidatas] = np.isin(claves, self._claves_comunes)
+
+        # Filas no ASCII: lower() depende de Unicode, se comprueban con el analizador
+        for i in np.flatnonzero(~ascii_).tolist():
+            inicio = int(inicios[i])
+            password = texto[inicio:inicio + int(longitudes[i])]
+            comun[i] = self.analizador.es_comun(password, int(mascara[i]) & ~_NO_ASCII)
+
+        lista = self.analizador.lista_bloqueo
+        if lista is None:
+            return comun
+        pendientes = np.flatnonzero(ascii_ & ~comun)
+        filas = (texto[s:s + n].lower() for s, n in zip(inicios[pendientes].tolist(),
+                                                         longitudes[pendientes].tolist()))
+        if isinstance(lista, ListaBloqueo):
+            indice = lista.hashes()
+            if indice is None:
+                return comun
+            ancho, vista = indice
+            tipo = np.dtype(">u8") if ancho == 8 else np.dtype(f"S{ancho}")
+            ordenados = np.frombuffer(vista, dtype=tipo)
+            blake2b = hashlib.blake2b
+            buscados = np.frombuffer(b"".join(
+                blake2b(fila.encode("ascii"), digest_size=ancho).digest() for fila in filas), dtype=tipo)
+            pos = np.minimum(np.searchsorted(ordenados, buscados), len(ordenados) - 1)
+            comun[pendientes] = ordenados[pos] == buscados
+        else:
+            comun[pendientes] = [fila in lista for fila in filas]
+        return comun
+
+    def auditar_archivo(self, path: str, tam_bloque: int = TAM_BLOQUE) -> Iterator[Dict]:
+        """Lee `path` por bloques y produce el resultado de cada uno (filas consecutivas)."""
+        with open(path, "rb") as f:
+            yield from self.auditar_flujo(f, tam_bloque)
+
+    def auditar_flujo(self, f: BinaryIO, tam_bloque: int = TAM_BLOQUE) -> Iterator[Dict]:
+        """Como auditar_archivo, pero sobre un archivo binario ya abierto (p. ej. sys.stdin.buffer)."""
+        resto = b""
+        while True:
+            leido = f.read(tam_bloque)
+            if not leido:
+                if resto:
+                    yield self.auditar_bloque(resto + b"\n")
+                return
+            datos = resto + leido
+            corte = datos.rfind(b"\n") + 1
+            resto = datos[corte:]
+            if corte:
+                yield self.auditar_bloque(datos[:corte])
+
+
+# ---------- Script ----------
+# El gestor de la interfaz gráfica vive en otra carpeta del repositorio (con
+# espacios y tildes en el nombre, así que no es un paquete importable).
+RUTA_GESTOR_GUI = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..",
+                                                "Programacion Orientada a Objetos", "Trabajo_Final_contraseñas_seguras",
+                                                "Trabajo_Final_contraseñas_seguras.py"))
+
+
+def cargar_gestor_gui():
+    """Módulo del gestor de la interfaz gráfica, cargado una sola vez como "gestor_gui"."""
+    modulo = sys.modules.get("gestor_gui")
+    if modulo is None:
+        spec = importlib.util.spec_from_file_location("gestor_gui", RUTA_GESTOR_GUI)
+        modulo = importlib.util.module_from_spec(spec)
+        sys.modules["gestor_gui"] = modulo
+        try:
+            spec.loader.exec_module(modulo)
+        except BaseException:
+            del sys.modules["gestor_gui"]
+            raise
+    return modulo
+
+
+def _politica(nombre: str) -> AnalizadorFuerza:
+    """Analizador del gestor de consola ("registro") o de la interfaz gráfica ("gui")."""
+    if nombre == "registro":
+        import Trabajofinal
+        return Trabajofinal._get_analizador()
+    return cargar_gestor_gui()._get_analizador()
+
+
+def resumir(auditor: AuditorMasivo, resultados: Iterator[Dict],
+            progreso: Optional[Callable[[int, float], None]] = None) -> Dict[str, object]:
+    """Recorre los resultados por bloque y cuenta filas, fuertes, comunes y fallos por criterio."""
+    resumen = {"filas": 0, "fuertes": 0, "comunes": 0}
+    fallos = {criterio: 0 for criterio in auditor.analizador.orden}
+    bits = [(criterio, bit) for criterio, (bit, _) in zip(auditor.analizador.orden, auditor.analizador._pasos)]
+    inicio = time.perf_counter()
+    for resultado in resultados:
+        mascara = resultado["mascara"]
+        resumen["filas"] += len(mascara)
+        resumen["fuertes"] += int(sum(resultado["fuerte"]))
+        resumen["comunes"] += int(sum(resultado["comun"]))
+        for criterio, bit in bits:
+            fallos[criterio] += sum(1 for m in mascara if not m & bit) if np is None \
+                else int(np.count_nonzero((mascara & bit) == 0))
+        if progreso is not None:
+            progreso(resumen["filas"], time.perf_counter() - inicio)
+    duracion = time.perf_counter() - inicio
+    resumen["fallos"] = fallos
+    resumen["segundos"] = round(duracion, 3)
+    resumen["filas_por_segundo"] = round(resumen["filas"] / duracion) if duracion else 0
+    return resumen
+
+
+def _progreso_consola(filas: int, segundos: float) -> None:
+    print(f"\r{filas} filas  {filas / segundos if segundos else 0:,.0f} filas/seg", end="", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audita en bloque una lista de contraseñas candidatas.")
+    parser.add_argument("archivo", help="texto con una contraseña por línea")
+    parser.add_argument("--politica", choices=("registro", "gui"), default="registro",
+                        help="VerificarContrasena (registro) o check_password_strength (gui)")
+    parser.add_argument("--bloque", type=int, default=TAM_BLOQUE >> 20, help="MiB leídos por bloque")
+    parser.add_argument("--rapido", action="store_true",
+                        help="no consulta el estimador de patrones (mucho más rápido, pero no coincide con la política)")
+    args = parser.parse_args()
+    auditor = AuditorMasivo(_politica(args.politica), rapido=args.rapido)
+    final = resumir(auditor, auditor.auditar_archivo(args.archivo, args.bloque << 20), _progreso_consola)
+    print(file=sys.stderr)
+    print(json.dumps(final, ensure_ascii=False))
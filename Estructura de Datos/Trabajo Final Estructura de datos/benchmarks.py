@@ -0,0 +1,1099 @@
+#!/usr/bin/env python3
+"""
+Benchmarks del Gestor de Contraseñas Seguras.
+
+Cada benchmark trabaja en un directorio temporal, así que no toca el
+users.log real. Uso:
+    python benchmarks.py autenticacion [--usuarios N]
+    python benchmarks.py asignaciones [--llamadas N]
+    python benchmarks.py fuerza [--contrasenas N]
+    python benchmarks.py lista_bloqueo [--entradas N] [--consultas N]
+    python benchmarks.py bloom [--entradas N] [--consultas N] [--fp P]
+    python benchmarks.py estres [--procesos N] [--usuarios N]
+    python benchmarks.py servicio [--peticiones N] [--iteraciones N]
+    python benchmarks.py limitador [--intentos N]
+    python benchmarks.py formato [--usuarios N]
+    python benchmarks.py auditoria [--contrasenas N]
+    python benchmarks.py estimador [--contrasenas N]
+    python benchmarks.py boveda [--servicios N] [--hilos N]
+    python benchmarks.py boveda_cifrada [--tamano-mb N] [--entrada-kb N] [--lecturas N]
+    python benchmarks.py rotacion [--servicios N] [--lote N] [--hilos N]
+    python benchmarks.py gui [--registros N] [--usuarios N]
+    python benchmarks.py vistas [--usuarios N] [--consultas N]
+    python benchmarks.py arranque [--repeticiones N] [--usuarios N]
+    python benchmarks.py cli [--operaciones N] [--muestra N]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import heapq
+import json
+import multiprocessing
+import os
+import random
+import re
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import Trabajofinal
+from almacen_usuarios import UserStore
+from auditoria import RUTA_GESTOR_GUI, AuditorMasivo, cargar_gestor_gui, resumir
+from boveda import Boveda
+from boveda_cifrada import BovedaCifrada, ClavesSesion
+from estimador_patrones import EstimadorPatrones
+from limitador import LimitadorIntentos
+from filtro_bloom import FiltroBloom, construir_filtro_bloom
+from lista_bloqueo import ListaBloqueo, construir_lista_bloqueo
+
+
+def _usar_almacen_temporal(directorio: str) -> None:
+    """Redirige Trabajofinal a un almacén vacío dentro de `directorio`."""
+    if Trabajofinal._store is not None:
+        Trabajofinal._store.close()
+    Trabajofinal._store = None
+    Trabajofinal.USERS_FILE = os.path.join(directorio, "users.json")
+    Trabajofinal.USERS_LOG = os.path.join(directorio, "users.log")
+
+
+# ---------- Autenticación en lote ----------
+def bench_autenticacion(usuarios: int) -> None:
+    """Auths/seg de AutenticarUsuarios según el número de procesos."""
+    with tempfile.TemporaryDirectory() as tmp:
+        _usar_almacen_temporal(tmp)
+        pares = []
+        for i in range(usuarios):
+            username, password = f"user{i}", f"Clave-Segura-{i}!"
+            Trabajofinal.RegistrarUsuario(username, password)
+            pares.append((username, password))
+
+        print(f"{'procesos':>8} {'auths/seg':>10} {'aceleración':>12}")
+        base = None
+        for workers in range(1, (os.cpu_count() or 1) + 1):
+            Trabajofinal.AutenticarUsuarios(pares[:workers], workers=workers)  # calienta el pool
+            inicio = time.perf_counter()
+            resultados = Trabajofinal.AutenticarUsuarios(pares, workers=workers)
+            duracion = time.perf_counter() - inicio
+            assert all(resultados)
+            tasa = usuarios / duracion
+            base = base or tasa
+            print(f"{workers:>8} {tasa:>10.1f} {tasa / base:>11.2f}x")
+
+
+# ---------- Asignaciones en la verificación ----------
+def _verify_hash_hex(password: str, salt_hex: str, hash_hex: str) -> bool:
+    """Versión anterior de _verify_hash (decodifica hex y compara cadenas)."""
+    salt = bytes.fromhex(salt_hex)
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 200_000)
+    return dk.hex() == hash_hex
+
+
+def _pico_por_llamada(funcion, args, llamadas: int) -> float:
+    """Memoria transitoria máxima (bytes) que reserva una llamada, en promedio."""
+    funcion(*args)  # calienta cachés del intérprete
+    total = 0
+    tracemalloc.start()
+    for _ in range(llamadas):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        funcion(*args)
+        _, pico = tracemalloc.get_traced_memory()
+        total += pico - base
+    tracemalloc.stop()
+    return total / llamadas
+
+
+def bench_asignaciones(llamadas: int) -> None:
+    """Bytes transitorios por verificación: ruta hex antigua frente a bytes crudos."""
+    password = "Clave-Segura-1!"
+    salt_hex, hash_hex = Trabajofinal._hash_password(password)
+    salt, expected = bytes.fromhex(salt_hex), bytes.fromhex(hash_hex)
+
+    antes = _pico_por_llamada(_verify_hash_hex, (password, salt_hex, hash_hex), llamadas)
+    despues = _pico_por_llamada(Trabajofinal._verify_raw, (password, salt, expected), llamadas)
+    print(f"hex + '==' (antes):          {antes:8.1f} bytes/llamada")
+    print(f"bytes + compare_digest:      {despues:8.1f} bytes/llamada")
+    print(f"reducción:                   {antes - despues:8.1f} bytes/llamada")
+
+
+# ---------- Analizador de fuerza ----------
+def _verificar_contrasena_regex(password: str) -> dict:
+    """Versión anterior de VerificarContrasena (cuatro re.search + lower())."""
+    detalles = []
+    puntuacion = 0
+    if len(password) >= 12:
+        puntuacion += 1
+    else:
+        detalles.append("La contraseña tiene menos de 12 caracteres.")
+    if re.search(r"[A-Z]", password):
+        puntuacion += 1
+    else:
+        detalles.append("Falta letra mayúscula.")
+    if re.search(r"[a-z]", password):
+        puntuacion += 1
+    else:
+        detalles.append("Falta letra minúscula.")
+    if re.search(r"[0-9]", password):
+        puntuacion += 1
+    else:
+        detalles.append("Falta número.")
+    if re.search(r"[^\w\s]", password):
+        puntuacion += 1
+    else:
+        detalles.append("Falta carácter especial (p. ej. !@#$).")
+    if password.lower() in Trabajofinal.COMMON_PASSWORDS:
+        detalles.append("La contraseña es demasiado común.")
+        if puntuacion > 0:
+            puntuacion -= 1
+    return {"fuerte": puntuacion >= 4, "puntuacion": puntuacion, "detalles": detalles}
+
+
+def _check_password_strength_regex(password: str) -> str:
+    """Versión anterior de PasswordManager.check_password_strength (cinco re.search)."""
+    if len(password) < 8:
+        return "Débil: La contraseña debe tener al menos 8 caracteres."
+    if not re.search("[a-z]", password):
+        return "Débil: Debe contener al menos una letra minúscula."
+    if not re.search("[A-Z]", password):
+        return "Débil: Debe contener al menos una letra mayúscula."
+    if not re.search("[0-9]", password):
+        return "Débil: Debe contener al menos un número."
+    if not re.search("[@#$%^&+=]", password):
+        return "Débil: Debe contener al menos un carácter especial."
+    return "Fuerte: La contraseña es segura."
+
+
+def _contrasenas_aleatorias(n: int, semilla: int = 1234) -> list:
+    rnd = random.Random(semilla)
+    alfabeto = string.ascii_letters + string.digits + "!@#$%^&+=_ ñÁ€"
+    comunes = sorted(Trabajofinal.COMMON_PASSWORDS)
+    salida = []
+    for _ in range(n):
+        if rnd.random() < 0.05:
+            salida.append(rnd.choice(comunes).upper() if rnd.random() < 0.5 else rnd.choice(comunes))
+        else:
+            salida.append("".join(rnd.choices(alfabeto, k=rnd.randint(4, 20))))
+    return salida
+
+
+def _contrasenas_por_segundo(funcion, contrasenas) -> float:
+    inicio = time.perf_counter()
+    for password in contrasenas:
+        funcion(password)
+    return len(contrasenas) / (time.perf_counter() - inicio)
+
+
+def bench_fuerza(n: int) -> None:
+    """
+    Contraseñas/seg del analizador de una pasada frente a la cascada de regex.
+    Se mide el camino por defecto (con el estimador de patrones), el mismo sin
+    la comprobación de los extremos (el estimador con cada contraseña que
+    alcanza el umbral) y sin estimador (ESTIMAR_PATRONES = False). La cascada
+    solo cuenta clases, así que la igualdad de resultados se comprueba con el
+    estimador desactivado.
+    """
+    contrasenas = _contrasenas_aleatorias(n)
+    gui = cargar_gestor_gui()
+    manager = gui.PasswordManager()
+    casos = [
+        ("VerificarContrasena", _verificar_contrasena_regex, Trabajofinal.VerificarContrasena,
+         Trabajofinal._get_analizador()),
+        ("check_password_strength", _check_password_strength_regex, manager.check_password_strength,
+         gui._get_analizador()),
+    ]
+    print(f"{'función':<24} {'regex/seg':>12} {'una pasada/seg':>15} {'aceleración':>12} "
+          f"{'sin extremos/seg':>17} {'sin estimador/seg':>18}")
+    for nombre, antes, despues, analizador in casos:
+        tasa_antes = _contrasenas_por_segundo(antes, contrasenas)
+        tasa_despues = _contrasenas_por_segundo(despues, contrasenas)
+        estimador = analizador.estimador
+        con_extremos = [despues(p) for p in contrasenas]
+        estimador.puede_bajar_de = lambda password, puntuacion: True  # el estimador con todas
+        try:
+            assert [despues(p) for p in contrasenas] == con_extremos, \
+                f"{nombre}: la comprobación de los extremos cambia algún resultado"
+            tasa_sin_extremos = _contrasenas_por_segundo(despues, contrasenas)
+        finally:
+            del estimador.puede_bajar_de
+        analizador.estimador = None
+        try:
+            assert all(antes(p) == despues(p) for p in contrasenas), f"{nombre}: resultados distintos"
+            tasa_clases = _contrasenas_por_segundo(despues, contrasenas)
+        finally:
+            analizador.estimador = estimador
+        print(f"{nombre:<24} {tasa_antes:>12.0f} {tasa_despues:>15.0f} {tasa_despues / tasa_antes:>11.2f}x "
+              f"{tasa_sin_extremos:>17.0f} {tasa_clases:>18.0f}")
+
+
+# ---------- Lista de bloqueo en disco ----------
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def bench_lista_bloqueo(entradas: int, consultas: int) -> None:
+    """Latencia de consulta en el índice mmap con `entradas` contraseñas."""
+    with tempfile.TemporaryDirectory() as tmp:
+        wordlist = os.path.join(tmp, "wordlist.txt")
+        indice = os.path.join(tmp, "comunes.idx")
+        with open(wordlist, "w", encoding="utf-8") as f:
+            for i in range(entradas):
+                f.write(f"clave{i}\n")
+
+        inicio = time.perf_counter()
+        construir_lista_bloqueo(wordlist, indice)
+        print(f"construcción: {time.perf_counter() - inicio:.1f} s, "
+              f"{os.path.getsize(indice) / 2**20:.1f} MiB para {entradas} entradas")
+
+        inicio = time.perf_counter()
+        lista = ListaBloqueo(indice)
+        len(lista)  # fuerza la apertura (mmap, sin leer el archivo)
+        print(f"apertura:     {(time.perf_counter() - inicio) * 1e6:.0f} µs")
+
+        rnd = random.Random(42)
+        for nombre, generar, esperado in (
+            ("aciertos", lambda: f"clave{rnd.randrange(entradas)}", True),
+            ("fallos", lambda: f"otra{rnd.randrange(entradas)}", False),
+        ):
+            tiempos = []
+            for _ in range(consultas):
+                password = generar()
+                t0 = time.perf_counter()
+                encontrado = password in lista
+                tiempos.append(time.perf_counter() - t0)
+                assert encontrado is esperado
+            print(f"{nombre:<9} media {sum(tiempos) / len(tiempos) * 1e6:6.2f} µs   "
+                  f"p50 {_percentil(tiempos, 0.5) * 1e6:6.2f} µs   p99 {_percentil(tiempos, 0.99) * 1e6:6.2f} µs")
+        lista.close()
+
+
+# ---------- Filtro de Bloom ----------
+def bench_bloom(entradas: int, consultas: int, tasa_fp: float) -> None:
+    """Consultas de contraseñas no comunes con y sin filtro de Bloom delante del índice."""
+    with tempfile.TemporaryDirectory() as tmp:
+        wordlist = os.path.join(tmp, "wordlist.txt")
+        indice = os.path.join(tmp, "comunes.idx")
+        bloom = os.path.join(tmp, "comunes.bloom")
+        with open(wordlist, "w", encoding="utf-8") as f:
+            for i in range(entradas):
+                f.write(f"clave{i}\n")
+        construir_lista_bloqueo(wordlist, indice)
+        _, tam = construir_filtro_bloom(wordlist, bloom, tasa_fp)
+        print(f"filtro: {tam / 1024:.1f} KiB para {entradas} entradas (fp objetivo {tasa_fp})")
+
+        filtro = FiltroBloom(bloom)
+        sin_filtro = ListaBloqueo(indice)
+        con_filtro = ListaBloqueo(indice, filtro=filtro)
+        fallos = [f"otra{i}" for i in range(consultas)]
+
+        falsos_positivos = sum(1 for p in fallos if p in filtro)
+        print(f"falsos positivos medidos: {falsos_positivos / consultas:.4f}")
+        for nombre, lista in (("sin filtro", sin_filtro), ("con filtro", con_filtro)):
+            inicio = time.perf_counter()
+            for password in fallos:
+                assert password not in lista
+            print(f"{nombre}: {(time.perf_counter() - inicio) / consultas * 1e6:6.2f} µs/consulta (no comunes)")
+        sin_filtro.close()
+        con_filtro.close()
+        filtro.close()
+
+
+# ---------- Estrés: registros concurrentes desde varios procesos ----------
+_KDF_RAPIDO = {"alg": "pbkdf2_sha256", "iteraciones": 1_000}
+
+
+def _estres_trabajador(directorio: str, indice: int, usuarios: int) -> bool:
+    """Registra `usuarios` cuentas propias y compite por la cuenta 'compartido'."""
+    _usar_almacen_temporal(directorio)
+    Trabajofinal.KDF_PARAMS = dict(_KDF_RAPIDO)
+    gano_compartido, _ = Trabajofinal.RegistrarUsuario("compartido", "Compartida-123!")
+    for i in range(usuarios):
+        ok, msg = Trabajofinal.RegistrarUsuario(f"p{indice}-u{i}", f"Clave-{indice}-{i}!")
+        assert ok, msg
+        if indice == 0 and i % 25 == 0:
+            Trabajofinal._get_store().compact()  # reescrituras concurrentes con las altas
+    return gano_compartido
+
+
+def bench_estres(procesos: int, usuarios: int) -> None:
+    """Muchos procesos registran a la vez; se comprueba que no se pierde ningún registro."""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, "users.log")
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            ganadores = list(pool.map(_estres_trabajador, [tmp] * procesos, range(procesos), [usuarios] * procesos))
+        duracion = time.perf_counter() - inicio
+        esperados = procesos * usuarios + 1
+
+        # Simula un fallo a mitad de escritura: la última línea queda cortada.
+        with open(log, "ab") as f:
+            f.write(b'{"u":"cortado","r":{"salt":"00"')
+        store = UserStore(log)
+        assert "cortado" not in store
+        assert store.add("tras-fallo", {"salt": "00", "hash": "00"})
+        store.close()
+
+        store = UserStore(log)
+        faltan = [f"p{p}-u{i}" for p in range(procesos) for i in range(usuarios) if f"p{p}-u{i}" not in store]
+        total = len(store)
+        store.close()
+        with open(log, "rb") as f:
+            for linea in f:
+                json.loads(linea)  # todas las líneas completas y válidas
+
+        print(f"{procesos} procesos x {usuarios} altas en {duracion:.2f} s "
+              f"({procesos * usuarios / duracion:.0f} altas/seg)")
+        print(f"registros: {total} (esperados {esperados + 1}), perdidos: {len(faltan)}, "
+              f"ganadores de 'compartido': {sum(ganadores)}")
+        assert not faltan and total == esperados + 1 and sum(ganadores) == 1
+        print("OK: ningún registro perdido, alta única respetada y cola cortada recuperada.")
+
+
+# ---------- Servicio asyncio: latencia de login según concurrencia ----------
+async def _carga_login(servicio, pares: list, concurrencia: int, peticiones: int) -> list:
+    latencias = []
+    siguiente = iter(range(peticiones))
+
+    async def cliente():
+        for i in siguiente:
+            username, password = pares[i % len(pares)]
+            t0 = time.perf_counter()
+            assert await servicio.autenticar(username, password)
+            latencias.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+    return latencias
+
+
+async def _bench_servicio(peticiones: int, iteraciones: int) -> None:
+    from servicio_async import ServicioAutenticacion
+
+    servicio = ServicioAutenticacion()
+    pares = []
+    for i in range(16):
+        pares.append((f"user{i}", f"Clave-Segura-{i}!"))
+        await servicio.registrar(*pares[-1])
+    print(f"{servicio.workers} procesos, máx. {servicio.max_en_vuelo} en vuelo, "
+          f"PBKDF2 {iteraciones} iteraciones")
+    print(f"{'concurrencia':>12} {'logins/seg':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    concurrencia = 1
+    while concurrencia <= 64:
+        inicio = time.perf_counter()
+        latencias = await _carga_login(servicio, pares, concurrencia, peticiones)
+        duracion = time.perf_counter() - inicio
+        print(f"{concurrencia:>12} {peticiones / duracion:>11.1f} "
+              f"{_percentil(latencias, 0.5) * 1e3:>8.1f} {_percentil(latencias, 0.99) * 1e3:>8.1f}")
+        concurrencia *= 4
+    await servicio.cerrar()
+
+
+def bench_servicio(peticiones: int, iteraciones: int) -> None:
+    """Latencia p50/p99 de ServicioAutenticacion.autenticar con concurrencia creciente."""
+    with tempfile.TemporaryDirectory() as tmp:
+        _usar_almacen_temporal(tmp)
+        Trabajofinal.KDF_PARAMS = {"alg": "pbkdf2_sha256", "iteraciones": iteraciones}
+        # la carga repite usuarios a propósito: sin límite de intentos
+        Trabajofinal.LIMITADOR = LimitadorIntentos(por_usuario=(float("inf"), 0), por_origen=(float("inf"), 0))
+        asyncio.run(_bench_servicio(peticiones, iteraciones))
+
+
+# ---------- Limitador de intentos ----------
+def bench_limitador(intentos: int) -> None:
+    """Coste de rechazar un intento limitado frente a verificar la contraseña."""
+    with tempfile.TemporaryDirectory() as tmp:
+        _usar_almacen_temporal(tmp)
+        Trabajofinal.RegistrarUsuario("victima", "Clave-Segura-1!")
+        Trabajofinal.LIMITADOR = LimitadorIntentos()
+        while Trabajofinal.LIMITADOR.permitir("victima", "10.0.0.1"):
+            pass  # agota las fichas
+
+        inicio = time.perf_counter()
+        for _ in range(intentos):
+            assert not Trabajofinal.AutenticarUsuario("victima", "mala", origen="10.0.0.1")
+        rechazo = (time.perf_counter() - inicio) / intentos
+
+        inicio = time.perf_counter()
+        Trabajofinal._verify_raw("mala", b"\0" * 16, b"\0" * 32, Trabajofinal.KDF_PARAMS)
+        kdf = time.perf_counter() - inicio
+        print(f"rechazo por límite: {rechazo * 1e6:8.2f} µs/intento")
+        print(f"verificación KDF:   {kdf * 1e6:8.0f} µs/intento ({kdf / rechazo:,.0f}x más caro)")
+
+        # memoria acotada: un rociado de usuarios inventados no hace crecer la tabla
+        limitador = LimitadorIntentos(max_claves=10_000)
+        for i in range(100_000):
+            limitador.permitir(f"inventado{i}", f"10.0.{i % 256}.{i // 256 % 256}")
+        print(f"claves retenidas tras 100000 usuarios distintos: {len(limitador._usuarios)} (máx. 10000)")
+
+
+# ---------- Formato del registro: JSON frente a binario ----------
+def _registros_sinteticos(n: int) -> dict:
+    """Registros con la misma forma que los de RegistrarUsuario (sin pagar el KDF)."""
+    rnd = random.Random(7)
+    kdf = dict(Trabajofinal.KDF_PARAMS)
+    return {
+        f"usuario{i}": {
+            "salt": rnd.randbytes(16).hex(),
+            "hash": rnd.randbytes(32).hex(),
+            "kdf": dict(kdf),
+            "evaluacion": Trabajofinal.VerificarContrasena(password),
+        }
+        for i, password in enumerate(_contrasenas_aleatorias(n))
+    }
+
+
+def bench_formato(usuarios: int) -> None:
+    """Bytes por usuario y tiempo de carga: users.json (indent=2), registro JSON y registro binario."""
+    registros = _registros_sinteticos(usuarios)
+    with tempfile.TemporaryDirectory() as tmp:
+        users_json = os.path.join(tmp, "users.json")
+        with open(users_json, "w", encoding="utf-8") as f:
+            json.dump(registros, f, indent=2)
+
+        def cargar_json():
+            with open(users_json, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        casos = [("users.json", users_json, None, cargar_json)]
+        for formato in ("json", "binario"):
+            log = os.path.join(tmp, f"users.{formato}.log")
+            store = UserStore(log, durable=False, formato=formato)
+            store.put_many(registros.items())
+            store.close()
+            casos.append((f"registro {formato}", log, formato, None))
+
+        print(f"{'formato':<18} {'bytes/usuario':>13} {'apertura':>10} {'carga completa':>15}")
+        for nombre, path, formato, cargar in casos:
+            tam = os.path.getsize(path) / usuarios
+            if cargar is None:
+                inicio = time.perf_counter()
+                store = UserStore(path, formato=formato)
+                apertura = time.perf_counter() - inicio
+                cargados = dict(store.items())
+                completa = time.perf_counter() - inicio
+                store.close()
+                apertura_txt = f"{apertura:>9.2f}s"
+            else:
+                inicio = time.perf_counter()
+                cargados = cargar()
+                completa = time.perf_counter() - inicio
+                apertura_txt = f"{'-':>10}"
+            assert cargados == registros, f"{nombre}: la conversión no es sin pérdidas"
+            print(f"{nombre:<18} {tam:>13.1f} {apertura_txt} {completa:>14.2f}s")
+
+
+# ---------- Auditoría masiva ----------
+def bench_auditoria(n: int) -> None:
+    """
+    Filas/seg de la auditoría en bloque frente a una llamada por contraseña
+    (analizar(), con el estimador). En bloque se mide el modo por defecto,
+    que da exactamente lo mismo que analizar(), y --rapido (solo clases).
+    """
+    contrasenas = _contrasenas_aleatorias(n)
+    gui = cargar_gestor_gui()
+    politicas = [("VerificarContrasena", Trabajofinal._get_analizador()),
+                 ("check_password_strength", gui._get_analizador())]
+    with tempfile.TemporaryDirectory() as tmp:
+        candidatos = os.path.join(tmp, "candidatos.txt")
+        with open(candidatos, "w", encoding="utf-8") as f:
+            f.write("\n".join(contrasenas) + "\n")
+
+        print(f"{'política':<24} {'por fila/seg':>13} {'en bloque/seg':>14} {'aceleración':>12} "
+              f"{'--rapido/seg':>13} {'aceleración':>12}")
+        for nombre, analizador in politicas:
+            exacto = AuditorMasivo(analizador)
+            resultado = exacto.auditar(contrasenas)
+            assert all(exacto.como_dict(resultado, i) == analizador.analizar(p)
+                       for i, p in enumerate(contrasenas)), f"{nombre}: resultados distintos"
+            por_fila = _contrasenas_por_segundo(analizador.analizar, contrasenas)
+            exacto = AuditorMasivo(analizador)  # caché vacía: no reutiliza la comprobación
+            en_bloque = resumir(exacto, exacto.auditar_archivo(candidatos))["filas_por_segundo"]
+            rapido = AuditorMasivo(analizador, rapido=True)
+            solo_clases = resumir(rapido, rapido.auditar_archivo(candidatos))["filas_por_segundo"]
+            print(f"{nombre:<24} {por_fila:>13.0f} {en_bloque:>14.0f} {en_bloque / por_fila:>11.2f}x "
+                  f"{solo_clases:>13.0f} {solo_clases / por_fila:>11.2f}x")
+
+
+# ---------- Estimador de patrones ----------
+def _contrasenas_humanas(n: int, semilla: int = 99) -> list:
+    """Contraseñas con los patrones que usa la gente: palabra + año/número + símbolo, teclado, fechas."""
+    rnd = random.Random(semilla)
+    palabras = ["password", "Clave", "dragon", "Sunshine", "barcelona", "Maria", "tequiero", "Futbol"]
+    salida = []
+    for _ in range(n):
+        tipo = rnd.randrange(5)
+        if tipo == 0:
+            salida.append(rnd.choice(palabras) + str(rnd.randint(0, 2025)) + rnd.choice("!.#$"))
+        elif tipo == 1:
+            salida.append(rnd.choice(["qwerty", "Asdfgh", "zxcvbnm", "1qaz2wsx"]) + str(rnd.randint(0, 999)))
+        elif tipo == 2:
+            salida.append(f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/{rnd.randint(1950, 2020)}")
+        elif tipo == 3:
+            salida.append(rnd.choice("abcxyz1234") * rnd.randint(3, 8) + rnd.choice(palabras))
+        else:
+            salida.append("".join(rnd.choices(string.ascii_letters + string.digits + "!@#$%", k=rnd.randint(8, 20))))
+    return salida
+
+
+def bench_estimador(n: int) -> None:
+    """Coste de construir las tablas una vez y latencia de una estimación."""
+    inicio = time.perf_counter()
+    estimador = EstimadorPatrones()
+    print(f"construcción de tablas: {(time.perf_counter() - inicio) * 1e3:.1f} ms (una vez por proceso)")
+    print(f"{'contraseñas':<12} {'media':>10} {'p50':>10} {'p99':>10} {'máx':>10} {'puntuación 0-4':>22}")
+    for nombre, contrasenas in (("humanas", _contrasenas_humanas(n)), ("aleatorias", _contrasenas_aleatorias(n))):
+        tiempos, puntuaciones = [], [0] * 5
+        for password in contrasenas:
+            t0 = time.perf_counter()
+            estimacion = estimador.estimar(password)
+            tiempos.append(time.perf_counter() - t0)
+            puntuaciones[estimacion.puntuacion] += 1
+        print(f"{nombre:<12} {sum(tiempos) / len(tiempos) * 1e6:>8.0f}µs {_percentil(tiempos, 0.5) * 1e6:>8.0f}µs "
+              f"{_percentil(tiempos, 0.99) * 1e6:>8.0f}µs {max(tiempos) * 1e6:>8.0f}µs "
+              f"{' '.join(f'{c:>4}' for c in puntuaciones):>22}")
+
+    print("\nclases de carácter frente a estimador (VerificarContrasena):")
+    analizador = Trabajofinal._get_analizador()
+    for password in ("Password1!", "Password123!", "Qwerty12345!", "Barcelona2024!", "Clave-Muy-Segura-91!"):
+        estimador_activo, analizador.estimador = analizador.estimador, None
+        try:
+            solo_clases = analizador.analizar(password)["fuerte"]
+        finally:
+            analizador.estimador = estimador_activo
+        estimacion = estimador.estimar(password)
+        print(f"  {password:<22} clases: {'fuerte' if solo_clases else 'débil':<7} "
+              f"estimador: {estimacion.intentos:9.2e} intentos, puntuación {estimacion.puntuacion}")
+
+
+# ---------- Bóveda cifrada ----------
+def _ops(nombre: str, operaciones: int, funcion) -> None:
+    inicio = time.perf_counter()
+    funcion()
+    segundos = time.perf_counter() - inicio
+    print(f"{nombre:<42} {operaciones / segundos:>12.0f} ops/s")
+
+
+def bench_boveda(servicios: int, hilos: int) -> None:
+    """Operaciones/seg de la bóveda con `servicios` credenciales: una a una frente a lotes."""
+    from cryptography.fernet import Fernet
+
+    rnd = random.Random(7)
+    credenciales = {f"servicio-{i:07d}": "".join(rnd.choices(string.ascii_letters + string.digits, k=16))
+                    for i in range(servicios)}
+    nombres = list(credenciales)
+    muestra = rnd.sample(nombres, min(servicios, 10_000))
+    clave = Fernet.generate_key()
+    fernet = Fernet(clave)
+    valores = [v.encode() for v in credenciales.values()]
+
+    print(f"{servicios} servicios, {hilos} hilos")
+    tokens = []
+    _ops("cifrar: Fernet.encrypt", servicios, lambda: tokens.extend(fernet.encrypt(v) for v in valores))
+    _ops("descifrar: Fernet.decrypt", servicios, lambda: [fernet.decrypt(t) for t in tokens])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        key_path = os.path.join(tmp, "clave.key")
+        with open(key_path, "wb") as f:
+            f.write(clave)
+        with Boveda(os.path.join(tmp, "contraseñas.db"), key_path, conexiones=hilos) as boveda:
+            _ops("guardar uno a uno (10k)", len(muestra),
+                 lambda: [boveda.guardar(s, credenciales[s]) for s in muestra])
+            _ops("guardar_lote", servicios, lambda: boveda.guardar_lote(credenciales))
+            _ops("obtener uno a uno (10k)", len(muestra), lambda: [boveda.obtener(s) for s in muestra])
+            _ops("obtener_lote", servicios, lambda: boveda.obtener_lote(nombres))
+            assert boveda.obtener_lote(muestra) == {s: credenciales[s] for s in muestra}
+
+            tramos = [nombres[i:i + 1000] for i in range(0, servicios, 1000)]
+            with ThreadPoolExecutor(hilos) as pool:
+                _ops(f"obtener_lote de 1000 en {hilos} hilos", servicios,
+                     lambda: list(pool.map(boveda.obtener_lote, tramos)))
+                _ops(f"obtener uno a uno en {hilos} hilos (10k)", len(muestra),
+                     lambda: list(pool.map(boveda.obtener, muestra)))
+
+
+def bench_boveda_cifrada(tamano_mb: int, entrada_kb: int, lecturas: int) -> None:
+    """Lecturas aleatorias en una bóveda por trozos de `tamano_mb` MiB frente a descifrarla entera."""
+    entradas = max(1, (tamano_mb << 10) // entrada_kb)
+    base = os.urandom(entrada_kb << 10)
+    claves = ClavesSesion()
+    rnd = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        vault, salt = os.path.join(tmp, "vault.enc"), os.path.join(tmp, "vault.salt")
+        inicio = time.perf_counter()
+        with BovedaCifrada("frase de prueba", vault, salt, claves=claves, durable=False) as boveda:
+            print(f"KDF ({boveda._config['kdf']['alg']}): {time.perf_counter() - inicio:.2f} s")
+            inicio = time.perf_counter()
+            for i in range(entradas):
+                boveda.escribir(f"entrada-{i}", i.to_bytes(8, "big") + base[8:])
+            segundos = time.perf_counter() - inicio
+        tam = os.path.getsize(vault)
+        print(f"escritura: {entradas} entradas de {entrada_kb} KiB, {tam / 2**20:.0f} MiB "
+              f"en {segundos:.1f} s ({tam / 2**20 / segundos:.0f} MiB/s)")
+
+        inicio = time.perf_counter()
+        boveda = BovedaCifrada("frase de prueba", vault, salt, claves=claves)
+        print(f"apertura con la clave de la sesión (solo cabeceras): {(time.perf_counter() - inicio) * 1e3:.1f} ms")
+        with boveda:
+            for nombre, leer in (
+                (f"entrada completa ({entrada_kb} KiB)", lambda n: boveda.leer(n)),
+                ("rango de 4 KiB", lambda n: boveda.leer_rango(n, rnd.randrange(entrada_kb << 10), 4096)),
+            ):
+                tiempos = []
+                for _ in range(lecturas):
+                    i = rnd.randrange(entradas)
+                    t0 = time.perf_counter()
+                    datos = leer(f"entrada-{i}")
+                    tiempos.append(time.perf_counter() - t0)
+                    assert datos
+                print(f"{nombre:<28} p50 {_percentil(tiempos, 0.5) * 1e3:7.3f} ms   "
+                      f"p99 {_percentil(tiempos, 0.99) * 1e3:7.3f} ms")
+            assert boveda.leer("entrada-0")[:8] == bytes(8)
+
+            # Referencia: una bóveda de un solo bloque obliga a descifrarlo todo para leer una entrada
+            inicio = time.perf_counter()
+            total = sum(len(boveda.leer(f"entrada-{i}")) for i in range(entradas))
+            segundos = time.perf_counter() - inicio
+            print(f"descifrar la bóveda entera ({total / 2**20:.0f} MiB): {segundos:.2f} s")
+
+
+# ---------- Rotación de la clave de la bóveda ----------
+def _lecturas_concurrentes(boveda: Boveda, nombres: list, hilos: int, seguir) -> list:
+    """Latencias de boveda.obtener desde `hilos` lectores mientras seguir() sea cierto."""
+    tiempos: list = []
+
+    def lector(semilla: int) -> None:
+        rnd, propios = random.Random(semilla), []
+        while seguir():
+            servicio = rnd.choice(nombres)
+            t0 = time.perf_counter()
+            boveda.obtener(servicio)
+            propios.append(time.perf_counter() - t0)
+        tiempos.extend(propios)
+
+    lectores = [threading.Thread(target=lector, args=(i,)) for i in range(hilos)]
+    for t in lectores:
+        t.start()
+    for t in lectores:
+        t.join()
+    return tiempos
+
+
+def _rotacion_trabajador(db_path: str, key_path: str, lote: int) -> None:
+    """Rota la clave en un proceso aparte (el benchmark lo mata a mitad)."""
+    with Boveda(db_path, key_path) as boveda:
+        boveda.rotar_clave(lote, en_segundo_plano=False)
+
+
+def bench_rotacion(servicios: int, lote: int, hilos: int) -> None:
+    """Filas/seg re-cifradas y latencia de lectura antes y durante la rotación; después, caída y reanudación."""
+    rnd = random.Random(11)
+    credenciales = {f"servicio-{i:07d}": "".join(rnd.choices(string.ascii_letters + string.digits, k=16))
+                    for i in range(servicios)}
+    nombres = list(credenciales)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path, key_path = os.path.join(tmp, "contraseñas.db"), os.path.join(tmp, "clave.key")
+        with Boveda(db_path, key_path, conexiones=hilos + 1) as boveda:
+            boveda.guardar_lote(credenciales)
+            print(f"{servicios} servicios, lotes de {lote}, {hilos} lectores")
+
+            fin = time.perf_counter() + 3.0
+            tiempos = _lecturas_concurrentes(boveda, nombres, hilos, lambda: time.perf_counter() < fin)
+            print(f"{'lecturas sin rotación':<26} p50 {_percentil(tiempos, 0.5) * 1e3:7.3f} ms   "
+                  f"p99 {_percentil(tiempos, 0.99) * 1e3:7.3f} ms   {len(tiempos) / 3.0:8.0f} lecturas/s")
+
+            inicio = time.perf_counter()
+            rotador = boveda.rotar_clave(lote)
+            tiempos = _lecturas_concurrentes(boveda, nombres, hilos, rotador.is_alive)
+            rotador.join()
+            segundos = time.perf_counter() - inicio
+            assert rotador.error is None and rotador.completada, rotador.error
+            print(f"{'lecturas durante rotación':<26} p50 {_percentil(tiempos, 0.5) * 1e3:7.3f} ms   "
+                  f"p99 {_percentil(tiempos, 0.99) * 1e3:7.3f} ms   {len(tiempos) / segundos:8.0f} lecturas/s")
+            print(f"rotación: {rotador.recifradas} filas en {segundos:.2f} s "
+                  f"({rotador.recifradas / segundos:.0f} filas/s)")
+            assert boveda.pendientes_rotacion() == 0 and boveda.todas() == credenciales
+            print(f"claves retiradas: {boveda.retirar_claves()}")
+
+        # Caída a mitad de rotación (kill -9) y reanudación desde el cursor guardado
+        proceso = multiprocessing.Process(target=_rotacion_trabajador, args=(db_path, key_path, lote))
+        proceso.start()
+        with Boveda(db_path, key_path) as boveda:
+            while proceso.is_alive():
+                boveda._cargar_claves()
+                if boveda.version == 2 and boveda.pendientes_rotacion() < servicios // 2:
+                    break
+                time.sleep(0.01)
+            proceso.kill()
+            proceso.join()
+            boveda._cargar_claves()
+            pendientes = boveda.pendientes_rotacion()
+            print(f"proceso de rotación matado con {pendientes} filas pendientes "
+                  f"(cursor en {boveda._cursor_rotacion()!r})")
+            inicio = time.perf_counter()
+            rotador = boveda.reanudar_rotacion(lote, en_segundo_plano=False)
+            assert rotador.error is None and rotador.completada, rotador.error
+            print(f"reanudada: {rotador.recifradas} filas en {time.perf_counter() - inicio:.2f} s")
+            assert boveda.pendientes_rotacion() == 0 and boveda.todas() == credenciales
+            print("todas las filas en la versión", boveda.version, "y descifran bien")
+
+
+# ---------- Interfaz gráfica sin pantalla ----------
+class _BucleTkSimulado:
+    """
+    Sustituto sin pantalla del bucle de eventos de Tk: after() agenda
+    callbacks que procesar() ejecuta en este hilo, como haría mainloop().
+    Un "fotograma" cada 16 ms mide cuánto se retrasa el hilo de la interfaz.
+    """
+
+    def __init__(self):
+        self._agenda: list = []
+        self._orden = 0
+        self.retrasos: list = []
+        self.bloqueo_maximo = 0.0
+        self._fotograma_previsto = 0.0
+
+    def after(self, ms: int, callback) -> None:
+        self._orden += 1
+        heapq.heappush(self._agenda, (time.perf_counter() + ms / 1000, self._orden, callback))
+
+    def _fotograma(self, previsto: float) -> None:
+        self.retrasos.append(time.perf_counter() - previsto)
+        self._programar_fotograma()
+
+    def _programar_fotograma(self) -> None:
+        self._fotograma_previsto = time.perf_counter() + 0.016
+        self.after(16, lambda t=self._fotograma_previsto: self._fotograma(t))
+
+    def procesar(self, terminado) -> float:
+        """Ejecuta el bucle hasta que terminado() sea cierto; devuelve los segundos transcurridos."""
+        inicio = time.perf_counter()
+        self._programar_fotograma()
+        while not terminado():
+            previsto, _, callback = self._agenda[0]
+            espera = previsto - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)  # Tk también duerme esperando eventos (sin retener el GIL)
+            heapq.heappop(self._agenda)
+            t0 = time.perf_counter()
+            callback()
+            self.bloqueo_maximo = max(self.bloqueo_maximo, time.perf_counter() - t0)
+        # El fotograma pendiente también cuenta: si el trabajo bloqueó el bucle, llega tarde
+        self.retrasos.append(max(0.0, time.perf_counter() - self._fotograma_previsto))
+        self._agenda.clear()
+        return time.perf_counter() - inicio
+
+
+def bench_gui(registros: int, usuarios: int) -> None:
+    """
+    Bloqueo del hilo de la interfaz al registrar (con el KDF real) y al
+    generar alertas: llamada directa desde el botón frente a TareasSegundoPlano.
+    """
+    gui = cargar_gestor_gui()
+    contrasenas = _contrasenas_humanas(usuarios)
+    print(f"KDF {gui.KDF_PARAMS}, {registros} registros, alertas sobre {usuarios} usuarios")
+    print(f"{'operación':<30} {'modo':<16} {'total':>8} {'bloqueo máx':>12} {'retraso p99':>12} {'fotogramas':>11}")
+
+    def poblar(manager):
+        # Las cuentas de las alertas se dan de alta con un KDF rápido: solo importa su evaluación
+        kdf, manager.kdf = manager.kdf, _KDF_RAPIDO
+        for i, password in enumerate(contrasenas):
+            manager.register_user(f"u{i}", password)
+        manager.kdf = kdf
+
+    for nombre, preparar, trabajo, progreso in (
+        ("registrar (KDF)", lambda m: None,
+         lambda m: [m.register_user(f"u{i}", f"Clave-{i}!") for i in range(registros)], False),
+        ("generar alertas", poblar, lambda m, progreso=None: m.generate_alerts(progreso), True),
+    ):
+        for modo in ("directo", "en segundo plano"):
+            tmp = tempfile.TemporaryDirectory()
+            manager = gui.PasswordManager(os.path.join(tmp.name, "usuarios_gui.log"), durable=False)
+            preparar(manager)
+            bucle = _BucleTkSimulado()
+            hecho: list = []
+            if modo == "directo":
+                bucle.after(0, lambda: hecho.append(trabajo(manager)))
+            else:
+                tareas = gui.TareasSegundoPlano(bucle)
+                avances: list = []
+                bucle.after(0, lambda: tareas.ejecutar(
+                    trabajo, manager, al_terminar=hecho.append, al_fallar=hecho.append,
+                    al_progresar=(lambda h, t: avances.append(h)) if progreso else None))
+            segundos = bucle.procesar(lambda: bool(hecho))
+            if modo != "directo":
+                tareas.cerrar()
+                assert not isinstance(hecho[0], Exception), hecho[0]
+                if progreso:
+                    assert avances, "no llegó ningún avance"
+            print(f"{nombre:<30} {modo:<16} {segundos:>7.2f}s {bucle.bloqueo_maximo * 1e3:>10.1f}ms "
+                  f"{_percentil(bucle.retrasos, 0.99) * 1e3:>10.1f}ms {len(bucle.retrasos):>11}")
+            manager.close()
+            tmp.cleanup()
+
+
+def bench_vistas(usuarios: int, consultas: int) -> None:
+    """
+    Mostrar usuarios y alertas del gestor de la interfaz: re-evaluar todas
+    las contraseñas y construir el texto completo frente al índice de
+    cuentas débiles del almacén y páginas del índice ordenado.
+    """
+    gui = cargar_gestor_gui()
+    contrasenas = _contrasenas_humanas(usuarios)
+    rnd = random.Random(3)
+    nombres = [f"{rnd.choice(string.ascii_lowercase)}{rnd.choice(string.ascii_lowercase)}usuario{i}"
+               for i in range(usuarios)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "usuarios_gui.log")
+        manager = gui.PasswordManager(path, kdf=_KDF_RAPIDO, durable=False)
+        inicio = time.perf_counter()
+        for nombre, password in zip(nombres, contrasenas):
+            manager.register_user(nombre, password)
+        manager.close()
+        print(f"{usuarios} usuarios registrados (KDF rápido) en {time.perf_counter() - inicio:.2f} s")
+
+        inicio = time.perf_counter()
+        manager = gui.PasswordManager(path)
+        print(f"{'crear PasswordManager':<34} {(time.perf_counter() - inicio) * 1e3:8.2f} ms")
+        inicio = time.perf_counter()
+        total = len(manager.users)
+        print(f"{'abrir el almacén (primer uso)':<34} {(time.perf_counter() - inicio) * 1e3:8.2f} ms  {total} usuarios")
+
+        # Antes: generate_alerts re-evaluaba cada contraseña en cada llamada
+        inicio = time.perf_counter()
+        debiles = sum(not gui._get_analizador().analizar(p)["fuerte"] for p in contrasenas)
+        print(f"{'alertas: re-evaluar todas':<34} {(time.perf_counter() - inicio) * 1e3:8.2f} ms  {debiles} débiles")
+        inicio = time.perf_counter()
+        assert manager.revisar_alertas() == debiles
+        print(f"{'alertas: índice de débiles':<34} {(time.perf_counter() - inicio) * 1e3:8.2f} ms")
+
+        inicio = time.perf_counter()
+        texto = "\n".join(manager.get_users())
+        print(f"{'usuarios: texto completo':<34} {(time.perf_counter() - inicio) * 1e3:8.2f} ms  "
+              f"{len(texto.encode()) / 2**20:.1f} MiB")
+        inicio = time.perf_counter()
+        texto = "\n".join(manager.generate_alerts())
+        print(f"{'alertas: texto completo':<34} {(time.perf_counter() - inicio) * 1e3:8.2f} ms  "
+              f"{len(texto.encode()) / 2**20:.1f} MiB")
+
+        prefijos = ["".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(0, 3))) for _ in range(consultas)]
+        for nombre, contar, pagina in (("usuarios", manager.contar_usuarios, manager.usuarios_pagina),
+                                       ("alertas", manager.contar_alertas, manager.alertas_pagina)):
+            tiempos = []
+            for prefijo in prefijos:
+                t0 = time.perf_counter()
+                total = contar(prefijo)
+                filas = pagina(prefijo, rnd.randrange(max(total, 1)), 20)
+                tiempos.append(time.perf_counter() - t0)
+                assert len(filas) <= 20
+            print(f"{nombre + ': página de 20 por prefijo':<34} p50 {_percentil(tiempos, 0.5) * 1e6:6.1f} µs   "
+                  f"p99 {_percentil(tiempos, 0.99) * 1e6:6.1f} µs")
+        manager.close()
+
+
+# ---------- Arranque ----------
+def _tiempo_importacion(codigo: str, modulo: str, cwd: str) -> int:
+    """µs acumulados de importar `modulo` según `python -X importtime` (en un proceso nuevo)."""
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=cwd,
+                            capture_output=True, text=True, check=True).stderr
+    for linea in salida.splitlines():
+        campos = [c.strip() for c in linea.split("|")]
+        if len(campos) == 3 and campos[2] == modulo:
+            return int(campos[1])
+    raise RuntimeError(f"{modulo} no aparece en -X importtime:\n{salida}")
+
+
+def _tiempo_proceso(codigo: str, cwd: str) -> float:
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, "-c", codigo], cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - inicio
+
+
+def bench_arranque(repeticiones: int, usuarios: int) -> None:
+    """
+    Coste de arranque de los dos puntos de entrada, en procesos nuevos:
+    importación según -X importtime (la mediana es el número a seguir),
+    módulos cargados y un proceso completo que solo lista usuarios.
+    """
+    aqui = os.path.dirname(os.path.abspath(__file__))
+    ruta_gui = os.path.dirname(RUTA_GESTOR_GUI)
+    ruta = f"import sys; sys.path[:0] = [{aqui!r}, {ruta_gui!r}]; "
+    with tempfile.TemporaryDirectory() as tmp:
+        store = UserStore(os.path.join(tmp, "users.log"), durable=False)
+        store.put_many(_registros_sinteticos(usuarios).items())
+        store.close()
+        casos = [
+            ("import Trabajofinal", "Trabajofinal", ruta + "import Trabajofinal",
+             ruta + "import Trabajofinal; print(len(Trabajofinal.listar_usuarios()))"),
+            ("import gestor de la interfaz", "Trabajo_Final_contraseñas_seguras",
+             ruta + "import Trabajo_Final_contraseñas_seguras",
+             ruta + "import Trabajo_Final_contraseñas_seguras as g; print(len(g.PasswordManager().get_users()))"),
+        ]
+        print(f"{repeticiones} procesos por caso, {usuarios} usuarios en el almacén")
+        print(f"{'caso':<30} {'importación p50':>16} {'mín':>9} {'módulos':>8} {'listar (proceso) p50':>21}")
+        for nombre, modulo, importar, listar in casos:
+            _tiempo_importacion(importar, modulo, tmp)  # calienta la caché de .pyc
+            tiempos = sorted(_tiempo_importacion(importar, modulo, tmp) for _ in range(repeticiones))
+            modulos = subprocess.run([sys.executable, "-c", importar + "; print(len(sys.modules))"], cwd=tmp,
+                                     capture_output=True, text=True, check=True).stdout.split()[-1]
+            procesos = sorted(_tiempo_proceso(listar, tmp) for _ in range(repeticiones))
+            print(f"{nombre:<30} {tiempos[len(tiempos) // 2] / 1e3:>13.1f} ms {tiempos[0] / 1e3:>6.1f} ms "
+                  f"{modulos:>8} {procesos[len(procesos) // 2] * 1e3:>18.1f} ms")
+
+
+# ---------- Línea de comandos ----------
+def _ejecutar_cli(argumentos: list, entrada: str, cwd: str) -> list:
+    """Ejecuta `Trabajofinal.py <argumentos>` con `entrada` en stdin y devuelve las líneas JSONL."""
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Trabajofinal.py")
+    salida = subprocess.run([sys.executable, ruta, *argumentos], input=entrada, cwd=cwd,
+                            capture_output=True, text=True).stdout
+    return [json.loads(linea) for linea in salida.splitlines()]
+
+
+def bench_cli(operaciones: int, muestra: int) -> None:
+    """
+    Operaciones/seg de la línea de comandos: todas en un proceso (por lotes)
+    frente a un proceso por operación, que es lo que obligaba el menú
+    interactivo. Lo segundo se mide con `muestra` procesos y se extrapola.
+    """
+    pares = [json.dumps({"username": f"usuario{i:06d}", "password": f"Clave-{i:06d}-Segura!"})
+             for i in range(operaciones)]
+    entrada = "\n".join(pares) + "\n"
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "kdf.json"), "w", encoding="utf-8") as f:
+            json.dump(_KDF_RAPIDO, f)
+        print(f"{operaciones} operaciones, KDF {_KDF_RAPIDO['alg']} con {_KDF_RAPIDO['iteraciones']} iteraciones")
+        for sub in ("register", "auth"):
+            inicio = time.perf_counter()
+            resultados = _ejecutar_cli([sub], entrada, tmp)
+            lote = time.perf_counter() - inicio
+            assert len(resultados) == operaciones and all(r.get("ok") for r in resultados), sub
+            # register necesita usuarios nuevos; auth repite los ya registrados
+            sueltos = [json.dumps({"username": f"suelto{i:06d}", "password": f"Clave-{i:06d}-Segura!"})
+                       for i in range(muestra)] if sub == "register" else pares[:muestra]
+            inicio = time.perf_counter()
+            for par in sueltos:
+                _ejecutar_cli([sub, "--workers", "1"], par + "\n", tmp)
+            por_proceso = (time.perf_counter() - inicio) / muestra
+            print(f"{sub:<9} un proceso: {operaciones / lote:9.0f} ops/s ({lote:6.2f} s)   "
+                  f"un proceso por operación: {1 / por_proceso:6.1f} ops/s "
+                  f"(~{por_proceso * operaciones:7.1f} s estimados)   x{por_proceso * operaciones / lote:.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("autenticacion", help="auths/seg de AutenticarUsuarios frente a núcleos")
+    p.add_argument("--usuarios", type=int, default=64)
+
+    p = sub.add_parser("asignaciones", help="memoria transitoria por verificación (hex frente a bytes)")
+    p.add_argument("--llamadas", type=int, default=20)
+
+    p = sub.add_parser("fuerza", help="throughput del analizador de fuerza frente a la cascada de regex")
+    p.add_argument("--contrasenas", type=int, default=200_000)
+
+    p = sub.add_parser("lista_bloqueo", help="latencia de consulta en la lista de bloqueo mmap")
+    p.add_argument("--entradas", type=int, default=10_000_000)
+    p.add_argument("--consultas", type=int, default=100_000)
+
+    p = sub.add_parser("bloom", help="consultas con y sin filtro de Bloom delante de la lista de bloqueo")
+    p.add_argument("--entradas", type=int, default=1_000_000)
+    p.add_argument("--consultas", type=int, default=100_000)
+    p.add_argument("--fp", type=float, default=0.01)
+
+    p = sub.add_parser("estres", help="altas concurrentes desde varios procesos (prueba de integridad)")
+    p.add_argument("--procesos", type=int, default=8)
+    p.add_argument("--usuarios", type=int, default=200)
+
+    p = sub.add_parser("servicio", help="latencia p50/p99 de login en el servicio asyncio")
+    p.add_argument("--peticiones", type=int, default=128)
+    p.add_argument("--iteraciones", type=int, default=200_000)
+
+    p = sub.add_parser("limitador", help="coste de rechazar un intento limitado")
+    p.add_argument("--intentos", type=int, default=100_000)
+
+    p = sub.add_parser("formato", help="bytes/usuario y tiempo de carga: JSON frente a binario")
+    p.add_argument("--usuarios", type=int, default=200_000)
+
+    p = sub.add_parser("auditoria", help="filas/seg de la auditoría en bloque frente a una llamada por fila")
+    p.add_argument("--contrasenas", type=int, default=1_000_000)
+
+    p = sub.add_parser("estimador", help="latencia por estimación del estimador de patrones")
+    p.add_argument("--contrasenas", type=int, default=20_000)
+
+    p = sub.add_parser("boveda", help="ops/seg de la bóveda cifrada: una a una frente a lotes y varios hilos")
+    p.add_argument("--servicios", type=int, default=100_000)
+    p.add_argument("--hilos", type=int, default=4)
+
+    p = sub.add_parser("boveda_cifrada", help="lecturas aleatorias en vault.enc por trozos (1 GiB por defecto)")
+    p.add_argument("--tamano-mb", type=int, default=1024)
+    p.add_argument("--entrada-kb", type=int, default=256)
+    p.add_argument("--lecturas", type=int, default=2000)
+
+    p = sub.add_parser("rotacion", help="rotación de clave.key en segundo plano: filas/seg y latencia de lectura")
+    p.add_argument("--servicios", type=int, default=100_000)
+    p.add_argument("--lote", type=int, default=500)
+    p.add_argument("--hilos", type=int, default=2)
+
+    p = sub.add_parser("gui", help="bloqueo del hilo de la interfaz: trabajo directo frente a segundo plano")
+    p.add_argument("--registros", type=int, default=20)
+    p.add_argument("--usuarios", type=int, default=20_000)
+
+    p = sub.add_parser("vistas", help="páginas por prefijo del índice de usuarios frente al texto completo")
+    p.add_argument("--usuarios", type=int, default=50_000)
+    p.add_argument("--consultas", type=int, default=10_000)
+
+    p = sub.add_parser("arranque", help="tiempo de importación (-X importtime) y de un proceso que lista usuarios")
+    p.add_argument("--repeticiones", type=int, default=20)
+    p.add_argument("--usuarios", type=int, default=1000)
+
+    p = sub.add_parser("cli", help="ops/seg de la línea de comandos: un proceso por lotes frente a uno por operación")
+    p.add_argument("--operaciones", type=int, default=2000)
+    p.add_argument("--muestra", type=int, default=20)
+
+    args = parser.parse_args()
+    if args.bench == "autenticacion":
+        bench_autenticacion(args.usuarios)
+    elif args.bench == "asignaciones":
+        bench_asignaciones(args.llamadas)
+    elif args.bench == "fuerza":
+        bench_fuerza(args.contrasenas)
+    elif args.bench == "lista_bloqueo":
+        bench_lista_bloqueo(args.entradas, args.consultas)
+    elif args.bench == "bloom":
+        bench_bloom(args.entradas, args.consultas, args.fp)
+    elif args.bench == "estres":
+        bench_estres(args.procesos, args.usuarios)
+    elif args.bench == "servicio":
+        bench_servicio(args.peticiones, args.iteraciones)
+    elif args.bench == "limitador":
+        bench_limitador(args.intentos)
+    elif args.bench == "formato":
+        bench_formato(args.usuarios)
+    elif args.bench == "auditoria":
+        bench_auditoria(args.contrasenas)
+    elif args.bench == "estimador":
+        bench_estimador(args.contrasenas)
+    elif args.bench == "boveda":
+        bench_boveda(args.servicios, args.hilos)
+    elif args.bench == "boveda_cifrada":
+        bench_boveda_cifrada(args.tamano_mb, args.entrada_kb, args.lecturas)
+    elif args.bench == "rotacion":
+        bench_rotacion(args.servicios, args.lote, args.hilos)
+    elif args.bench == "gui":
+        bench_gui(args.registros, args.usuarios)
+    elif args.bench == "vistas":
+        bench_vistas(args.usuarios, args.consultas)
+    elif args.bench == "arranque":
+        bench_arranque(args.repeticiones, args.usuarios)
+    elif args.bench == "cli":
+        bench_cli(args.operaciones, args.muestra)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Bóveda de credenciales cifradas sobre contraseñas.db.
+
+El esquema es el que ya existe en el repositorio más la versión de la clave:
+    contraseñas(servicio TEXT PRIMARY KEY, contraseña BLOB, version INTEGER)
+donde cada BLOB es un token Fernet cifrado con la clave de esa versión. Los
+tokens que escribe este módulo son Fernet estándar (Fernet(clave).decrypt
+los lee) y los ya existentes se leen sin migrar nada: al abrir una tabla
+antigua se añade la columna y sus filas quedan en la versión 0 (clave.key).
+
+Para servir a muchos servicios y a varios hilos:
+- la base de datos se abre en modo WAL (los lectores no bloquean al
+  escritor) y cada hilo toma una conexión de un PoolConexiones;
+- las sentencias son fijas y parametrizadas, así que sqlite3 las prepara
+  una vez por conexión y las reutiliza de su caché;
+- las operaciones en lote (guardar_lote / obtener_lote) usan executemany o
+  consultas IN por tramos dentro de una sola transacción; los tokens se
+  cifran y descifran con cryptography.fernet (ver CifradorFernet).
+
+Rotación de la clave sin parar el servicio: cada fila lleva en la columna
+`version` la versión de la clave con la que se cifró (clave.key es la 0 y
+clave.key.N la N). rotar_clave() crea la versión siguiente, las escrituras
+nuevas la usan al momento y un RotadorClaves re-cifra en segundo plano las
+filas antiguas por lotes acotados, mientras las lecturas descifran cada fila
+con la clave de su versión. El cursor de la rotación se guarda en la tabla
+rotacion_clave en la misma transacción que cada lote, así que tras una caída
+reanudar_rotacion() sigue donde se quedó. retirar_claves() archiva las
+claves que ya no usa ninguna fila (clave.key -> clave.key.retirada); solo
+las borra si se le pide, porque las copias antiguas de la base de datos
+siguen cifradas con ellas.
+
+Uso como script:
+    python boveda.py [contraseñas.db] [clave.key]   (lista los servicios guardados)
+    python boveda.py --rotar [contraseñas.db] [clave.key]   (rota la clave o reanuda la rotación)
+"""
+
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken
+
+DB_FILE = "contraseñas.db"
+KEY_FILE = "clave.key"
+TAM_TRAMO = 500  # servicios por consulta IN (por debajo del límite de variables de SQLite)
+
+LOTE_ROTACION = 500  # filas re-cifradas por transacción al rotar la clave
+
+_CREAR = ("CREATE TABLE IF NOT EXISTS contraseñas "
+          "(servicio TEXT PRIMARY KEY, contraseña BLOB, version INTEGER NOT NULL DEFAULT 0)")
+_AGREGAR_VERSION = "ALTER TABLE contraseñas ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+_CREAR_ROTACION = ("CREATE TABLE IF NOT EXISTS rotacion_clave "
+                   "(id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL, cursor TEXT NOT NULL)")
+_GUARDAR = "INSERT OR REPLACE INTO contraseñas (servicio, contraseña, version) VALUES (?, ?, ?)"
+_OBTENER = "SELECT contraseña, version FROM contraseñas WHERE servicio = ?"
+_ELIMINAR = "DELETE FROM contraseñas WHERE servicio = ?"
+_SERVICIOS = "SELECT servicio FROM contraseñas ORDER BY servicio"
+_TODAS = "SELECT servicio, contraseña, version FROM contraseñas"
+_PENDIENTES_INICIO = ("SELECT servicio, contraseña, version FROM contraseñas "
+                      "WHERE version != ? ORDER BY servicio LIMIT ?")
+_PENDIENTES = ("SELECT servicio, contraseña, version FROM contraseñas "
+               "WHERE servicio > ? AND version != ? ORDER BY servicio LIMIT ?")
+# Solo si la fila no cambió desde que se leyó (una escritura concurrente ya usa la clave nueva)
+_RECIFRAR = "UPDATE contraseñas SET contraseña = ?, version = ? WHERE servicio = ? AND contraseña = ?"
+_QUEDAN = "SELECT COUNT(*) FROM contraseñas WHERE version != ?"
+_VERSIONES = "SELECT DISTINCT version FROM contraseñas"
+_GUARDAR_CURSOR = "INSERT OR REPLACE INTO rotacion_clave (id, version, cursor) VALUES (1, ?, ?)"
+_LEER_CURSOR = "SELECT version, cursor FROM rotacion_clave WHERE id = 1"
+_FIN_ROTACION = "DELETE FROM rotacion_clave"
+
+
+# ---------- Cifrado en lote ----------
+class CifradorFernet:
+    """
+    Cifra y descifra lotes de tokens Fernet con una clave. Cada token pasa
+    por cryptography.fernet.Fernet (no se reimplementa nada de criptografía);
+    el ahorro de las operaciones en lote está en el SQL, no aquí.
+    """
+
+    def __init__(self, clave: bytes):
+        self._fernet = Fernet(clave)  # ValueError si la clave no es Fernet válida
+
+    def cifrar_lote(self, valores: List[bytes]) -> List[bytes]:
+        encrypt = self._fernet.encrypt
+        return [encrypt(valor) for valor in valores]
+
+    def descifrar_lote(self, tokens: List[bytes]) -> List[bytes]:
+        """Descifra los tokens; InvalidToken si alguno está alterado o no es de esta clave."""
+        decrypt = self._fernet.decrypt
+        return [decrypt(token) for token in tokens]
+
+    def cifrar(self, valor: bytes) -> bytes:
+        return self.cifrar_lote([valor])[0]
+
+    def descifrar(self, token: bytes) -> bytes:
+        return self.descifrar_lote([token])[0]
+
+
+# ---------- Anillo de claves ----------
+def ruta_clave(key_path: str, version: int) -> str:
+    """Archivo de la versión `version`: clave.key para la 0, clave.key.N para las demás."""
+    return key_path if version == 0 else f"{key_path}.{version}"
+
+
+def cargar_claves(key_path: str = KEY_FILE) -> Dict[int, bytes]:
+    """
+    Versión -> clave de todas las versiones presentes junto a clave.key.
+    Si no hay ninguna, genera clave.key (versión 0).
+    """
+    directorio = os.path.dirname(os.path.abspath(key_path))
+    base = os.path.basename(key_path) + "."
+    versiones = [0] + sorted(int(nombre[len(base):]) for nombre in os.listdir(directorio)
+                             if nombre.startswith(base) and nombre[len(base):].isdigit())
+    claves = {}
+    for version in versiones:
+        try:
+            with open(ruta_clave(key_path, version), "rb") as f:
+                claves[version] = f.read().strip()
+        except FileNotFoundError:
+            continue  # clave.key retirada tras una rotación
+    if not claves:
+        claves[0] = crear_clave(key_path, 0)
+    return claves
+
+
+def crear_clave(key_path: str, version: int) -> bytes:
+    """Genera la clave de `version` (solo legible por el dueño) y la deja en disco antes de usarla."""
+    clave = Fernet.generate_key()
+    path = ruta_clave(key_path, version)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(clave)
+        f.flush()
+        os.fsync(f.fileno())
+    dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+    return clave
+
+
+# ---------- Conexiones ----------
+class PoolConexiones:
+    """
+    Conexiones SQLite reutilizables entre hilos. Cada conexión se configura
+    una vez (WAL, synchronous=NORMAL, espera ante bloqueos) y guarda sus
+    sentencias preparadas; `conexion()` presta una y la devuelve al salir.
+    Se abren bajo demanda, como mucho `tamano`; si todas están prestadas,
+    el hilo espera a que se libere una.
+    """
+
+    def __init__(self, path: str, tamano: int = 4, espera: float = 5.0):
+        self.path = path
+        self.tamano = tamano
+        self.espera = espera
+        self._libres: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._todas: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _abrir(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.espera, isolation_level=None,
+                               check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def conexion(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._libres.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                conn = self._abrir() if len(self._todas) < self.tamano else None
+                if conn is not None:
+                    self._todas.append(conn)
+            if conn is None:
+                conn = self._libres.get()
+        try:
+            yield conn
+        finally:
+            self._libres.put(conn)
+
+    @contextmanager
+    def transaccion(self) -> Iterator[sqlite3.Connection]:
+        """Conexión dentro de BEGIN IMMEDIATE ... COMMIT (ROLLBACK si hay excepción)."""
+        with self.conexion() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._todas:
+                conn.close()
+            self._todas.clear()
+            self._libres = queue.LifoQueue()
+
+
+# ---------- Bóveda ----------
+class Boveda:
+    """
+    Contraseñas de servicios cifradas en contraseñas.db.
+    Segura para usar desde varios hilos a la vez.
+    """
+
+    def __init__(self, db_path: str = DB_FILE, key_path: str = KEY_FILE, conexiones: int = 4):
+        self.db_path = db_path
+        self.key_path = key_path
+        self._lock_claves = threading.Lock()
+        self._cifradores: Dict[int, CifradorFernet] = {}
+        self._cargar_claves()
+        self._pool = PoolConexiones(db_path, conexiones)
+        with self._pool.conexion() as conn:
+            conn.execute(_CREAR)
+            columnas = [fila[1] for fila in conn.execute("PRAGMA table_info(contraseñas)")]
+            if "version" not in columnas:
+                conn.execute(_AGREGAR_VERSION)  # tabla antigua: sus filas son de clave.key (versión 0)
+            conn.execute(_CREAR_ROTACION)
+
+    def __enter__(self) -> "Boveda":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.close()
+
+    # ---------- Claves ----------
+    def _cargar_claves(self) -> None:
+        with self._lock_claves:
+            for version, clave in cargar_claves(self.key_path).items():
+                if version not in self._cifradores:
+                    self._cifradores[version] = CifradorFernet(clave)
+            self.version = max(self._cifradores)  # versión con la que se cifra
+
+    def _cifrador(self, version: int) -> CifradorFernet:
+        cifrador = self._cifradores.get(version)
+        if cifrador is None:
+            self._cargar_claves()  # otra instancia pudo rotar la clave
+            try:
+                cifrador = self._cifradores[version]
+            except KeyError:
+                raise InvalidToken(f"No está la clave de la versión {version}.") from None
+        return cifrador
+
+    def _cifrar(self, valores: List[bytes]) -> Tuple[int, List[bytes]]:
+        version = self.version
+        return version, self._cifradores[version].cifrar_lote(valores)
+
+    def _descifrar(self, tokens: List[bytes], versiones: List[int]) -> List[bytes]:
+        """Descifra cada token con la clave de su versión (un lote por versión)."""
+        valores: List[bytes] = [b""] * len(tokens)
+        por_version: Dict[int, List[int]] = {}
+        for i, version in enumerate(versiones):
+            por_version.setdefault(version, []).append(i)
+        for version, indices in por_version.items():
+            descifrados = self._cifrador(version).descifrar_lote([tokens[i] for i in indices])
+            for i, valor in zip(indices, descifrados):
+                valores[i] = valor
+        return valores
+
+    # ---------- Operaciones individuales ----------
+    def guardar(self, servicio: str, password: str) -> None:
+        version, (token,) = self._cifrar([password.encode("utf-8")])
+        with self._pool.conexion() as conn:
+            conn.execute(_GUARDAR, (servicio, token, version))
+
+    def obtener(self, servicio: str) -> Optional[str]:
+        with self._pool.conexion() as conn:
+            fila = conn.execute(_OBTENER, (servicio,)).fetchone()
+        if fila is None:
+            return None
+        return self._cifrador(fila[1]).descifrar(fila[0]).decode("utf-8")
+
+    def eliminar(self, servicio: str) -> bool:
+        with self._pool.conexion() as conn:
+            return conn.execute(_ELIMINAR, (servicio,)).rowcount > 0
+
+    def servicios(self) -> List[str]:
+        with self._pool.conexion() as conn:
+            return [fila[0] for fila in conn.execute(_SERVICIOS)]
+
+    def __contains__(self, servicio: str) -> bool:
+        with self._pool.conexion() as conn:
+            return conn.execute(_OBTENER, (servicio,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._pool.conexion() as conn:
+            return conn.execute("SELECT COUNT(*) FROM contraseñas").fetchone()[0]
+
+    # ---------- Operaciones en lote ----------
+    def guardar_lote(self, credenciales) -> int:
+        """
+        Guarda (o reemplaza) muchas credenciales en una transacción.
+        `credenciales`: dict servicio -> contraseña o iterable de pares.
+        Devuelve cuántas se escribieron.
+        """
+        pares: List[Tuple[str, str]] = list(credenciales.items() if isinstance(credenciales, dict) else credenciales)
+        version, tokens = self._cifrar([password.encode("utf-8") for _, password in pares])
+        with self._pool.transaccion() as conn:
+            conn.executemany(_GUARDAR, ((servicio, token, version) for (servicio, _), token in zip(pares, tokens)))
+        return len(pares)
+
+    def obtener_lote(self, servicios: Iterable[str]) -> Dict[str, str]:
+        """Contraseñas de `servicios` (los que no existen no aparecen en el resultado)."""
+        servicios = list(dict.fromkeys(servicios))
+        encontrados: List[Tuple[str, bytes, int]] = []
+        with self._pool.conexion() as conn:
+            for i in range(0, len(servicios), TAM_TRAMO):
+                tramo = servicios[i:i + TAM_TRAMO]
+                # Una sentencia por tamaño de tramo: todas salvo la última usan la misma
+                sql = "SELECT servicio, contraseña, version FROM contraseñas WHERE servicio IN (%s)" \
+                      % ",".join("?" * len(tramo))
+                encontrados.extend(conn.execute(sql, tramo))
+        return self._descifrar_filas(encontrados)
+
+    def eliminar_lote(self, servicios: Iterable[str]) -> int:
+        with self._pool.transaccion() as conn:
+            return conn.executemany(_ELIMINAR, ((s,) for s in servicios)).rowcount
+
+    def todas(self) -> Dict[str, str]:
+        """Todas las credenciales descifradas."""
+        with self._pool.conexion() as conn:
+            return self._descifrar_filas(conn.execute(_TODAS).fetchall())
+
+    def _descifrar_filas(self, filas: List[Tuple[str, bytes, int]]) -> Dict[str, str]:
+        valores = self._descifrar([fila[1] for fila in filas], [fila[2] for fila in filas])
+        return {fila[0]: valor.decode("utf-8") for fila, valor in zip(filas, valores)}
+
+    # ---------- Rotación de la clave ----------
+    def rotar_clave(self, lote: int = LOTE_ROTACION, pausa: float = 0.0,
+                    en_segundo_plano: bool = True) -> "RotadorClaves":
+        """
+        Crea la clave de la versión siguiente (desde ese momento se cifra con
+        ella) y re-cifra las filas antiguas con un RotadorClaves.
+        """
+        self._cargar_claves()
+        with self._lock_claves:
+            version = self.version + 1
+            self._cifradores[version] = CifradorFernet(crear_clave(self.key_path, version))
+            self.version = version
+        with self._pool.transaccion() as conn:
+            conn.execute(_FIN_ROTACION)  # sin cursor: la rotación empieza por la primera fila
+        return self.reanudar_rotacion(lote, pausa, en_segundo_plano)
+
+    def pendientes_rotacion(self) -> int:
+        """Filas que aún no están cifradas con la clave actual."""
+        with self._pool.conexion() as conn:
+            return conn.execute(_QUEDAN, (self.version,)).fetchone()[0]
+
+    def reanudar_rotacion(self, lote: int = LOTE_ROTACION, pausa: float = 0.0,
+                          en_segundo_plano: bool = True) -> "RotadorClaves":
+        """Sigue re-cifrando desde el cursor guardado (p. ej. tras una caída)."""
+        rotador = RotadorClaves(self, lote, pausa)
+        if en_segundo_plano:
+            rotador.start()
+        else:
+            rotador.run()
+        return rotador
+
+    def _cursor_rotacion(self) -> Optional[str]:
+        """Último servicio re-cifrado con la clave actual; None si aún no hay ninguno."""
+        with self._pool.conexion() as conn:
+            fila = conn.execute(_LEER_CURSOR).fetchone()
+        return fila[1] if fila is not None and fila[0] == self.version else None
+
+    def _recifrar_lote(self, cursor: Optional[str], lote: int) -> Tuple[int, Optional[str], bool]:
+        """
+        Re-cifra con la clave actual hasta `lote` filas posteriores a `cursor`
+        (desde la primera si es None; "" es un nombre de servicio válido).
+        Devuelve (filas re-cifradas, cursor siguiente, terminada).
+        """
+        version = self.version
+        with self._pool.conexion() as conn:
+            if cursor is None:
+                filas = conn.execute(_PENDIENTES_INICIO, (version, lote)).fetchall()
+            else:
+                filas = conn.execute(_PENDIENTES, (cursor, version, lote)).fetchall()
+        if not filas:
+            with self._pool.transaccion() as conn:
+                # Otra instancia con la clave anterior pudo escribir detrás del cursor
+                # (se vuelve a empezar por la primera fila)
+                quedan = conn.execute(_QUEDAN, (version,)).fetchone()[0]
+                conn.execute(_FIN_ROTACION)
+            return 0, None, not quedan
+        # El descifrado y el cifrado van fuera de la transacción: el bloqueo de
+        # escritura solo dura lo que el UPDATE del lote.
+        tokens = [fila[1] for fila in filas]
+        _, nuevos = self._cifrar(self._descifrar(tokens, [fila[2] for fila in filas]))
+        siguiente = filas[-1][0]
+        with self._pool.transaccion() as conn:
+            cambios = conn.executemany(
+                _RECIFRAR, ((nuevo, version, fila[0], fila[1]) for fila, nuevo in zip(filas, nuevos))).rowcount
+            conn.execute(_GUARDAR_CURSOR, (version, siguiente))
+        return cambios, siguiente, False
+
+    def retirar_claves(self, borrar: bool = False) -> List[int]:
+        """
+        Retira las versiones que ya no usa ninguna fila y devuelve cuáles.
+        Sus archivos se renombran a <archivo>.retirada (las copias de
+        seguridad de la base de datos aún pueden necesitarlos); con
+        borrar=True se eliminan.
+        """
+        with self._pool.conexion() as conn:
+            en_uso = {fila[0] for fila in conn.execute(_VERSIONES)}
+        retiradas = []
+        with self._lock_claves:
+            for version in sorted(self._cifradores):
+                if version != self.version and version not in en_uso:
+                    path = ruta_clave(self.key_path, version)
+                    try:
+                        if borrar:
+                            os.remove(path)
+                        else:
+                            os.replace(path, path + ".retirada")
+                    except FileNotFoundError:
+                        pass
+                    del self._cifradores[version]
+                    retiradas.append(version)
+        return retiradas
+
+
+class RotadorClaves(threading.Thread):
+    """
+    Re-cifra en segundo plano las filas con claves antiguas, `lote` filas
+    por transacción y con `pausa` segundos entre lotes para no acaparar la
+    base de datos. detener() lo para tras el lote en curso; el progreso
+    queda guardado y reanudar_rotacion() continúa desde ahí.
+    """
+
+    def __init__(self, boveda: Boveda, lote: int = LOTE_ROTACION, pausa: float = 0.0):
+        super().__init__(name="rotador-claves", daemon=True)
+        self.boveda = boveda
+        self.lote = lote
+        self.pausa = pausa
+        self.recifradas = 0
+        self.completada = False
+        self.error: Optional[BaseException] = None
+        self._detener = threading.Event()
+
+    def run(self) -> None:
+        try:
+            cursor = self.boveda._cursor_rotacion()
+            while not self._detener.is_set():
+                cambios, cursor, terminada = self.boveda._recifrar_lote(cursor, self.lote)
+                self.recifradas += cambios
+                if terminada:
+                    self.completada = True
+                    return
+                if self.pausa:
+                    self._detener.wait(self.pausa)
+        except BaseException as e:  # queda en self.error para quien espera al hilo
+            self.error = e
+
+    def detener(self) -> None:
+        self._detener.set()
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    rotar = "--rotar" in argumentos
+    if rotar:
+        argumentos.remove("--rotar")
+    db = argumentos[0] if len(argumentos) > 0 else DB_FILE
+    clave = argumentos[1] if len(argumentos) > 1 else KEY_FILE
+    if not os.path.exists(db):
+        print(f"No existe {db}.")
+        sys.exit(1)
+    with Boveda(db, clave) as boveda:
+        if not rotar:
+            for nombre in boveda.servicios():
+                print(nombre)
+            sys.exit(0)
+        if boveda.pendientes_rotacion():
+            print(f"Reanudando la rotación a la versión {boveda.version}...")
+            rotador = boveda.reanudar_rotacion(en_segundo_plano=False)
+        else:
+            rotador = boveda.rotar_clave(en_segundo_plano=False)
+        if rotador.error is not None:
+            raise rotador.error
+        print(f"{rotador.recifradas} filas re-cifradas con la clave versión {boveda.version}.")
@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+Bóveda protegida con frase de paso (vault.enc + vault.salt), cifrada por trozos.
+
+La clave maestra se deriva una sola vez de la frase de paso y vault.salt con
+kdf.derivar_clave (la misma maquinaria que usan los hashes de usuario) y se
+guarda en ClavesSesion: volver a abrir la bóveda en la misma sesión no repite
+el KDF. De la maestra salen dos subclaves con HMAC: una para AES-256-GCM y
+otra para las etiquetas de índice.
+
+vault.enc es un registro de solo-anexado de marcos independientes, cada uno
+cifrado y autenticado por separado con AES-GCM:
+    cabecera del archivo: b"VLT1" | longitud (2 bytes) | configuración JSON | verificador (16 bytes)
+    marco: etiqueta (16) | secuencia (8) | índice (4) | total (4) | largo (4) | tipo (1) | nonce (12) | cifrado
+- etiqueta = HMAC(nombre de la entrada): permite indexar sin descifrar y no
+  revela el nombre;
+- una entrada es un grupo de `total` marcos contiguos con la misma
+  secuencia: el 0 lleva el nombre y los siguientes, trozos de `tam_trozo`
+  bytes de los datos;
+- la cabecera del marco es el dato asociado (AAD) de AES-GCM: no se puede
+  cambiar un trozo de entrada, de posición ni de versión sin que falle la
+  autenticación.
+Abrir solo recorre las cabeceras de los marcos; leer una entrada (o un rango
+de ella) descifra únicamente sus trozos, y escribirla anexa un grupo nuevo.
+Los grupos reemplazados se eliminan al compactar, copiando los marcos vivos
+sin descifrarlos. La autenticación es por trozo: no protege frente a quien
+sustituya el archivo entero por una copia anterior.
+
+Un vault.enc antiguo (un único token Fernet con un JSON servicio -> contraseña,
+clave PBKDF2 de la frase y vault.salt) no se abre: hay que convertirlo
+explícitamente con BovedaCifrada.convertir_legado (o --convertir), que deja
+una copia en vault.enc.bak antes de reemplazarlo. Los parámetros con los
+que se derivó su clave no están guardados en el archivo; si no eran los de
+KDF_BOVEDA_LEGADA se indican con kdf_legado.
+
+Un solo proceso debe escribir la bóveda a la vez.
+
+Uso como script:
+    python boveda_cifrada.py [vault.enc] [vault.salt]   (pide la frase y lista las entradas)
+    python boveda_cifrada.py --convertir [vault.enc] [vault.salt] [--iteraciones-legado N]
+"""
+
+import base64
+import getpass
+import hmac
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from kdf import KDF_POR_DEFECTO, derivar_clave
+
+VAULT_FILE = "vault.enc"
+SALT_FILE = "vault.salt"
+TAM_TROZO = 64 << 10
+# Parámetros con los que se asume que se derivó la clave de un vault.enc Fernet antiguo
+KDF_BOVEDA_LEGADA: Dict = {"alg": "pbkdf2_sha256", "iteraciones": 100_000}
+
+MAGIC = b"VLT1"
+_LARGO_CONFIG = struct.Struct(">H")
+_VERIFICADOR = 16
+_MARCO = struct.Struct(">16sQIIIB")
+_NONCE = 12
+_TAG_GCM = 16
+DATOS = 1
+BORRADO = 2
+
+
+# ---------- Claves de la sesión ----------
+class ClavesSesion:
+    """
+    Claves maestras derivadas recientemente, para no repetir el KDF al
+    reabrir una bóveda en la misma sesión. Caducan a los `ttl` segundos.
+    """
+
+    def __init__(self, ttl: float = 900, reloj: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._reloj = reloj
+        self._claves: Dict[Tuple[bytes, str, bytes], Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, frase: str, salt: bytes, params: Dict) -> bytes:
+        # La huella de la frase (HMAC con el salt) identifica la entrada sin guardarla
+        clave = (salt, json.dumps(params, sort_keys=True),
+                 hmac.digest(salt, frase.encode("utf-8"), "sha256"))
+        ahora = self._reloj()
+        with self._lock:
+            guardada = self._claves.get(clave)
+            if guardada is not None and ahora < guardada[1]:
+                return guardada[0]
+        maestra = derivar_clave(frase, salt, params)
+        with self._lock:
+            self._claves[clave] = (maestra, ahora + self.ttl)
+        return maestra
+
+    def olvidar(self) -> None:
+        with self._lock:
+            self._claves.clear()
+
+
+CLAVES_SESION = ClavesSesion()
+
+
+def _cargar_salt(salt_path: str) -> bytes:
+    try:
+        with open(salt_path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        salt = os.urandom(16)
+        with open(salt_path, "wb") as f:
+            f.write(salt)
+        return salt
+
+
+def _es_formato_actual(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _copia_de_seguridad(path: str, copia: str) -> None:
+    """Copia `path` en `copia` (que no debe existir) y la deja en disco."""
+    try:
+        fd = os.open(copia, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        raise ValueError(f"Ya existe {copia}: muévela o bórrala antes de convertir.") from None
+    with os.fdopen(fd, "wb") as destino, open(path, "rb") as origen:
+        while True:
+            bloque = origen.read(1 << 20)
+            if not bloque:
+                break
+            destino.write(bloque)
+        destino.flush()
+        os.fsync(destino.fileno())
+
+
+class BovedaCifrada:
+    """
+    Entradas nombre -> bytes cifradas en vault.enc.
+    - params: parámetros KDF para una bóveda nueva (las existentes usan los
+      guardados en su cabecera).
+    - claves: caché de claves derivadas (None = derivar siempre).
+    - compact_ratio / compact_min_bytes: se compacta al anexar cuando lo
+      reemplazado supera esa fracción del archivo y ese tamaño.
+    """
+
+    def __init__(self, frase: str, path: str = VAULT_FILE, salt_path: str = SALT_FILE,
+                 params: Optional[Dict] = None, tam_trozo: int = TAM_TROZO,
+                 claves: Optional[ClavesSesion] = CLAVES_SESION,
+                 compact_ratio: float = 0.5, compact_min_bytes: int = 1 << 20, durable: bool = True):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.durable = durable
+        self._salt = _cargar_salt(salt_path)
+        self._lock = threading.RLock()
+        self._fh = None
+        self._mm: Optional[mmap.mmap] = None
+        self._mapeado = 0
+        # etiqueta -> (secuencia, offset del marco 0, total de marcos)
+        self._indice: Dict[bytes, Tuple[int, int, int]] = {}
+        self._secuencia = 0
+        self._basura = 0
+        self._fin = 0
+
+        derivar = claves.obtener if claves is not None else \
+            (lambda frase_, salt, params_: derivar_clave(frase_, salt, params_))
+        if not os.path.exists(path) or not os.path.getsize(path):
+            self._config = {"kdf": dict(params or KDF_POR_DEFECTO), "trozo": tam_trozo}
+            self._preparar_claves(derivar(frase, self._salt, self._config["kdf"]))
+            self._crear({})
+        elif not _es_formato_actual(path):
+            raise ValueError(f"{path} tiene el formato antiguo: conviértelo antes con "
+                             f"BovedaCifrada.convertir_legado (python boveda_cifrada.py --convertir).")
+        else:
+            self._abrir(frase, derivar)
+
+    @classmethod
+    def convertir_legado(cls, frase: str, path: str = VAULT_FILE, salt_path: str = SALT_FILE,
+                         kdf_legado: Optional[Dict] = None, **opciones) -> "BovedaCifrada":
+        """
+        Convierte un vault.enc antiguo al formato por trozos y devuelve la
+        bóveda abierta. Antes de reemplazarlo lo copia a vault.enc.bak (si ya
+        existe una copia, no se toca nada). `opciones` son las del constructor.
+        """
+        if _es_formato_actual(path):
+            raise ValueError(f"{path} ya tiene el formato actual.")
+        kdf_legado = dict(kdf_legado or KDF_BOVEDA_LEGADA)
+        with open(path, "rb") as f:
+            token = f.read().strip()
+        clave = base64.urlsafe_b64encode(derivar_clave(frase, _cargar_salt(salt_path), kdf_legado))
+        try:
+            contenido = json.loads(Fernet(clave).decrypt(token))
+        except InvalidToken:
+            raise ValueError(f"No se pudo descifrar {path}: la frase de paso es incorrecta o su clave "
+                             f"no se derivó con {kdf_legado} (indica los parámetros con kdf_legado).") from None
+        if not isinstance(contenido, dict):
+            raise ValueError(f"{path}: contenido antiguo no reconocido.")
+        entradas = {str(k): v.encode("utf-8") if isinstance(v, str) else json.dumps(v).encode("utf-8")
+                    for k, v in contenido.items()}
+
+        _copia_de_seguridad(path, path + ".bak")
+        nueva = path + ".nuevo"
+        if os.path.exists(nueva):
+            os.remove(nueva)  # conversión anterior interrumpida
+        with cls(frase, nueva, salt_path, **opciones) as boveda:
+            boveda._crear(entradas)
+        os.replace(nueva, path)
+        return cls(frase, path, salt_path, **opciones)
+
+    # ---------- Claves y cabecera ----------
+    def _preparar_claves(self, maestra: bytes) -> None:
+        self._aead = AESGCM(hmac.digest(maestra, b"boveda-cifrado", "sha256"))
+        self._clave_indice = hmac.digest(maestra, b"boveda-indice", "sha256")
+        self._verificador = hmac.digest(maestra, b"boveda-verificacion", "sha256")[:_VERIFICADOR]
+        self._trozo = self._config["trozo"]
+
+    def _cabecera(self) -> bytes:
+        config = json.dumps(self._config, sort_keys=True).encode("utf-8")
+        return MAGIC + _LARGO_CONFIG.pack(len(config)) + config + self._verificador
+
+    def _crear(self, entradas: Dict[str, bytes]) -> None:
+        """Escribe una bóveda nueva (con `entradas`) y la sustituye de forma atómica."""
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self._cabecera())
+            for secuencia, (nombre, datos) in enumerate(entradas.items(), 1):
+                f.write(self._grupo(nombre, datos, secuencia))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._abrir_archivo()
+        self._recorrer()
+
+    def _abrir(self, frase: str, derivar) -> None:
+        with open(self.path, "rb") as f:
+            f.seek(len(MAGIC))
+            (largo,) = _LARGO_CONFIG.unpack(f.read(_LARGO_CONFIG.size))
+            self._config = json.loads(f.read(largo))
+            verificador = f.read(_VERIFICADOR)
+        self._preparar_claves(derivar(frase, self._salt, self._config["kdf"]))
+        if not hmac.compare_digest(verificador, self._verificador):
+            raise ValueError("Frase de paso incorrecta.")
+        self._abrir_archivo()
+        self._recorrer()
+
+    def _abrir_archivo(self) -> None:
+        self._cerrar_archivo()
+        self._fh = open(self.path, "r+b")
+
+    def _cerrar_archivo(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+            self._mapeado = 0
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def _mapa(self, hasta: int) -> mmap.mmap:
+        """mmap del archivo que cubre al menos `hasta` bytes (se rehace si el archivo creció)."""
+        if self._mm is None or self._mapeado < hasta:
+            if self._mm is not None:
+                self._mm.close()
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapeado = len(self._mm)
+        return self._mm
+
+    def close(self) -> None:
+        with self._lock:
+            self._cerrar_archivo()
+
+    def __enter__(self) -> "BovedaCifrada":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- Marcos ----------
+    def _etiqueta(self, nombre: str) -> bytes:
+        return hmac.digest(self._clave_indice, nombre.encode("utf-8"), "sha256")[:16]
+
+    def _marco(self, etiqueta: bytes, secuencia: int, indice: int, total: int, tipo: int, plano: bytes) -> bytes:
+        cabecera = _MARCO.pack(etiqueta, secuencia, indice, total, len(plano) + _TAG_GCM, tipo)
+        nonce = os.urandom(_NONCE)
+        return cabecera + nonce + self._aead.encrypt(nonce, plano, cabecera)
+
+    def _grupo(self, nombre: str, datos: bytes, secuencia: int) -> bytes:
+        etiqueta = self._etiqueta(nombre)
+        trozos = [datos[i:i + self._trozo] for i in range(0, len(datos), self._trozo)]
+        total = 1 + len(trozos)
+        marcos = [self._marco(etiqueta, secuencia, 0, total, DATOS, nombre.encode("utf-8"))]
+        marcos.extend(self._marco(etiqueta, secuencia, i, total, DATOS, trozo) for i, trozo in enumerate(trozos, 1))
+        return b"".join(marcos)
+
+    def _descifrar(self, mm: mmap.mmap, offset: int) -> Tuple[bytes, int]:
+        """(texto plano, offset del marco siguiente) del marco en `offset`."""
+        cabecera = mm[offset:offset + _MARCO.size]
+        largo = _MARCO.unpack(cabecera)[4]
+        inicio = offset + _MARCO.size
+        fin = inicio + _NONCE + largo
+        try:
+            plano = self._aead.decrypt(mm[inicio:inicio + _NONCE], mm[inicio + _NONCE:fin], cabecera)
+        except InvalidTag:
+            raise ValueError(f"{self.path}: marco alterado en el offset {offset}.") from None
+        return plano, fin
+
+    def _recorrer(self) -> None:
+        """Reconstruye el índice leyendo solo las cabeceras de los marcos."""
+        tam = os.fstat(self._fh.fileno()).st_size
+        mm = self._mapa(tam)
+        (largo,) = _LARGO_CONFIG.unpack_from(mm, len(MAGIC))
+        offset = len(MAGIC) + _LARGO_CONFIG.size + largo + _VERIFICADOR
+        indice, basura, secuencia = {}, 0, 0
+        unpack_from, tam_marco = _MARCO.unpack_from, _MARCO.size
+        grupo = None  # (etiqueta, secuencia, inicio, total, tipo) del grupo en curso
+        fin_valido = offset
+        while offset + tam_marco <= tam:
+            etiqueta, sec, i, total, largo, tipo = unpack_from(mm, offset)
+            siguiente = offset + tam_marco + _NONCE + largo
+            if siguiente > tam:
+                break  # marco cortado: escritura a medias al final
+            esperado = 0 if grupo is None else ultimo_indice + 1
+            if i != esperado or (grupo is not None and (grupo[0] != etiqueta or grupo[1] != sec)) \
+                    or total < 1 or i >= total:
+                if not mm[offset:tam].strip(b"\0"):
+                    break  # ceros tras una caída: se descartan como una escritura a medias
+                # Solo el final del archivo puede estar a medias: esto es corrupción
+                raise ValueError(f"{self.path}: marco inconsistente en el offset {offset}.")
+            if i == 0:
+                grupo = (etiqueta, sec, offset, total, tipo)
+            ultimo_indice = i
+            offset = siguiente
+            if i == total - 1:
+                etiqueta, sec, inicio, total, tipo = grupo
+                secuencia = max(secuencia, sec)
+                anterior = indice.get(etiqueta)
+                if anterior is not None:
+                    basura += anterior[3]
+                if tipo == BORRADO:
+                    indice.pop(etiqueta, None)
+                    basura += offset - inicio
+                else:
+                    indice[etiqueta] = (sec, inicio, total, offset - inicio)
+                grupo = None
+                fin_valido = offset
+        self._indice = {k: v[:3] for k, v in indice.items()}
+        self._largos = {k: v[3] for k, v in indice.items()}
+        self._secuencia, self._basura, self._fin = secuencia, basura, fin_valido
+
+    # ---------- Lectura ----------
+    def __contains__(self, nombre: str) -> bool:
+        return self._etiqueta(nombre) in self._indice
+
+    def __len__(self) -> int:
+        return len(self._indice)
+
+    def nombres(self) -> List[str]:
+        """Nombres de las entradas (descifra solo el marco 0 de cada una)."""
+        with self._lock:
+            mm = self._mapa(self._fin)
+            return sorted(self._descifrar(mm, inicio)[0].decode("utf-8")
+                          for _, inicio, _ in self._indice.values())
+
+    def _trozos(self, nombre: str) -> Optional[Tuple[mmap.mmap, int, int]]:
+        """(mapa, offset del trozo de datos 1, número de trozos de datos) o None."""
+        entrada = self._indice.get(self._etiqueta(nombre))
+        if entrada is None:
+            return None
+        _, inicio, total = entrada
+        mm = self._mapa(self._fin)
+        largo = _MARCO.unpack_from(mm, inicio)[4]
+        return mm, inicio + _MARCO.size + _NONCE + largo, total - 1
+
+    def _offset_trozo(self, primero: int, i: int) -> int:
+        # Todos los trozos de datos salvo el último ocupan lo mismo
+        return primero + i * (_MARCO.size + _NONCE + self._trozo + _TAG_GCM)
+
+    def leer(self, nombre: str) -> Optional[bytes]:
+        with self._lock:
+            trozos = self._trozos(nombre)
+            if trozos is None:
+                return None
+            mm, offset, n = trozos
+            partes = []
+            for _ in range(n):
+                plano, offset = self._descifrar(mm, offset)
+                partes.append(plano)
+            return b"".join(partes)
+
+    def tamano(self, nombre: str) -> Optional[int]:
+        """Bytes de datos de la entrada, sin descifrarla."""
+        with self._lock:
+            trozos = self._trozos(nombre)
+            if trozos is None:
+                return None
+            mm, primero, n = trozos
+            if not n:
+                return 0
+            ultimo = _MARCO.unpack_from(mm, self._offset_trozo(primero, n - 1))[4] - _TAG_GCM
+            return (n - 1) * self._trozo + ultimo
+
+    def leer_rango(self, nombre: str, inicio: int, largo: int) -> Optional[bytes]:
+        """Bytes [inicio, inicio+largo) de una entrada, descifrando solo los trozos que los contienen."""
+        with self._lock:
+            trozos = self._trozos(nombre)
+            if trozos is None:
+                return None
+            mm, primero, n = trozos
+            if largo <= 0 or not n:
+                return b""
+            desde, hasta = inicio // self._trozo, min(n, (inicio + largo - 1) // self._trozo + 1)
+            offset = self._offset_trozo(primero, desde)
+            partes = []
+            for _ in range(desde, hasta):
+                plano, offset = self._descifrar(mm, offset)
+                partes.append(plano)
+            datos = b"".join(partes)
+            base = inicio - desde * self._trozo
+            return datos[base:base + largo]
+
+    def items(self) -> Iterator[Tuple[str, bytes]]:
+        for nombre in self.nombres():
+            yield nombre, self.leer(nombre)
+
+    # ---------- Escritura ----------
+    def _anexar(self, grupo: bytes) -> int:
+        """Anexa un grupo (descartando una escritura a medias anterior) y devuelve su offset."""
+        fh = self._fh
+        if os.fstat(fh.fileno()).st_size != self._fin:
+            if self._mm is not None:  # no dejar mapeada la parte que se trunca
+                self._mm.close()
+                self._mm, self._mapeado = None, 0
+            fh.truncate(self._fin)
+        fh.seek(self._fin)
+        fh.write(grupo)
+        fh.flush()
+        if self.durable:
+            os.fsync(fh.fileno())
+        offset = self._fin
+        self._fin += len(grupo)
+        return offset
+
+    def escribir(self, nombre: str, datos: bytes) -> None:
+        """Crea o reemplaza una entrada: solo se cifran y anexan sus trozos."""
+        with self._lock:
+            self._secuencia += 1
+            grupo = self._grupo(nombre, datos, self._secuencia)
+            offset = self._anexar(grupo)
+            etiqueta = self._etiqueta(nombre)
+            if etiqueta in self._indice:
+                self._basura += self._largos[etiqueta]
+            self._indice[etiqueta] = (self._secuencia, offset, 1 + -(-len(datos) // self._trozo))
+            self._largos[etiqueta] = len(grupo)
+            self._quizas_compactar()
+
+    def eliminar(self, nombre: str) -> bool:
+        with self._lock:
+            etiqueta = self._etiqueta(nombre)
+            if etiqueta not in self._indice:
+                return False
+            self._secuencia += 1
+            marca = self._marco(etiqueta, self._secuencia, 0, 1, BORRADO, b"")
+            self._anexar(marca)
+            del self._indice[etiqueta]
+            self._basura += self._largos.pop(etiqueta) + len(marca)
+            self._quizas_compactar()
+            return True
+
+    def _quizas_compactar(self) -> None:
+        if self._basura >= self.compact_min_bytes and self._basura >= self.compact_ratio * self._fin:
+            self.compactar()
+
+    def compactar(self) -> None:
+        """Reescribe solo los grupos vivos (copiando los marcos cifrados tal cual)."""
+        with self._lock:
+            mm = self._mapa(self._fin)
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(self._cabecera())
+                for etiqueta, (_, inicio, _) in sorted(self._indice.items(), key=lambda e: e[1][1]):
+                    fin = inicio + self._largos[etiqueta]
+                    for pos in range(inicio, fin, 8 << 20):
+                        f.write(mm[pos:min(fin, pos + (8 << 20))])
+                f.flush()
+                os.fsync(f.fileno())
+            self._cerrar_archivo()
+            os.replace(tmp, self.path)
+            self._abrir_archivo()
+            self._recorrer()
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    convertir = "--convertir" in argumentos
+    if convertir:
+        argumentos.remove("--convertir")
+    kdf_legado = None
+    if "--iteraciones-legado" in argumentos:
+        i = argumentos.index("--iteraciones-legado")
+        kdf_legado = dict(KDF_BOVEDA_LEGADA, iteraciones=int(argumentos[i + 1]))
+        del argumentos[i:i + 2]
+    vault = argumentos[0] if len(argumentos) > 0 else VAULT_FILE
+    salt = argumentos[1] if len(argumentos) > 1 else SALT_FILE
+    try:
+        frase = getpass.getpass("Frase de paso: ")
+        if convertir:
+            boveda = BovedaCifrada.convertir_legado(frase, vault, salt, kdf_legado)
+            print(f"{vault} convertido (copia del original en {vault}.bak).")
+        else:
+            boveda = BovedaCifrada(frase, vault, salt)
+        with boveda:
+            for nombre in boveda.nombres():
+                print(f"{nombre}: {boveda.tamano(nombre)} bytes")
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
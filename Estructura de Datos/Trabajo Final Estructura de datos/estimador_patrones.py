@@ -0,0 +1,568 @@
+"""
+Estimador de fuerza por patrones, al estilo de zxcvbn.
+
+Contar clases de carácter da por fuerte "Password1!". El estimador busca
+en la contraseña los patrones con los que un atacante empieza a probar
+(palabras de diccionario, recorridos de teclado, repeticiones, secuencias
+y fechas), estima cuántos intentos necesita para cada trozo y elige la
+descomposición más barata para el atacante:
+
+    intentos = k! * prod(intentos de cada trozo) + 10000^(k-1)
+
+(k = número de trozos). Lo que no encaja en ningún patrón se cuenta como
+fuerza bruta (10 intentos por carácter). La puntuación 0-4 sigue los
+umbrales de zxcvbn (10^3, 10^6, 10^8, 10^10 intentos).
+
+Las tablas (un trie sobre todos los diccionarios y los grafos de teclado)
+se construyen una vez por EstimadorPatrones; estimador_por_defecto()
+devuelve una instancia compartida por todo el proceso.
+"""
+
+import math
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Patrones (bits de Estimacion.patrones)
+DICCIONARIO = 1
+TECLADO = 2
+REPETICION = 4
+SECUENCIA = 8
+FECHA = 16
+
+# Criterio de AnalizadorFuerza.mensajes para cada patrón (y mensaje por defecto)
+CRITERIOS_PATRON: Tuple[Tuple[int, str], ...] = (
+    (DICCIONARIO, "diccionario"), (TECLADO, "teclado"), (REPETICION, "repeticion"),
+    (SECUENCIA, "secuencia"), (FECHA, "fecha"),
+)
+ADIVINABLE = "adivinable"  # sin patrón concreto: corta y sin variedad suficiente
+MENSAJES_POR_DEFECTO: Dict[str, str] = {
+    "diccionario": "Contiene una palabra o contraseña muy conocida.",
+    "teclado": "Contiene un recorrido de teclado (p. ej. qwerty o asdf).",
+    "repeticion": "Contiene repeticiones (p. ej. aaa o abcabc).",
+    "secuencia": "Contiene una secuencia (p. ej. abc o 1234).",
+    "fecha": "Contiene una fecha o un año.",
+    ADIVINABLE: "Es fácil de adivinar: alárgala o hazla menos predecible.",
+}
+
+_FUERZA_BRUTA = 10  # intentos por carácter sin patrón
+_MIN_UN_CARACTER = 10
+_MIN_VARIOS_CARACTERES = 50
+_PENALIZACION_TROZOS = 10_000
+_UMBRALES = (1e3 + 5, 1e6 + 5, 1e8 + 5, 1e10 + 5)
+_MAX_ANALIZADO = 40  # longitud máxima que se descompone
+_MIN_REDUCIDO = 6  # repeticiones y secuencias más cortas no se reducen (p. ej. la "ss" de "password")
+_MAX_INTENTOS = 1e300
+_MINIMO_TRES_TROZOS = math.factorial(3) * _FUERZA_BRUTA ** 3 + _PENALIZACION_TROZOS ** 2
+_SIN_ESTADO = (math.inf,)
+_ANIO_REFERENCIA = time.localtime().tm_year
+_MIN_ESPACIO_ANIOS = 20
+
+# ---------- Diccionarios (ordenados de más a menos frecuente) ----------
+_CONTRASENAS = """
+123456 password 12345678 qwerty 123456789 12345 1234 111111 1234567 dragon 123123
+baseball abc123 football monkey letmein 696969 shadow master 666666 qwertyuiop
+123321 mustang 1234567890 michael 654321 superman 1qaz2wsx 7777777 121212 000000
+qazwsx 123qwe killer trustno1 jordan jennifer zxcvbnm asdfgh hunter buster soccer
+harley batman andrew tigger sunshine iloveyou charlie robert thomas hockey ranger
+daniel starwars 112233 george computer michelle jessica pepper zxcvbn 555555
+11111111 131313 freedom 777777 pass maggie 159753 aaaaaa ginger princess joshua
+cheese amanda summer love ashley nicole chelsea matthew access yankees 987654321
+dallas austin thunder taylor matrix admin welcome contraseña contrasena hola123
+teamo tequiero barcelona realmadrid
+"""
+_INGLES = """
+love hello secret welcome admin login money sunshine princess flower summer winter
+spring autumn dragon master monkey shadow football baseball soccer hockey computer
+internet angel heart happy friend family forever magic music power access freedom
+orange banana apple cookie chocolate purple silver golden diamond tiger lion eagle
+wolf star moon sun blue green black white red super hero change default guest user
+test pass word secure strong safe
+"""
+_ESPANOL = """
+clave contraseña contrasena hola amor teamo tequiero secreto bienvenido usuario
+prueba segura seguro casa perro gato sol luna cielo estrella corazon corazón familia
+amigo amiga vida feliz mundo dios jesus maria madre padre hijo hija mama papa
+princesa campeon futbol barcelona madrid mexico españa espana argentina colombia
+chile peru verano invierno primavera otoño lunes martes domingo enero febrero marzo
+abril mayo junio julio agosto septiembre octubre noviembre diciembre muy bueno nuevo
+fuerte tigre leon azul rojo verde negro blanco tesoro mariposa
+"""
+_NOMBRES = """
+jose juan carlos luis miguel jorge pedro antonio manuel francisco david daniel
+alejandro fernando sergio pablo diego javier ana laura carmen sofia lucia paula
+marta elena isabel andrea sara cristina patricia monica michael john james robert
+william richard thomas mary jennifer linda jessica ashley sarah emily enmanuel
+"""
+DICCIONARIOS_POR_DEFECTO: Dict[str, Sequence[str]] = {
+    "contrasenas": _CONTRASENAS.split(),
+    "ingles": _INGLES.split(),
+    "espanol": _ESPANOL.split(),
+    "nombres": _NOMBRES.split(),
+}
+_MIN_PALABRA = 3
+
+# Sustituciones l33t habituales: carácter -> letra que representa
+_L33T = str.maketrans({"4": "a", "@": "a", "8": "b", "(": "c", "{": "c", "[": "c", "<": "c",
+                       "3": "e", "9": "g", "6": "g", "1": "i", "!": "i", "|": "i", "0": "o",
+                       "$": "s", "5": "s", "+": "t", "7": "t", "%": "x", "2": "z"})
+
+# ---------- Teclados ----------
+# (desplazamiento de la fila, teclas, teclas con mayúsculas). Teclado "inclinado":
+# la tecla (x, y) toca a (x, y-1) y (x+1, y-1) por arriba.
+_QWERTY = ((0, "`1234567890-=", "~!@#$%^&*()_+"),
+           (1, "qwertyuiop[]\\", "QWERTYUIOP{}|"),
+           (1, "asdfghjkl;'", "ASDFGHJKL:\""),
+           (1, "zxcvbnm,./", "ZXCVBNM<>?"))
+_QWERTY_ES = ((0, "º1234567890'¡", "ª!\"·$%&/()=?¿"),
+              (1, "qwertyuiop`+", "QWERTYUIOP^*"),
+              (1, "asdfghjklñ´ç", "ASDFGHJKLÑ¨Ç"),
+              (0, "<zxcvbnm,.-", ">ZXCVBNM;:_"))
+_TECLADO_NUMERICO = ((0, "789", ""), (0, "456", ""), (0, "123", ""), (0, "0.", ""))
+_DIRECCIONES_INCLINADO = ((-1, 0), (0, -1), (1, -1), (1, 0), (0, 1), (-1, 1))
+_DIRECCIONES_ALINEADO = ((-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1))
+
+_SEPARADA = re.compile(r"(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})")
+_DIGITOS = re.compile(r"\d{4,8}")
+_REPETICION_VORAZ = re.compile(r"(.+)\1+", re.S)
+_REPETICION_PEREZOSA = re.compile(r"(.+?)\1+", re.S)
+# Repetición o fecha al principio del texto (ver EstimadorPatrones.puede_bajar_de)
+_EXTREMO = re.compile(r"(.+?)\1|\d{4}|\d{1,4}([\s/\\_.-])\d{1,2}\2\d", re.S)
+_REPETICION_TRAMO = re.compile(r"(.{1,%d})\1+" % _MAX_ANALIZADO, re.S)  # unidades cortas, en toda la contraseña
+
+
+class _Grafo:
+    """Teclas de un teclado: carácter -> (x, y, con mayúsculas), vecinas y grado medio."""
+
+    def __init__(self, filas, direcciones):
+        self.posiciones: Dict[str, Tuple[int, int, bool]] = {}
+        por_posicion: Dict[Tuple[int, int], List[str]] = {}
+        for y, (desplazamiento, teclas, mayusculas) in enumerate(filas):
+            for i, tecla in enumerate(teclas):
+                x = desplazamiento + i
+                caracteres = por_posicion.setdefault((x, y), [])
+                for c, desplazada in ((tecla, False), (mayusculas[i:i + 1], True)):
+                    if c and c not in self.posiciones:
+                        self.posiciones[c] = (x, y, desplazada)
+                        caracteres.append(c)
+        self.teclas = len(por_posicion)
+        # (a, b) -> índice de la dirección de a a b, para cada par de teclas vecinas
+        self.direcciones: Dict[Tuple[str, str], int] = {}
+        for (x, y), caracteres in por_posicion.items():
+            for d, (dx, dy) in enumerate(direcciones):
+                for a in caracteres:
+                    for b in por_posicion.get((x + dx, y + dy), ()):
+                        self.direcciones[a, b] = d
+        vecinos = sum(1 for x, y in por_posicion for dx, dy in direcciones if (x + dx, y + dy) in por_posicion)
+        self.grado_medio = vecinos / self.teclas
+
+
+def _combinaciones_mayusculas(token: str) -> int:
+    """Variantes de mayúsculas que el atacante debe probar para `token`."""
+    if token.islower() or not any(c.isupper() for c in token):
+        return 1
+    if token.isupper() or (token[0].isupper() and not any(c.isupper() for c in token[1:])) \
+            or (token[-1].isupper() and not any(c.isupper() for c in token[:-1])):
+        return 2
+    mayusculas = sum(1 for c in token if c.isupper())
+    minusculas = sum(1 for c in token if c.islower())
+    return sum(math.comb(mayusculas + minusculas, i) for i in range(1, min(mayusculas, minusculas) + 1))
+
+
+def _combinaciones_l33t(original: str, normalizado: str) -> int:
+    total = 1
+    for letra in set(normalizado[i] for i in range(len(original)) if original[i] != normalizado[i]):
+        sustituidas = sum(1 for o, n in zip(original, normalizado) if n == letra and o != letra)
+        sin_sustituir = sum(1 for o in original.lower() if o == letra)
+        if not sin_sustituir:
+            total *= 2
+        else:
+            total *= sum(math.comb(sustituidas + sin_sustituir, i)
+                         for i in range(1, min(sustituidas, sin_sustituir) + 1))
+    return total
+
+
+def _espacio_anios(anio: int) -> int:
+    return max(abs(anio - _ANIO_REFERENCIA), _MIN_ESPACIO_ANIOS)
+
+
+def _anio_completo(anio: int) -> int:
+    if anio > 99:
+        return anio
+    return anio + (1900 if anio > 50 else 2000)
+
+
+def _fecha_valida(a: int, b: int, c: int) -> Optional[int]:
+    """Año si (a, b, c) se puede leer como una fecha en algún orden habitual."""
+    for dia, mes, anio in ((a, b, c), (b, a, c), (c, b, a)):
+        if 1 <= dia <= 31 and 1 <= mes <= 12 and (anio <= 99 or 1000 <= anio <= 2050):
+            return _anio_completo(anio)
+    return None
+
+
+class Estimacion:
+    """Resultado de EstimadorPatrones.estimar."""
+    __slots__ = ("intentos", "puntuacion", "patrones")
+
+    def __init__(self, intentos: float, puntuacion: int, patrones: int):
+        self.intentos = intentos  # intentos estimados para adivinarla
+        self.puntuacion = puntuacion  # 0 (trivial) - 4 (muy difícil)
+        self.patrones = patrones  # bits de los patrones de la descomposición elegida
+
+    def __repr__(self) -> str:
+        return f"Estimacion(intentos={self.intentos:.3g}, puntuacion={self.puntuacion}, patrones={self.patrones})"
+
+
+class EstimadorPatrones:
+    """
+    Estima los intentos necesarios para adivinar una contraseña.
+    `diccionarios`: nombre -> palabras de más a menos frecuente (el rango
+    de una palabra es su posición en la lista).
+    """
+
+    def __init__(self, diccionarios: Optional[Dict[str, Sequence[str]]] = None,
+                 teclados: Iterable = (_QWERTY, _QWERTY_ES)):
+        if diccionarios is None:
+            diccionarios = DICCIONARIOS_POR_DEFECTO
+        # Trie: carácter -> subárbol; la clave None guarda el rango de la palabra.
+        self._trie: Dict = {}
+        # Tres primeras y tres últimas letras con que puede empezar o acabar una
+        # palabra en la contraseña, derecha o al revés (ver puede_bajar_de).
+        self._inicios: Set[str] = set()
+        self._finales: Set[str] = set()
+        for palabras in diccionarios.values():
+            for rango, palabra in enumerate(palabras, 1):
+                palabra = palabra.lower()
+                if len(palabra) < _MIN_PALABRA:
+                    continue
+                nodo = self._trie
+                for c in palabra:
+                    nodo = nodo.setdefault(c, {})
+                if rango < nodo.get(None, math.inf):
+                    nodo[None] = rango
+                self._inicios.update((palabra[:_MIN_PALABRA], palabra[:-_MIN_PALABRA - 1:-1]))
+                self._finales.update((palabra[-_MIN_PALABRA:], palabra[_MIN_PALABRA - 1::-1]))
+        self._grafos = [_Grafo(filas, _DIRECCIONES_INCLINADO) for filas in teclados]
+        self._grafos.append(_Grafo(_TECLADO_NUMERICO, _DIRECCIONES_ALINEADO))
+        # Pares de teclas vecinas en cualquiera de los teclados
+        self._vecinas: Set[str] = {a + b for grafo in self._grafos for a, b in grafo.direcciones}
+
+    # ---------- Buscadores: (inicio, fin, intentos, patrón) ----------
+    def _palabras(self, texto: str) -> List[Tuple[int, int, int]]:
+        """(inicio, fin, rango) de las palabras del trie que aparecen en `texto`."""
+        encontradas = []
+        trie = self._trie
+        for i in range(len(texto)):
+            nodo = trie
+            for j in range(i, len(texto)):
+                nodo = nodo.get(texto[j])
+                if nodo is None:
+                    break
+                rango = nodo.get(None)
+                if rango is not None:
+                    encontradas.append((i, j + 1, rango))
+        return encontradas
+
+    def _diccionario(self, password: str, minusculas: str) -> List[Tuple[int, int, float, int]]:
+        n = len(password)
+        trozos = []
+        for i, j, rango in self._palabras(minusculas):
+            trozos.append((i, j, rango * _combinaciones_mayusculas(password[i:j]), DICCIONARIO))
+        for i, j, rango in self._palabras(minusculas[::-1]):
+            inicio, fin = n - j, n - i
+            trozos.append((inicio, fin, 2 * rango * _combinaciones_mayusculas(password[inicio:fin]), DICCIONARIO))
+        normalizado = minusculas.translate(_L33T)
+        if normalizado != minusculas:
+            for i, j, rango in self._palabras(normalizado):
+                original = minusculas[i:j]
+                if original != normalizado[i:j]:
+                    trozos.append((i, j, rango * _combinaciones_mayusculas(password[i:j])
+                                   * _combinaciones_l33t(original, normalizado[i:j]), DICCIONARIO))
+        return trozos
+
+    def _teclado(self, password: str) -> List[Tuple[int, int, float, int]]:
+        trozos = []
+        n = len(password)
+        for grafo in self._grafos:
+            direcciones = grafo.direcciones
+            i = 0
+            while i < n - 1:
+                j, giros, anterior = i + 1, 0, None
+                while j < n:
+                    direccion = direcciones.get((password[j - 1], password[j]))
+                    if direccion is None:
+                        break
+                    if direccion != anterior:
+                        giros += 1
+                        anterior = direccion
+                    j += 1
+                if j - i >= 3:
+                    trozos.append((i, j, self._intentos_teclado(grafo, password[i:j], giros), TECLADO))
+                i = j if j > i + 1 else i + 1
+        return trozos
+
+    @staticmethod
+    def _intentos_teclado(grafo: _Grafo, token: str, giros: int) -> float:
+        intentos = 0.0
+        for longitud in range(2, len(token) + 1):
+            for g in range(1, min(giros, longitud - 1) + 1):
+                intentos += math.comb(longitud - 1, g - 1) * grafo.teclas * grafo.grado_medio ** g
+        desplazadas = sum(1 for c in token if grafo.posiciones[c][2])
+        if desplazadas:
+            normales = len(token) - desplazadas
+            intentos *= 2 if not normales else sum(
+                math.comb(desplazadas + normales, i) for i in range(1, min(desplazadas, normales) + 1))
+        return intentos
+
+    def _repeticiones(self, password: str) -> List[Tuple[int, int, float, int]]:
+        trozos = []
+        inicio = 0
+        while inicio < len(password):
+            voraz = _REPETICION_VORAZ.search(password, inicio)
+            if voraz is None:
+                break
+            perezosa = _REPETICION_PEREZOSA.search(password, inicio)
+            if len(voraz.group(0)) > len(perezosa.group(0)):
+                coincidencia = voraz
+                base = _REPETICION_PEREZOSA.fullmatch(voraz.group(0)).group(1)
+            else:
+                coincidencia, base = perezosa, perezosa.group(1)
+            veces = len(coincidencia.group(0)) // len(base)
+            intentos_base = _FUERZA_BRUTA if len(base) == 1 else self.estimar(base).intentos
+            trozos.append((coincidencia.start(), coincidencia.end(), intentos_base * veces, REPETICION))
+            inicio = coincidencia.end()
+        return trozos
+
+    @staticmethod
+    def _secuencias(password: str) -> List[Tuple[int, int, float, int]]:
+        trozos = []
+        n = len(password)
+        i = 0
+        while i < n - 2:
+            delta = ord(password[i + 1]) - ord(password[i])
+            j = i + 1
+            while j < n and ord(password[j]) - ord(password[j - 1]) == delta:
+                j += 1
+            if j - i >= 3 and 0 < abs(delta) <= 5:
+                token = password[i:j]
+                primero = token[0]
+                base = 4 if primero in "aAzZ019" else 10 if primero.isdigit() else 26
+                trozos.append((i, j, base * (1 if delta > 0 else 2) * len(token), SECUENCIA))
+                i = j - 1
+            else:
+                i += 1
+        return trozos
+
+    @staticmethod
+    def _fechas(password: str) -> List[Tuple[int, int, float, int]]:
+        trozos = []
+        for m in _SEPARADA.finditer(password):
+            anio = _fecha_valida(int(m.group(1)), int(m.group(3)), int(m.group(4)))
+            if anio is not None:
+                trozos.append((m.start(), m.end(), 365 * _espacio_anios(anio) * 4, FECHA))
+        for inicio in range(len(password)):
+            m = _DIGITOS.match(password, inicio)
+            if m is None:
+                continue
+            digitos = m.group(0)
+            for largo in range(4, len(digitos) + 1):
+                token = digitos[:largo]
+                if largo == 4 and 1900 <= int(token) <= 2050:
+                    trozos.append((inicio, inicio + 4, _espacio_anios(int(token)), FECHA))
+                if largo in (6, 8):
+                    lados = ((token[:2], token[2:4], token[4:]), (token[:-4], token[-4:-2], token[-2:])) \
+                        if largo == 8 else ((token[:2], token[2:4], token[4:]),)
+                    for a, b, c in lados:
+                        anio = _fecha_valida(int(a), int(b), int(c))
+                        if anio is not None:
+                            trozos.append((inicio, inicio + largo, 365 * _espacio_anios(anio), FECHA))
+                            break
+        return trozos
+
+    # ---------- Estimación ----------
+    def coincidencias(self, password: str) -> List[Tuple[int, int, float, int]]:
+        """Todos los trozos con patrón: (inicio, fin, intentos, patrón)."""
+        return (self._diccionario(password, password.lower()) + self._teclado(password)
+                + self._repeticiones(password) + self._secuencias(password) + self._fechas(password))
+
+    def puede_bajar_de(self, password: str, puntuacion: int) -> bool:
+        """
+        Comprobación barata antes de estimar(): False si es seguro que la
+        puntuación de `password` llega a `puntuacion`; True si puede no llegar.
+        Tres trozos ya suman k! * 10^k + 10000^2 intentos. Si eso alcanza el
+        umbral, solo puede quedar por debajo una descomposición de uno o dos
+        trozos, y entonces algún patrón empieza en el primer carácter o acaba
+        en el último (dos trozos de fuerza bruta serían uno solo). Basta con
+        mirar los extremos.
+        """
+        if puntuacion <= 0:
+            return False
+        if puntuacion > len(_UMBRALES) or len(password) > _MAX_ANALIZADO:
+            return True
+        umbral = _UMBRALES[puntuacion - 1]
+        if _MINIMO_TRES_TROZOS < umbral or _FUERZA_BRUTA ** len(password) + 1 < umbral:
+            return True
+        minusculas = password.lower()
+        if len(minusculas) != len(password):
+            return True  # lower() cambió la longitud (p. ej. "İ"): no se comparan los extremos
+        inicio, final = minusculas[:3], minusculas[-3:]
+        if inicio in self._inicios or final in self._finales or inicio.translate(_L33T) in self._inicios \
+                or final.translate(_L33T) in self._finales:
+            return True  # palabra de diccionario (derecha, al revés o con l33t)
+        vecinas = self._vecinas
+        for a, b, c in (password[:3], password[:-4:-1]):
+            if a + b in vecinas and b + c in vecinas:
+                return True  # recorrido de teclado
+            delta = ord(b) - ord(a)
+            if 0 < abs(delta) <= 5 and ord(c) - ord(b) == delta:
+                return True  # secuencia
+        # repetición o fecha (el patrón de la fecha se lee igual al revés)
+        return bool(_EXTREMO.match(password) or _EXTREMO.match(password[::-1]))
+
+    def estimar(self, password: str) -> Estimacion:
+        if len(password) <= _MAX_ANALIZADO:
+            return self._estimar_tramo(password)
+        # El coste de la descomposición crece con el cuadrado de la longitud. Las
+        # repeticiones y secuencias se buscan antes en toda la contraseña y se
+        # reducen a su unidad (multiplicando por las veces, como en _repeticiones);
+        # de lo que queda solo se descompone el principio, que da una cota
+        # inferior: quien la adivine tiene que adivinar también ese principio.
+        reducida, factor, patrones = self._reducir(password)
+        tramo = self._estimar_tramo(reducida[:_MAX_ANALIZADO])
+        intentos = min(tramo.intentos * factor, _MAX_INTENTOS)
+        return Estimacion(intentos, _puntuacion(intentos), patrones | tramo.patrones)
+
+    def _reducir(self, password: str) -> Tuple[str, float, int]:
+        """
+        (contraseña reducida, factor, patrones): cada repetición queda en una
+        copia de su unidad y cada secuencia en sus tres primeros caracteres;
+        el factor son los intentos que se pierden al reducirlas.
+        """
+        factor, patrones = 1.0, 0
+        while len(password) > _MAX_ANALIZADO:
+            trozos = []
+            inicio = 0
+            while True:
+                m = _REPETICION_TRAMO.search(password, inicio)
+                if m is None:
+                    break
+                base = _REPETICION_PEREZOSA.fullmatch(m.group(0)).group(1)
+                # la unidad puede seguir repitiéndose más allá de lo que abarcó la expresión
+                fin = m.start()
+                while password.startswith(base, fin):
+                    fin += len(base)
+                if fin - m.start() >= _MIN_REDUCIDO:
+                    trozos.append((m.start(), fin, base, (fin - m.start()) // len(base), REPETICION))
+                    inicio = fin
+                else:
+                    inicio = m.start() + 1
+            reducida, f, p = _sustituir(password, trozos)
+            trozos = [(inicio, fin, reducida[inicio:inicio + 3], (fin - inicio) / 3, SECUENCIA)
+                      for inicio, fin, _, _ in self._secuencias(reducida) if fin - inicio >= _MIN_REDUCIDO]
+            reducida, g, q = _sustituir(reducida, trozos)
+            if len(reducida) == len(password):
+                break
+            password, factor, patrones = reducida, factor * f * g, patrones | p | q
+        return password, factor, patrones
+
+    def _estimar_tramo(self, password: str) -> Estimacion:
+        """Descomposición de un tramo de como mucho _MAX_ANALIZADO caracteres."""
+        n = len(password)
+        if n == 0:
+            return Estimacion(1.0, 0, 0)
+
+        por_fin: List[List[Tuple[int, float, int]]] = [[] for _ in range(n + 1)]
+        for inicio, fin, intentos, patron in self.coincidencias(password):
+            if fin - inicio < n:
+                intentos = max(intentos, _MIN_UN_CARACTER if fin - inicio == 1 else _MIN_VARIOS_CARACTERES)
+            por_fin[fin].append((inicio, float(intentos), patron))
+
+        # Mejor producto de k trozos que cubren password[:j], separado según el
+        # último trozo sea un patrón o fuerza bruta (que se alarga de carácter
+        # en carácter: dos trozos de fuerza bruta seguidos serían uno solo).
+        # con_patron[j][k] = (producto, inicio, patrón, el anterior era fuerza bruta)
+        # bruta[j][k] = (producto, inicio)
+        # Solo se guarda un k mayor si mejora el producto: más trozos siempre penalizan.
+        con_patron: List[Dict[int, Tuple[float, int, int, bool]]] = [{} for _ in range(n + 1)]
+        bruta: List[Dict[int, Tuple[float, int]]] = [{} for _ in range(n + 1)]
+        con_patron[0][0] = (1.0, -1, 0, False)
+        for fin in range(1, n + 1):
+            mejores: Dict[int, Tuple[float, int, int, bool]] = {}
+            for inicio, intentos, patron in por_fin[fin]:
+                for previos, previa_bruta in ((con_patron[inicio], False), (bruta[inicio], True)):
+                    for k, estado in previos.items():
+                        valor = estado[0] * intentos
+                        if valor < mejores.get(k + 1, _SIN_ESTADO)[0]:
+                            mejores[k + 1] = (valor, inicio, patron, previa_bruta)
+            con_patron[fin] = _frente(mejores)
+
+            alargadas = {k: (valor * _FUERZA_BRUTA, inicio) for k, (valor, inicio) in bruta[fin - 1].items()}
+            for k, estado in con_patron[fin - 1].items():
+                valor = estado[0] * _FUERZA_BRUTA
+                if valor < alargadas.get(k + 1, _SIN_ESTADO)[0]:
+                    alargadas[k + 1] = (valor, fin - 1)
+            bruta[fin] = _frente(alargadas)
+
+        intentos, mejor = math.inf, None
+        for estados, es_bruta in ((con_patron[n], False), (bruta[n], True)):
+            for k, estado in estados.items():
+                total = math.factorial(k) * estado[0] + _PENALIZACION_TROZOS ** (k - 1)
+                if total < intentos:
+                    intentos, mejor = total, (k, es_bruta)
+        patrones, fin = 0, n
+        k, es_bruta = mejor
+        while k:
+            if es_bruta:
+                fin, es_bruta = bruta[fin][k][1], False
+            else:
+                _, inicio, patron, es_bruta = con_patron[fin][k]
+                patrones |= patron
+                fin = inicio
+            k -= 1
+        return Estimacion(intentos, _puntuacion(intentos), patrones)
+
+
+def _puntuacion(intentos: float) -> int:
+    return sum(1 for umbral in _UMBRALES if intentos >= umbral)
+
+
+def _sustituir(password: str, trozos: List[Tuple[int, int, str, float, int]]) -> Tuple[str, float, int]:
+    """Cambia cada trozo (inicio, fin, sustituto, factor, patrón) por su sustituto; ignora los solapados."""
+    partes, factor, patrones, fin_anterior = [], 1.0, 0, 0
+    for inicio, fin, sustituto, veces, patron in trozos:
+        if inicio < fin_anterior:
+            continue
+        partes.append(password[fin_anterior:inicio])
+        partes.append(sustituto)
+        factor *= veces
+        patrones |= patron
+        fin_anterior = fin
+    partes.append(password[fin_anterior:])
+    return "".join(partes), factor, patrones
+
+
+def _frente(estados: Dict[int, tuple]) -> Dict[int, tuple]:
+    """Estados por número de trozos, sin los k que no mejoran el producto de un k menor."""
+    frente, minimo = {}, math.inf
+    for k in sorted(estados):
+        if estados[k][0] < minimo:
+            frente[k] = estados[k]
+            minimo = estados[k][0]
+    return frente
+
+
+def mensajes_patrones(patrones: int, mensajes: Dict[str, str]) -> List[str]:
+    """Detalles para los patrones de una estimación (los de `mensajes` o los por defecto)."""
+    claves = [criterio for bit, criterio in CRITERIOS_PATRON if patrones & bit] or [ADIVINABLE]
+    return [mensajes.get(clave, MENSAJES_POR_DEFECTO[clave]) for clave in claves]
+
+
+_por_defecto: Optional[EstimadorPatrones] = None
+
+
+def estimador_por_defecto() -> EstimadorPatrones:
+    """Estimador con los diccionarios y teclados incluidos, construido una vez por proceso."""
+    global _por_defecto
+    if _por_defecto is None:
+        _por_defecto = EstimadorPatrones()
+    return _por_defecto
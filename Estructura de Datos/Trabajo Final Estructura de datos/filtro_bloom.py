@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Filtro de Bloom para descartar rápido las contraseñas que no son comunes.
+
+La mayoría de contraseñas verificadas no están en ninguna lista; el filtro
+responde "seguro que no es común" en tiempo constante con k lecturas de
+bits, y solo los posibles aciertos pasan a la búsqueda exacta
+(ListaBloqueo). La tasa de falsos positivos se elige al construirlo.
+
+Formato del archivo:
+    cabecera de 24 bytes: b"BLM1" | k (1 byte) | 3 bytes reservados | m bits (8 bytes) | n entradas (8 bytes)
+    array de bits: ceil(m / 8) bytes
+
+Uso como script (con la misma lista de palabras que lista_bloqueo.py):
+    python filtro_bloom.py wordlist.txt comunes.bloom [--fp 0.01]
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+from typing import Optional, Tuple
+
+from lista_bloqueo import leer_palabras
+
+MAGIC = b"BLM1"
+_CABECERA = struct.Struct(">4sB3xQQ")
+FP_POR_DEFECTO = 0.01
+
+
+def parametros_optimos(n: int, tasa_fp: float) -> Tuple[int, int]:
+    """Devuelve (m bits, k funciones hash) para `n` entradas y la tasa de falsos positivos dada."""
+    n = max(1, n)
+    m = max(8, math.ceil(-n * math.log(tasa_fp) / (math.log(2) ** 2)))
+    k = max(1, round(m / n * math.log(2)))
+    return m, k
+
+
+def _posiciones(password: str, m: int, k: int):
+    """k posiciones de bit por doble hashing sobre un único BLAKE2b de 128 bits."""
+    h = hashlib.blake2b(password.encode("utf-8"), digest_size=16).digest()
+    h1 = int.from_bytes(h[:8], "big")
+    h2 = int.from_bytes(h[8:], "big") | 1
+    return [(h1 + i * h2) % m for i in range(k)]
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom de solo lectura sobre un archivo (mmap, abierto en el
+    primer uso). `password in filtro` es False solo si seguro que no está;
+    si el archivo no existe responde True (no descarta nada).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+        self._m = 0
+        self._k = 0
+        self._abierto = False
+
+    def _abrir(self) -> None:
+        self._abierto = True
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= _CABECERA.size:
+            return
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._k, self._m, _ = _CABECERA.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} no es un filtro de Bloom.")
+
+    def __contains__(self, password: str) -> bool:
+        if not self._abierto:
+            self._abrir()
+        if self._mm is None:
+            return True
+        mm, base = self._mm, _CABECERA.size
+        for pos in _posiciones(password, self._m, self._k):
+            if not mm[base + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+
+def construir_filtro_bloom(wordlist_path: str, salida_path: str, tasa_fp: float = FP_POR_DEFECTO) -> Tuple[int, int]:
+    """
+    Construye el filtro a partir de la lista de palabras (en dos pasadas:
+    contar y marcar bits). Devuelve (entradas, bytes del archivo).
+    """
+    n = sum(1 for _ in leer_palabras(wordlist_path))
+    m, k = parametros_optimos(n, tasa_fp)
+    bits = bytearray((m + 7) // 8)
+    for palabra in leer_palabras(wordlist_path):
+        for pos in _posiciones(palabra, m, k):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    tmp = salida_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_CABECERA.pack(MAGIC, k, m, n))
+        f.write(bits)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, salida_path)
+    return n, _CABECERA.size + len(bits)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Construye el filtro de Bloom de contraseñas comunes.")
+    parser.add_argument("wordlist", help="lista de palabras en texto plano (una por línea)")
+    parser.add_argument("salida", help="archivo del filtro a generar (p. ej. comunes.bloom)")
+    parser.add_argument("--fp", type=float, default=FP_POR_DEFECTO, help="tasa de falsos positivos deseada")
+    args = parser.parse_args()
+    entradas, tam = construir_filtro_bloom(args.wordlist, args.salida, args.fp)
+    print(f"Filtro de {entradas} entradas ({tam / 1024:.1f} KiB, fp≈{args.fp}) escrito en {args.salida}.")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Importación masiva de usuarios desde CSV o JSONL.
+
+Lee el archivo como flujo, en lotes de `lote` filas: evalúa la fuerza con
+VerificarContrasena y calcula los hashes en el pool de procesos de
+Trabajofinal, y guarda cada lote en el almacén con una sola escritura
+durable (UserStore.put_many). La memoria depende del tamaño del lote, no
+del archivo.
+
+Formatos de entrada (se deduce por la extensión si no se indica):
+    CSV:   cabecera con columnas username,password (o usuario,contraseña)
+    JSONL: una línea {"username": ..., "password": ...} por usuario
+
+Uso como script:
+    python importacion.py usuarios.csv [--lote 1000] [--workers N]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice, repeat
+from typing import Callable, Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+import Trabajofinal
+
+LOTE_POR_DEFECTO = 1000
+_CLAVES_USUARIO = ("username", "usuario")
+_CLAVES_PASSWORD = ("password", "contraseña")
+
+
+def _campo(fila: Dict, claves: Tuple[str, ...]) -> Optional[str]:
+    for clave in claves:
+        valor = fila.get(clave)
+        if valor:
+            return valor
+    return None
+
+
+def _leer_filas(path: str, formato: str) -> Iterator[Optional[Tuple[str, str]]]:
+    """Devuelve (usuario, contraseña) por fila, o None si la fila no es válida."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from leer_filas(f, formato)
+
+
+def leer_filas(f: TextIO, formato: str) -> Iterator[Optional[Tuple[str, str]]]:
+    """Como _leer_filas, pero de un archivo de texto ya abierto (p. ej. sys.stdin)."""
+    if formato == "csv":
+        filas = csv.DictReader(f)
+    else:
+        filas = (_json_o_none(linea) for linea in f if linea.strip())
+    for fila in filas:
+        if not isinstance(fila, dict):
+            yield None
+            continue
+        username = _campo(fila, _CLAVES_USUARIO)
+        password = _campo(fila, _CLAVES_PASSWORD)
+        yield (username.strip(), password) if username and password else None
+
+
+def _json_o_none(linea: str):
+    try:
+        return json.loads(linea)
+    except ValueError:
+        return None
+
+
+def _formato_de(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"No se reconoce el formato de {path}; indica formato='csv' o 'jsonl'.")
+
+
+def _progreso_consola(resumen: Dict[str, int]) -> None:
+    print(f"\rprocesadas {resumen['procesadas']}  importadas {resumen['importadas']}  "
+          f"duplicadas {resumen['duplicadas']}  errores {resumen['errores']}", end="", file=sys.stderr)
+
+
+def importar_usuarios(path: str, formato: Optional[str] = None, lote: int = LOTE_POR_DEFECTO,
+                      workers: Optional[int] = None,
+                      progreso: Optional[Callable[[Dict[str, int]], None]] = _progreso_consola) -> Dict[str, int]:
+    """
+    Importa los usuarios de `path` al almacén de Trabajofinal.
+    - los usuarios ya existentes (o repetidos en el archivo) se cuentan como duplicados
+    - las filas sin usuario o contraseña se cuentan como errores
+    - `progreso` se llama tras guardar cada lote con el resumen acumulado
+    Devuelve el resumen final {'procesadas', 'importadas', 'duplicadas', 'errores'}.
+    """
+    formato = formato or _formato_de(path)
+    return importar_filas(_leer_filas(path, formato), lote, workers, progreso)
+
+
+def importar_filas(filas: Iterable[Optional[Tuple[str, str]]], lote: int = LOTE_POR_DEFECTO,
+                   workers: Optional[int] = None,
+                   progreso: Optional[Callable[[Dict[str, int]], None]] = _progreso_consola) -> Dict[str, int]:
+    """Como importar_usuarios, pero de filas ya leídas (p. ej. leer_filas(sys.stdin, formato))."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    store = Trabajofinal._get_store()
+    params = dict(Trabajofinal.KDF_PARAMS)
+    resumen = {"procesadas": 0, "importadas": 0, "duplicadas": 0, "errores": 0}
+
+    filas = iter(filas)
+    while True:
+        bloque = list(islice(filas, lote))
+        if not bloque:
+            break
+        usernames, passwords = [], []
+        vistos = set()
+        for fila in bloque:
+            if fila is None:
+                resumen["errores"] += 1
+            elif fila[0] in store or fila[0] in vistos:
+                resumen["duplicadas"] += 1
+            else:
+                vistos.add(fila[0])
+                usernames.append(fila[0])
+                passwords.append(fila[1])
+
+        if workers > 1 and len(passwords) > 1:
+            chunksize = max(1, len(passwords) // (workers * 4))
+            registros = Trabajofinal._get_pool(workers).map(
+                Trabajofinal._nuevo_registro, passwords, repeat(params), chunksize=chunksize)
+        else:
+            registros = map(Trabajofinal._nuevo_registro, passwords, repeat(params))
+        # El alta se vuelve a comprobar bajo el bloqueo: un usuario registrado
+        # mientras se calculaban los hashes no se sobrescribe
+        omitidos = store.add_many(zip(usernames, registros))
+        resumen["importadas"] += len(usernames) - len(omitidos)
+        resumen["duplicadas"] += len(omitidos)
+        resumen["procesadas"] += len(bloque)
+        if progreso is not None:
+            progreso(dict(resumen))
+    return resumen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa usuarios en bloque desde CSV o JSONL.")
+    parser.add_argument("archivo", help="archivo .csv o .jsonl con username,password")
+    parser.add_argument("--formato", choices=("csv", "jsonl"), help="por defecto se deduce de la extensión")
+    parser.add_argument("--lote", type=int, default=LOTE_POR_DEFECTO, help="filas por escritura durable")
+    parser.add_argument("--workers", type=int, help="procesos para el hashing (por defecto, todos los núcleos)")
+    args = parser.parse_args()
+    final = importar_usuarios(args.archivo, args.formato, args.lote, args.workers)
+    print(file=sys.stderr)
+    print(json.dumps(final))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Funciones de derivación de claves (KDF) con parámetros por registro.
+
+Cada usuario guarda en su registro el algoritmo y los parámetros con los
+que se calculó su hash, p. ej.:
+    "kdf": {"alg": "pbkdf2_sha256", "iteraciones": 200000}
+    "kdf": {"alg": "scrypt", "n": 16384, "r": 8, "p": 1}
+Los registros antiguos sin "kdf" usan KDF_LEGADO.
+
+Uso como script (calibración en la máquina actual):
+    python kdf.py --objetivo-ms 250 [--guardar kdf.json]
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict
+
+# Parámetros implícitos de los registros creados antes de guardar "kdf".
+KDF_LEGADO: Dict = {"alg": "pbkdf2_sha256", "iteraciones": 200_000}
+# Política por defecto para hashes nuevos (se puede sustituir con kdf.json).
+KDF_POR_DEFECTO: Dict = dict(KDF_LEGADO)
+
+
+def _pbkdf2_sha256(password: bytes, salt: bytes, params: Dict) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password, salt, params["iteraciones"])
+
+
+def _scrypt(password: bytes, salt: bytes, params: Dict) -> bytes:
+    n, r, p = params["n"], params["r"], params["p"]
+    # memoria necesaria ~128*r*n bytes; se deja margen sobre el límite por defecto
+    return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=256 * r * n, dklen=32)
+
+
+_KDFS: Dict[str, Callable[[bytes, bytes, Dict], bytes]] = {
+    "pbkdf2_sha256": _pbkdf2_sha256,
+    "scrypt": _scrypt,
+}
+
+
+def derivar_clave(password: str, salt: bytes, params: Dict = None) -> bytes:
+    """Calcula el hash de `password` con el algoritmo indicado en `params`."""
+    if params is None:
+        params = KDF_LEGADO
+    try:
+        kdf = _KDFS[params["alg"]]
+    except KeyError:
+        raise ValueError(f"Algoritmo KDF desconocido: {params.get('alg')!r}")
+    return kdf(password.encode("utf-8"), salt, params)
+
+
+def cargar_parametros(path: str) -> Dict:
+    """Lee la política KDF de `path` (p. ej. kdf.json); si no existe, usa KDF_POR_DEFECTO."""
+    if not os.path.exists(path):
+        return dict(KDF_POR_DEFECTO)
+    with open(path, "r", encoding="utf-8") as f:
+        params = json.load(f)
+    if params.get("alg") not in _KDFS:
+        raise ValueError(f"Algoritmo KDF desconocido en {path}: {params.get('alg')!r}")
+    return params
+
+
+def calibrar_pbkdf2(objetivo_ms: float, muestra: int = 50_000) -> int:
+    """
+    Devuelve el número de iteraciones PBKDF2-SHA256 que tarda aproximadamente
+    `objetivo_ms` milisegundos en esta máquina (redondeado a miles).
+    """
+    salt = os.urandom(16)
+    _pbkdf2_sha256(b"calibracion", salt, {"iteraciones": 1_000})  # calentamiento
+    mejor = float("inf")
+    for _ in range(3):
+        inicio = time.perf_counter()
+        _pbkdf2_sha256(b"calibracion", salt, {"iteraciones": muestra})
+        mejor = min(mejor, time.perf_counter() - inicio)
+    iteraciones = int(muestra * (objetivo_ms / 1000) / mejor)
+    return max(1_000, round(iteraciones, -3))
+
+
+if __name__ == "__main__":
+    import argparse  # solo para el script: importar el módulo no lo carga
+
+    parser = argparse.ArgumentParser(description="Calibra las iteraciones PBKDF2 para un presupuesto de latencia.")
+    parser.add_argument("--objetivo-ms", type=float, default=250.0, help="latencia deseada por hash (ms)")
+    parser.add_argument("--guardar", metavar="RUTA", help="escribe la política resultante (p. ej. kdf.json)")
+    args = parser.parse_args()
+
+    iteraciones = calibrar_pbkdf2(args.objetivo_ms)
+    params = {"alg": "pbkdf2_sha256", "iteraciones": iteraciones}
+    print(f"{iteraciones} iteraciones ≈ {args.objetivo_ms:.0f} ms por hash en esta máquina.")
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(params, f, indent=2)
+        print(f"Política guardada en {args.guardar}.")
+    else:
+        print(json.dumps(params))
@@ -0,0 +1,118 @@
+"""
+Limitación de intentos de login por usuario y por origen.
+
+Cada intento fallido contra AutenticarUsuario cuesta un PBKDF2 completo;
+un atacante que prueba contraseñas en masa puede agotar la CPU. El
+limitador se consulta antes de calcular ningún hash y rechaza en
+microsegundos los intentos que superan el límite.
+
+Usa cubetas de fichas (token bucket): cada clave tiene `capacidad` fichas
+que se recargan a `recarga` fichas por segundo y cada intento gasta una
+(en los lotes, permitidos() reparte las fichas disponibles y solo los
+intentos que fallan las gastan, con fallo()).
+Las tablas por usuario y por origen tienen un tamaño máximo; al llenarse
+se expulsa la clave usada hace más tiempo (LRU), de modo que la memoria
+está acotada aunque el atacante invente usuarios u orígenes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class TablaCubetas:
+    """Tabla acotada clave -> (fichas, instante de la última recarga) con expulsión LRU."""
+
+    def __init__(self, capacidad: float, recarga: float, max_claves: int = 100_000):
+        self.capacidad = capacidad
+        self.recarga = recarga  # fichas por segundo
+        self.max_claves = max_claves
+        self._cubetas: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def _fichas(self, clave: str, ahora: float) -> float:
+        cubeta = self._cubetas.get(clave)
+        if cubeta is None:
+            return self.capacidad
+        fichas, instante = cubeta
+        return min(self.capacidad, fichas + (ahora - instante) * self.recarga)
+
+    def disponible(self, clave: str, ahora: float) -> bool:
+        return self._fichas(clave, ahora) >= 1.0
+
+    def consumir(self, clave: str, ahora: float) -> None:
+        self._cubetas[clave] = (self._fichas(clave, ahora) - 1.0, ahora)
+        self._cubetas.move_to_end(clave)
+        if len(self._cubetas) > self.max_claves:
+            self._cubetas.popitem(last=False)  # la clave inactiva hace más tiempo
+
+    def reiniciar(self, clave: str) -> None:
+        self._cubetas.pop(clave, None)
+
+    def __len__(self) -> int:
+        return len(self._cubetas)
+
+
+class LimitadorIntentos:
+    """
+    Límite combinado: un intento se permite solo si hay ficha tanto para el
+    usuario como para el origen (IP, terminal...); entonces gasta una de cada.
+    """
+
+    def __init__(self, por_usuario: Tuple[float, float] = (5, 5 / 60),
+                 por_origen: Tuple[float, float] = (20, 1.0), max_claves: int = 100_000,
+                 reloj: Callable[[], float] = time.monotonic):
+        # (capacidad, recarga por segundo): 5 intentos seguidos y luego 5/min por
+        # usuario; 20 seguidos y luego 1/s por origen.
+        self._reloj = reloj
+        self._usuarios = TablaCubetas(*por_usuario, max_claves=max_claves)
+        self._origenes = TablaCubetas(*por_origen, max_claves=max_claves)
+        self._lock = threading.Lock()
+
+    def permitir(self, usuario: str, origen: Optional[str] = None) -> bool:
+        """True si el intento puede continuar (y lo descuenta); False si se debe rechazar."""
+        with self._lock:
+            ahora = self._reloj()
+            if not self._usuarios.disponible(usuario, ahora):
+                return False
+            if origen is not None and not self._origenes.disponible(origen, ahora):
+                return False
+            self._usuarios.consumir(usuario, ahora)
+            if origen is not None:
+                self._origenes.consumir(origen, ahora)
+            return True
+
+    def permitidos(self, usuarios: Iterable[str], origen: Optional[str] = None) -> List[bool]:
+        """
+        Para un lote de intentos (un usuario por intento, en orden), cuáles
+        caben en las fichas disponibles ahora, sin gastarlas: en el lote solo
+        gastan ficha los intentos que fallan (fallo()), así que los aciertos
+        de un lote legítimo no agotan el cupo de su usuario.
+        """
+        with self._lock:
+            ahora = self._reloj()
+            libres_origen = self._origenes._fichas(origen, ahora) if origen is not None else float("inf")
+            usados: Dict[str, int] = {}
+            resultado = []
+            for usuario in usuarios:
+                n = usados.get(usuario, 0) + 1
+                if n <= self._usuarios._fichas(usuario, ahora) and libres_origen >= 1.0:
+                    usados[usuario] = n
+                    libres_origen -= 1.0
+                    resultado.append(True)
+                else:
+                    resultado.append(False)
+            return resultado
+
+    def fallo(self, usuario: str, origen: Optional[str] = None) -> None:
+        """Gasta una ficha del usuario y otra del origen por un intento de lote que falló."""
+        with self._lock:
+            ahora = self._reloj()
+            self._usuarios.consumir(usuario, ahora)
+            if origen is not None:
+                self._origenes.consumir(origen, ahora)
+
+    def exito(self, usuario: str) -> None:
+        """Un login correcto devuelve al usuario su cupo completo."""
+        with self._lock:
+            self._usuarios.reiniciar(usuario)
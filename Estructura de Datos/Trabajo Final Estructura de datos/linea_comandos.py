@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Línea de comandos no interactiva del Gestor de Contraseñas Seguras.
+
+main_loop() (el menú con input()) no se puede automatizar y lanzar un
+proceso por operación paga el arranque cada vez. Aquí cada subcomando
+procesa todas las operaciones que recibe en un solo proceso, por lotes, y
+escribe un resultado JSON por línea (JSONL) en stdout en cuanto termina
+cada lote, así que otro programa puede ir leyéndolos.
+
+Las contraseñas nunca van en los argumentos (quedarían en el historial y
+en la lista de procesos): se leen de stdin o de un archivo, como
+    JSONL: una línea {"username": ..., "password": ...} por operación
+    CSV:   cabecera username,password (o usuario,contraseña)
+o, con --usuario, una contraseña por línea para ese usuario.
+
+Uso (también como `python Trabajofinal.py <subcomando> ...`):
+    python linea_comandos.py register [--entrada F] [--formato jsonl|csv] [--usuario U] [--lote N] [--workers N]
+    python linea_comandos.py auth     [--entrada F] [--formato jsonl|csv] [--usuario U] [--lote N] [--workers N] [--origen O]
+    python linea_comandos.py list     [--prefijo P]
+    python linea_comandos.py alerts
+    python linea_comandos.py show     [usuario ...]   (sin usuarios: uno por línea de --entrada)
+    python linea_comandos.py import   archivo.csv|archivo.jsonl|- [--formato] [--lote N] [--workers N]
+    python linea_comandos.py audit    candidatos.txt|- [--politica registro|gui] [--detalle] [--rapido]
+
+Cada línea de salida lleva "op" con el subcomando; las filas de entrada no
+válidas producen una línea con "error" (sin la contraseña). El código de
+salida es 1 si hubo alguna, 0 si no.
+"""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import nullcontext
+from itertools import islice
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import Trabajofinal
+
+LOTE_POR_DEFECTO = 256
+
+
+class _Salida:
+    """Escribe líneas JSONL y recuerda si alguna fue un error."""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.errores = 0
+
+    def emitir(self, op: str, **campos) -> None:
+        if "error" in campos:
+            self.errores += 1
+        self.f.write(json.dumps({"op": op, **campos}, ensure_ascii=False) + "\n")
+
+    def lote_terminado(self) -> None:
+        self.f.flush()
+
+
+# ---------- Entrada ----------
+def _abrir(path: str) -> ContextManager[TextIO]:
+    """Archivo de entrada para usar con `with` ("-" es stdin, que no se cierra)."""
+    if path == "-":
+        return nullcontext(sys.stdin)
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _formato(path: str, formato: Optional[str]) -> str:
+    if formato:
+        return formato
+    if path != "-" and os.path.splitext(path)[1].lower() == ".csv":
+        return "csv"
+    return "jsonl"
+
+
+def _pares(args) -> Iterator[Optional[Tuple[str, str]]]:
+    """(usuario, contraseña) por operación de entrada, o None si la fila no es válida."""
+    from importacion import leer_filas
+
+    with _abrir(args.entrada) as f:
+        if args.usuario is not None:
+            for linea in f:
+                password = linea.rstrip("\r\n")
+                yield (args.usuario, password) if password else None
+        else:
+            yield from leer_filas(f, _formato(args.entrada, args.formato))
+
+
+def _lotes(filas: Iterable, tam: int) -> Iterator[list]:
+    filas = iter(filas)
+    while True:
+        lote = list(islice(filas, tam))
+        if not lote:
+            return
+        yield lote
+
+
+def _mapear(funcion: Callable, argumentos: List[tuple], workers: int) -> Iterable:
+    """funcion(*a) para cada a, en el pool de procesos de Trabajofinal si compensa."""
+    if workers > 1 and len(argumentos) > 1:
+        chunksize = max(1, len(argumentos) // (workers * 4))
+        return Trabajofinal._get_pool(workers).map(funcion, *zip(*argumentos), chunksize=chunksize)
+    return (funcion(*a) for a in argumentos)
+
+
+# ---------- Subcomandos ----------
+def _cmd_register(args, salida: _Salida) -> None:
+    store = Trabajofinal._get_store()
+    params = dict(Trabajofinal.KDF_PARAMS)
+    for lote in _lotes(_pares(args), args.lote):
+        # Los hashes del lote se calculan juntos y el lote se guarda con una sola
+        # escritura; add_many vuelve a comprobar bajo el bloqueo quién ya existe.
+        vistos = set()
+        nuevos = []
+        for fila in lote:
+            if fila is not None and fila[0] not in store and fila[0] not in vistos:
+                vistos.add(fila[0])
+                nuevos.append(fila)
+        registros = dict(zip((u for u, _ in nuevos),
+                             _mapear(Trabajofinal._nuevo_registro, [(p, params) for _, p in nuevos], args.workers)))
+        for username in store.add_many(registros.items()):
+            del registros[username]
+        for fila in lote:
+            if fila is None:
+                salida.emitir("register", error="Fila sin usuario o contraseña.")
+                continue
+            username = fila[0]
+            registro = registros.pop(username, None)
+            if registro is None:
+                salida.emitir("register", username=username, ok=False, mensaje="El usuario ya existe.")
+            else:
+                ver = registro["evaluacion"]
+                salida.emitir("register", username=username, ok=True, fuerte=ver["fuerte"],
+                              mensaje=Trabajofinal._mensaje_registro(ver))
+        salida.lote_terminado()
+
+
+def _cmd_auth(args, salida: _Salida) -> None:
+    for lote in _lotes(_pares(args), args.lote):
+        validos = [fila for fila in lote if fila is not None]
+        resultados = iter(Trabajofinal.AutenticarUsuarios(validos, workers=args.workers, origen=args.origen))
+        for fila in lote:
+            if fila is None:
+                salida.emitir("auth", error="Fila sin usuario o contraseña.")
+            else:
+                salida.emitir("auth", username=fila[0], ok=next(resultados))
+        salida.lote_terminado()
+
+
+def _cmd_list(args, salida: _Salida) -> None:
+    for username in sorted(Trabajofinal._get_store().keys()):
+        if username.startswith(args.prefijo):
+            salida.emitir("list", username=username)
+
+
+def _cmd_alerts(args, salida: _Salida) -> None:
+    for username, texto in Trabajofinal._alertas(Trabajofinal._get_store()):
+        salida.emitir("alerts", username=username, alerta=texto)
+
+
+def _cmd_show(args, salida: _Salida) -> None:
+    if args.usuarios:
+        _mostrar(args.usuarios, salida)
+        return
+    with _abrir(args.entrada) as f:
+        _mostrar((linea.strip() for linea in f if linea.strip()), salida)
+
+
+def _mostrar(usuarios: Iterable[str], salida: _Salida) -> None:
+    store = Trabajofinal._get_store()
+    for username in usuarios:
+        info = store.get(username)
+        if info is None:
+            salida.emitir("show", username=username, encontrado=False)
+            continue
+        evaluacion = info.get("evaluacion") or {}
+        salida.emitir("show", username=username, encontrado=True, fuerte=evaluacion.get("fuerte"),
+                      puntuacion=evaluacion.get("puntuacion"), detalles=evaluacion.get("detalles"),
+                      kdf=info.get("kdf"))
+
+
+def _cmd_import(args, salida: _Salida) -> None:
+    from importacion import importar_filas, leer_filas
+
+    with _abrir(args.archivo) as f:
+        resumen = importar_filas(leer_filas(f, _formato(args.archivo, args.formato)), args.lote, args.workers,
+                                 progreso=lambda r: (salida.emitir("import", progreso=r), salida.lote_terminado()))
+    salida.errores += resumen["errores"]
+    salida.emitir("import", **resumen)
+
+
+def _cmd_audit(args, salida: _Salida) -> None:
+    from auditoria import AuditorMasivo, _politica, resumir
+
+    auditor = AuditorMasivo(_politica(args.politica), rapido=args.rapido)
+    if args.archivo == "-":
+        resultados = auditor.auditar_flujo(sys.stdin.buffer)
+    else:
+        resultados = auditor.auditar_archivo(args.archivo)
+
+    def con_filas(resultados: Iterator[Dict]) -> Iterator[Dict]:
+        fila = 0
+        for resultado in resultados:
+            for i in range(len(resultado["mascara"])):
+                salida.emitir("audit", fila=fila, **auditor.como_dict(resultado, i))
+                fila += 1
+            salida.lote_terminado()
+            yield resultado
+
+    salida.emitir("audit", resumen=resumir(auditor, con_filas(resultados) if args.detalle else resultados))
+
+
+_SUBCOMANDOS = {
+    "register": _cmd_register,
+    "auth": _cmd_auth,
+    "list": _cmd_list,
+    "alerts": _cmd_alerts,
+    "show": _cmd_show,
+    "import": _cmd_import,
+    "audit": _cmd_audit,
+}
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="Trabajofinal.py", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="subcomando", required=True)
+    workers = os.cpu_count() or 1
+
+    for nombre, ayuda in (("register", "registra usuarios (una línea de salida por alta)"),
+                          ("auth", "autentica pares usuario/contraseña")):
+        p = sub.add_parser(nombre, help=ayuda)
+        p.add_argument("--entrada", default="-", help="archivo con las operaciones (por defecto, stdin)")
+        p.add_argument("--formato", choices=("jsonl", "csv"), help="por defecto jsonl (o csv por la extensión)")
+        p.add_argument("--usuario", help="todas las líneas son contraseñas de este usuario")
+        p.add_argument("--lote", type=int, default=LOTE_POR_DEFECTO, help="operaciones por lote")
+        p.add_argument("--workers", type=int, default=workers, help="procesos para el KDF")
+        if nombre == "auth":
+            p.add_argument("--origen", help="origen de los intentos para el limitador (p. ej. la IP)")
+
+    p = sub.add_parser("list", help="usuarios registrados, en orden alfabético")
+    p.add_argument("--prefijo", default="", help="solo los que empiezan por este prefijo")
+
+    sub.add_parser("alerts", help="alertas de contraseñas débiles")
+
+    p = sub.add_parser("show", help="evaluación guardada de usuarios")
+    p.add_argument("usuarios", nargs="*", help="usuarios a consultar (por defecto, uno por línea de --entrada)")
+    p.add_argument("--entrada", default="-", help="archivo con un usuario por línea (por defecto, stdin)")
+
+    p = sub.add_parser("import", help="importación masiva (resumen por lote)")
+    p.add_argument("archivo", help="archivo .csv o .jsonl, o - para stdin")
+    p.add_argument("--formato", choices=("jsonl", "csv"))
+    p.add_argument("--lote", type=int, default=1000, help="filas por escritura durable")
+    p.add_argument("--workers", type=int, default=workers, help="procesos para el KDF")
+
+    p = sub.add_parser("audit", help="auditoría en bloque de contraseñas candidatas")
+    p.add_argument("archivo", help="texto con una contraseña por línea, o - para stdin")
+    p.add_argument("--politica", choices=("registro", "gui"), default="registro")
+    p.add_argument("--detalle", action="store_true", help="una línea por contraseña además del resumen")
+    p.add_argument("--rapido", action="store_true",
+                   help="sin el estimador de patrones: más rápido, pero puede dar por fuertes contraseñas que no lo son")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, salida: TextIO = None) -> int:
+    args = _parser().parse_args(argv)
+    destino = _Salida(salida or sys.stdout)
+    try:
+        _SUBCOMANDOS[args.subcomando](args, destino)
+        destino.lote_terminado()
+    except BrokenPipeError:
+        # Quien leía la salida (p. ej. `| head`) ya terminó. Lo que quede en el
+        # búfer no se puede escribir: stdout pasa a devnull para que el flush
+        # al salir del intérprete no vuelva a fallar.
+        if destino.f is sys.stdout:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    return 1 if destino.errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Lista de contraseñas filtradas como índice ordenado de hashes en disco.
+
+Una lista realista tiene decenas de millones de contraseñas y no cabe como
+set de Python en cada proceso. El constructor (offline) convierte una lista
+de palabras en texto plano en un archivo de hashes de ancho fijo ordenados;
+ListaBloqueo lo abre con mmap y busca por búsqueda binaria, de modo que
+todos los procesos comparten la caché de páginas del sistema y arrancar no
+obliga a leer el archivo.
+
+Formato del archivo:
+    cabecera de 16 bytes: b"BLK1" | ancho (1 byte) | 3 bytes reservados | número de entradas (8 bytes, big-endian)
+    entradas: hashes BLAKE2b de `ancho` bytes de password.lower(), ordenados y sin duplicados
+
+Uso como script:
+    python lista_bloqueo.py wordlist.txt comunes.idx [--ancho 8]
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from typing import Container, Iterator, List, Optional, Tuple
+
+MAGIC = b"BLK1"
+_CABECERA = struct.Struct(">4sB3xQ")
+ANCHO_POR_DEFECTO = 8  # 64 bits: colisiones despreciables incluso con 10^8 entradas
+TAM_BLOQUE = 2_000_000  # hashes ordenados en memoria por bloque al construir
+
+
+def hash_contrasena(password: str, ancho: int = ANCHO_POR_DEFECTO) -> bytes:
+    """Hash de ancho fijo con el que se indexa una contraseña (ya en minúsculas)."""
+    return hashlib.blake2b(password.encode("utf-8"), digest_size=ancho).digest()
+
+
+class ListaBloqueo:
+    """
+    Conjunto de solo lectura respaldado por un índice en disco:
+    `password in lista` (con password ya en minúsculas).
+    El archivo se abre en el primer uso; si no existe, la lista está vacía.
+    `filtro` (p. ej. un FiltroBloom) descarta antes las contraseñas que
+    seguro no están, sin tocar el índice.
+    """
+
+    def __init__(self, path: str, filtro: Optional[Container[str]] = None):
+        self.path = path
+        self.filtro = filtro
+        self._mm: Optional[mmap.mmap] = None
+        self._ancho = ANCHO_POR_DEFECTO
+        self._n = 0
+        self._margen = 0
+        self._abierta = False
+
+    def _abrir(self) -> None:
+        self._abierta = True
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= _CABECERA.size:
+            return
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._ancho, self._n = _CABECERA.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} no es un índice de lista de bloqueo.")
+        self._margen = 4 * int(self._n ** 0.5) + 16
+
+    def __len__(self) -> int:
+        if not self._abierta:
+            self._abrir()
+        return self._n
+
+    def __contains__(self, password: str) -> bool:
+        if not self._abierta:
+            self._abrir()
+        if not self._n:
+            return False
+        if self.filtro is not None and password not in self.filtro:
+            return False
+        ancho, mm, n = self._ancho, self._mm, self._n
+        objetivo = hash_contrasena(password, ancho)
+        base = _CABECERA.size
+        # Los hashes están distribuidos uniformemente: se estima la posición
+        # y se busca en una ventana de unas pocas desviaciones típicas.
+        estimada = int.from_bytes(objetivo, "big") * n >> (8 * ancho)
+        lo, hi = max(0, estimada - self._margen), min(n, estimada + self._margen)
+        if (lo > 0 and mm[base + lo * ancho:base + (lo + 1) * ancho] > objetivo) or \
+                (hi < n and mm[base + (hi - 1) * ancho:base + hi * ancho] < objetivo):
+            lo, hi = 0, n  # fuera de la ventana: búsqueda binaria completa
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = base + mid * ancho
+            actual = mm[pos:pos + ancho]
+            if actual < objetivo:
+                lo = mid + 1
+            elif actual > objetivo:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def hashes(self) -> Optional[Tuple[int, memoryview]]:
+        """
+        (ancho, vista de los hashes ordenados) para búsquedas en lote, o None
+        si la lista está vacía. Mientras exista la vista no se puede cerrar.
+        """
+        if not self._abierta:
+            self._abrir()
+        if not self._n:
+            return None
+        inicio = _CABECERA.size
+        return self._ancho, memoryview(self._mm)[inicio:inicio + self._n * self._ancho]
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._n = 0
+
+
+# ---------- Construcción (offline) ----------
+def leer_palabras(wordlist_path: str) -> Iterator[str]:
+    with open(wordlist_path, "rb") as f:
+        for linea in f:
+            linea = linea.rstrip(b"\r\n")
+            if not linea:
+                continue
+            try:
+                yield linea.decode("utf-8").lower()
+            except UnicodeDecodeError:
+                continue  # una contraseña que no es UTF-8 nunca coincidirá con un str
+
+
+def _leer_run(path: str, ancho: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            bloque = f.read(ancho * 65536)
+            if not bloque:
+                return
+            for i in range(0, len(bloque), ancho):
+                yield bloque[i:i + ancho]
+
+
+def construir_lista_bloqueo(wordlist_path: str, salida_path: str, ancho: int = ANCHO_POR_DEFECTO,
+                            tam_bloque: int = TAM_BLOQUE) -> int:
+    """
+    Construye el índice a partir de una lista de palabras (una por línea).
+    Ordena por bloques en disco y los mezcla, así que la memoria no depende
+    del tamaño de la lista. Devuelve el número de entradas únicas.
+    """
+    import heapq  # solo se usan al construir (offline), no al consultar
+
+    directorio = os.path.dirname(os.path.abspath(salida_path))
+    runs: List[str] = []
+    try:
+        bloque: List[bytes] = []
+        for palabra in leer_palabras(wordlist_path):
+            bloque.append(hash_contrasena(palabra, ancho))
+            if len(bloque) >= tam_bloque:
+                runs.append(_escribir_run(sorted(bloque), directorio))
+                bloque = []
+        if bloque or not runs:
+            runs.append(_escribir_run(sorted(bloque), directorio))
+
+        tmp = salida_path + ".tmp"
+        n = 0
+        with open(tmp, "wb") as out:
+            out.write(_CABECERA.pack(MAGIC, ancho, 0))
+            anterior = None
+            for h in heapq.merge(*(_leer_run(r, ancho) for r in runs)):
+                if h != anterior:
+                    out.write(h)
+                    anterior = h
+                    n += 1
+            out.seek(0)
+            out.write(_CABECERA.pack(MAGIC, ancho, n))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, salida_path)
+        return n
+    finally:
+        for r in runs:
+            os.remove(r)
+
+
+def _escribir_run(hashes: List[bytes], directorio: str) -> str:
+    import tempfile
+
+    fd, path = tempfile.mkstemp(prefix="blk-run-", dir=directorio)
+    with os.fdopen(fd, "wb") as f:
+        f.write(b"".join(hashes))
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Construye el índice mmap de contraseñas comunes/filtradas.")
+    parser.add_argument("wordlist", help="lista de palabras en texto plano (una por línea)")
+    parser.add_argument("salida", help="archivo de índice a generar (p. ej. comunes.idx)")
+    parser.add_argument("--ancho", type=int, default=ANCHO_POR_DEFECTO, help="bytes por hash (4-64)")
+    args = parser.parse_args()
+    total = construir_lista_bloqueo(args.wordlist, args.salida, args.ancho)
+    print(f"{total} contraseñas únicas indexadas en {args.salida}.")
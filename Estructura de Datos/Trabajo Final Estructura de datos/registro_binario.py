@@ -0,0 +1,321 @@
+"""
+Formato binario compacto para el registro de usuarios (users.log).
+
+Alternativa al formato de líneas JSON de almacen_usuarios, seleccionable con
+UserStore(path, formato="binario"). La conversión entre ambos es sin
+pérdidas: decodificar un registro devuelve el mismo dict que se guardó.
+
+Archivo: cabecera de 8 bytes ("UBN1", versión) seguida de marcos
+    tipo (1) | flags (1) | long. usuario (2) | long. cuerpo (4) | crc32 (4)
+    usuario (UTF-8) | cuerpo
+El crc32 cubre los 8 primeros bytes de la cabecera, el usuario y el cuerpo. Un
+marco incompleto o dañado al final del archivo marca el final de los datos
+(escritura cortada por un fallo), igual que una línea sin '\\n' en el
+formato JSON. Si después de un marco dañado hay otro válido, el dañado se
+salta como espacio muerto (igual que una línea JSON corrupta) y la lectura
+sigue desde el siguiente marco válido.
+
+Tipos de marco:
+- REGISTRO: salt (16 bytes) y hash (32 bytes) en binario de ancho fijo,
+  parámetros KDF empaquetados y la evaluación en un entero de 16 bits
+  (presente, fuerte, nº de detalles, puntuación) seguido de los
+  identificadores de los textos de los detalles.
+- JSON: registro que no encaja en el formato fijo (claves extra, otros
+  tamaños de salt/hash...), guardado como JSON compacto.
+- TEXTO: define un texto de detalle; su identificador son 4 bytes de
+  BLAKE2b del texto, así que procesos distintos asignan el mismo id sin
+  coordinarse. Se escribe antes del primer registro que lo usa.
+- BORRADO: lápida de un usuario eliminado.
+"""
+
+import hashlib
+import json
+import struct
+import zlib
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Tuple
+
+MAGIA = b"UBN1"
+VERSION = 1
+_CABECERA = struct.Struct(">4sB3x")
+CABECERA = _CABECERA.pack(MAGIA, VERSION)
+
+_MARCO = struct.Struct(">BBHII")  # tipo, flags, long. usuario, long. cuerpo, crc32
+MAX_USUARIO = 0xFFFF  # bytes UTF-8 de un nombre de usuario (su longitud va en 2 bytes)
+REGISTRO, JSON, TEXTO, BORRADO = 1, 2, 3, 4
+_DEBIL = 0x01  # flag: cuenta débil (índice secundario de alertas)
+TEXTO_PERDIDO = "(detalle ilegible)"
+
+TAM_SALT = 16
+TAM_HASH = 32
+_FIJO = struct.Struct(f">{TAM_SALT}s{TAM_HASH}sB")  # salt, hash, código de KDF
+_PBKDF2 = struct.Struct(">I")  # iteraciones
+_SCRYPT = struct.Struct(">IHH")  # n, r, p
+_EVALUACION = struct.Struct(">H")
+_ID = struct.Struct(">I")
+_BLOQUE_LECTURA = 1 << 20
+
+# Código de KDF -> (algoritmo, claves del dict en orden, empaquetado)
+_KDF_SIN, _KDF_PBKDF2, _KDF_SCRYPT = 0, 1, 2
+_KDFS = {
+    _KDF_PBKDF2: ("pbkdf2_sha256", ("iteraciones",), _PBKDF2),
+    _KDF_SCRYPT: ("scrypt", ("n", "r", "p"), _SCRYPT),
+}
+_CODIGO_KDF = {alg: codigo for codigo, (alg, _, _) in _KDFS.items()}
+
+# Entero de evaluación: bit 15 presente, bit 14 fuerte, bits 8-13 nº de detalles,
+# bits 0-7 puntuación.
+_EVAL_PRESENTE = 0x8000
+_EVAL_FUERTE = 0x4000
+_MAX_DETALLES = 0x3F
+_MAX_PUNTUACION = 0xFF
+_IDS = [struct.Struct(f">{n}I") for n in range(_MAX_DETALLES + 1)]  # ids de detalles
+
+
+def id_texto(texto: str) -> int:
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def _nombre(username: str) -> bytes:
+    nombre = username.encode("utf-8")
+    if len(nombre) > MAX_USUARIO:
+        raise ValueError(f"El nombre de usuario ocupa {len(nombre)} bytes; el formato binario "
+                         f"admite como mucho {MAX_USUARIO}.")
+    return nombre
+
+
+def _marco(tipo: int, flags: int, nombre: bytes, cuerpo: bytes) -> bytes:
+    cabecera = struct.pack(">BBHI", tipo, flags, len(nombre), len(cuerpo))
+    crc = zlib.crc32(cuerpo, zlib.crc32(nombre, zlib.crc32(cabecera)))
+    return cabecera + _ID.pack(crc) + nombre + cuerpo
+
+
+def _largo_valido(buf: bytes, pos: int) -> int:
+    """Longitud del marco que empieza en buf[pos] si está completo y su crc cuadra; 0 si no."""
+    if len(buf) - pos < _MARCO.size:
+        return 0
+    tipo, _, largo_nombre, largo_cuerpo, crc = _MARCO.unpack_from(buf, pos)
+    longitud = _MARCO.size + largo_nombre + largo_cuerpo
+    if not REGISTRO <= tipo <= BORRADO or len(buf) - pos < longitud:
+        return 0
+    vista = memoryview(buf)
+    if zlib.crc32(vista[pos + _MARCO.size:pos + longitud], zlib.crc32(vista[pos:pos + 8])) != crc:
+        return 0
+    return longitud
+
+
+def _siguiente_valido(buf: bytes, pos: int) -> Optional[int]:
+    """Posición del primer marco válido después del marco dañado de buf[pos]; None si no hay."""
+    # Si solo se dañó el contenido, la cabecera aún dice dónde empieza el siguiente.
+    _, _, largo_nombre, largo_cuerpo, _ = _MARCO.unpack_from(buf, pos)
+    siguiente = pos + _MARCO.size + largo_nombre + largo_cuerpo
+    if _largo_valido(buf, siguiente):
+        return siguiente
+    for candidato in range(pos + 1, len(buf) - _MARCO.size + 1):
+        if REGISTRO <= buf[candidato] <= BORRADO and _largo_valido(buf, candidato):
+            return candidato
+    return None
+
+
+def _es_entero(valor, maximo: int) -> bool:
+    return type(valor) is int and 0 <= valor <= maximo
+
+
+def _kdf_fijo(kdf) -> Optional[bytes]:
+    """Empaqueta los parámetros KDF, o None si no tienen la forma conocida."""
+    if not isinstance(kdf, dict):
+        return None
+    codigo = _CODIGO_KDF.get(kdf.get("alg"))
+    if codigo is None:
+        return None
+    _, claves, empaquetado = _KDFS[codigo]
+    if len(kdf) != len(claves) + 1:
+        return None
+    valores = [kdf.get(clave) for clave in claves]
+    limites = (0xFFFFFFFF,) + (0xFFFF,) * (len(claves) - 1)
+    if not all(_es_entero(v, m) for v, m in zip(valores, limites)):
+        return None
+    return bytes((codigo,)) + empaquetado.pack(*valores)
+
+
+class FormatoBinario:
+    """
+    Codificador del formato binario. Conserva la tabla de textos de detalle
+    del archivo que se está leyendo (id -> texto), que se reconstruye en
+    cada recorrido completo.
+    """
+    nombre = "binario"
+    cabecera = CABECERA
+
+    def __init__(self):
+        self._textos: Dict[int, str] = {}
+
+    # ---------- Escritura ----------
+    def _ids_detalles(self, detalles, nuevos: Dict[int, str]) -> Optional[Tuple[bytes, bytes]]:
+        """(marcos TEXTO necesarios, ids empaquetados), o None si hay una colisión de id."""
+        definiciones, ids, propios = [], [], {}
+        for texto in detalles:
+            if not isinstance(texto, str):
+                return None
+            ident = id_texto(texto)
+            conocido = self._textos.get(ident) or nuevos.get(ident) or propios.get(ident)
+            if conocido is None:
+                propios[ident] = texto
+                cuerpo = _ID.pack(ident) + texto.encode("utf-8")
+                definiciones.append(_marco(TEXTO, 0, b"", cuerpo))
+            elif conocido != texto:
+                return None
+            ids.append(_ID.pack(ident))
+        nuevos.update(propios)  # solo si el registro se codifica en formato fijo
+        return b"".join(definiciones), b"".join(ids)
+
+    def _cuerpo_fijo(self, record: Dict, nuevos: Dict[int, str]) -> Optional[Tuple[bytes, bytes]]:
+        """(marcos TEXTO, cuerpo REGISTRO), o None si el registro no encaja en el formato fijo."""
+        if not record.keys() <= {"salt", "hash", "kdf", "evaluacion"}:
+            return None
+        try:
+            salt = bytes.fromhex(record["salt"])
+            hash_ = bytes.fromhex(record["hash"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        # el hex debe volver a salir idéntico (minúsculas, sin espacios)
+        if len(salt) != TAM_SALT or len(hash_) != TAM_HASH \
+                or salt.hex() != record["salt"] or hash_.hex() != record["hash"]:
+            return None
+        if "kdf" in record:
+            kdf = _kdf_fijo(record["kdf"])
+            if kdf is None:
+                return None
+        else:
+            kdf = bytes((_KDF_SIN,))
+
+        evaluacion = record.get("evaluacion")
+        if evaluacion is None:
+            if "evaluacion" in record:
+                return None  # "evaluacion": null no es lo mismo que no tenerla
+            return b"", salt + hash_ + kdf + _EVALUACION.pack(0)
+        if not isinstance(evaluacion, dict) or evaluacion.keys() != {"fuerte", "puntuacion", "detalles"}:
+            return None
+        fuerte, puntuacion, detalles = evaluacion["fuerte"], evaluacion["puntuacion"], evaluacion["detalles"]
+        if type(fuerte) is not bool or not _es_entero(puntuacion, _MAX_PUNTUACION) \
+                or not isinstance(detalles, list) or len(detalles) > _MAX_DETALLES:
+            return None
+        ids = self._ids_detalles(detalles, nuevos)
+        if ids is None:
+            return None
+        empaquetada = (_EVAL_PRESENTE | (_EVAL_FUERTE if fuerte else 0)
+                       | len(detalles) << 8 | puntuacion)
+        return ids[0], salt + hash_ + kdf + _EVALUACION.pack(empaquetada) + ids[1]
+
+    def codificar(self, username: str, record: Dict, debil: bool,
+                  nuevos: Dict[int, str]) -> Tuple[bytes, bytes]:
+        """
+        Devuelve (marcos previos, marco del registro). Los textos nuevos se
+        anotan en `nuevos`; hay que pasarlos a confirmar() una vez escritos.
+        """
+        nombre = _nombre(username)
+        flags = _DEBIL if debil else 0
+        fijo = self._cuerpo_fijo(record, nuevos)
+        if fijo is None:
+            cuerpo = json.dumps(record, separators=(",", ":")).encode("utf-8")
+            return b"", _marco(JSON, flags, nombre, cuerpo)
+        return fijo[0], _marco(REGISTRO, flags, nombre, fijo[1])
+
+    def borrado(self, username: str) -> bytes:
+        return _marco(BORRADO, 0, _nombre(username), b"")
+
+    def confirmar(self, nuevos: Dict[int, str]) -> None:
+        """Incorpora a la tabla los textos que ya están escritos en el archivo."""
+        self._textos.update(nuevos)
+
+    def serializar(self, items: Iterable[Tuple[str, Dict]], es_debil) -> Iterator[bytes]:
+        """Archivo completo (para reescrituras): cabecera y un marco por usuario."""
+        yield CABECERA
+        copia = FormatoBinario()  # tabla propia: el archivo nuevo empieza vacío
+        nuevos: Dict[int, str] = {}
+        for username, record in items:
+            previos, marco = copia.codificar(username, record, es_debil(record), nuevos)
+            yield previos + marco
+
+    # ---------- Lectura ----------
+    def recorrer(self, fh: BinaryIO, desde: int) -> Iterator[Tuple[int, int, Optional[str], bool, bool]]:
+        """
+        Recorre los marcos desde `desde` (fh ya posicionado ahí) y produce
+        (offset, longitud, usuario, débil, borrado). Los marcos TEXTO y la
+        cabecera del archivo producen usuario None (no ocupan espacio muerto);
+        un tramo dañado seguido de marcos válidos produce usuario None y
+        borrado True (espacio muerto). Se detiene en el primer marco dañado
+        o cortado tras el que no queda ninguno válido: la cola a medio escribir.
+        """
+        offset = desde
+        if desde == 0:
+            self._textos.clear()
+            cabecera = fh.read(_CABECERA.size)
+            if len(cabecera) < _CABECERA.size:
+                return
+            magia, version = _CABECERA.unpack(cabecera)
+            if magia != MAGIA or version != VERSION:
+                raise ValueError(f"Cabecera de registro binario no válida: {cabecera!r}")
+            yield 0, _CABECERA.size, None, False, False
+            offset = _CABECERA.size
+        # Se lee en bloques grandes y se desempaqueta sobre el búfer: un
+        # read() por marco costaría más que el propio desempaquetado.
+        buf, pos = b"", 0
+        while True:
+            if len(buf) - pos < _MARCO.size:
+                buf, pos = buf[pos:] + fh.read(_BLOQUE_LECTURA), 0
+                if len(buf) < _MARCO.size:
+                    return
+            tipo, flags, largo_nombre, largo_cuerpo, crc = _MARCO.unpack_from(buf, pos)
+            longitud = _MARCO.size + largo_nombre + largo_cuerpo
+            if len(buf) - pos < longitud:
+                buf, pos = buf[pos:] + fh.read(max(_BLOQUE_LECTURA, longitud)), 0
+            vista = memoryview(buf)
+            inicio = pos + _MARCO.size
+            if len(buf) - pos < longitud or not REGISTRO <= tipo <= BORRADO \
+                    or zlib.crc32(vista[inicio:pos + longitud], zlib.crc32(vista[pos:pos + 8])) != crc:
+                # Marco dañado o cortado: si detrás queda algún marco válido, el
+                # daño está en medio del archivo y solo se salta lo dañado.
+                buf, pos = buf[pos:] + fh.read(), 0
+                siguiente = _siguiente_valido(buf, 0)
+                if siguiente is None:
+                    return  # cola a medio escribir: fin de los datos válidos
+                yield offset, siguiente, None, False, True
+                pos = siguiente
+                offset += siguiente
+                continue
+            if tipo == TEXTO:
+                (ident,) = _ID.unpack_from(buf, inicio)
+                self._textos[ident] = buf[inicio + _ID.size:pos + longitud].decode("utf-8")
+                yield offset, longitud, None, False, False
+            else:
+                username = buf[inicio:inicio + largo_nombre].decode("utf-8")
+                yield offset, longitud, username, bool(flags & _DEBIL), tipo == BORRADO
+            pos += longitud
+            offset += longitud
+
+    def decodificar(self, datos: bytes) -> Dict:
+        """Marco REGISTRO o JSON -> el dict del registro tal como se guardó."""
+        tipo, _, largo_nombre, _, _ = _MARCO.unpack_from(datos)
+        pos = _MARCO.size + largo_nombre
+        if tipo == JSON:
+            return json.loads(datos[pos:])
+        salt, hash_, codigo = _FIJO.unpack_from(datos, pos)
+        record = {"salt": salt.hex(), "hash": hash_.hex()}
+        pos += _FIJO.size
+        if codigo != _KDF_SIN:
+            alg, claves, empaquetado = _KDFS[codigo]
+            kdf = record["kdf"] = {"alg": alg}
+            for clave, valor in zip(claves, empaquetado.unpack_from(datos, pos)):
+                kdf[clave] = valor
+            pos += empaquetado.size
+        (empaquetada,) = _EVALUACION.unpack_from(datos, pos)
+        if empaquetada & _EVAL_PRESENTE:
+            textos = self._textos
+            ids = _IDS[(empaquetada >> 8) & _MAX_DETALLES].unpack_from(datos, pos + _EVALUACION.size)
+            record["evaluacion"] = {
+                "fuerte": bool(empaquetada & _EVAL_FUERTE),
+                "puntuacion": empaquetada & _MAX_PUNTUACION,
+                # un texto cuyo marco se perdió en un tramo dañado no impide leer el registro
+                "detalles": [textos.get(ident, TEXTO_PERDIDO) for ident in ids],
+            }
+        return record
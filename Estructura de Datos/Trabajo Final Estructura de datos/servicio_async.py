@@ -0,0 +1,91 @@
+"""
+Servicio asyncio sobre las funciones de Trabajofinal.py.
+
+AutenticarUsuario bloquea durante todo el cálculo del KDF, lo que detiene
+el bucle de eventos de un front-end asyncio. ServicioAutenticacion:
+- mantiene el almacén de usuarios abierto y caliente (se abre una vez);
+- ejecuta el KDF en un pool de procesos acotado, fuera del bucle;
+- ejecuta los accesos al almacén (lecturas, que pueden esperar al bloqueo
+  del archivo o releer el registro, y escrituras con fsync) en hilos,
+  fuera del bucle;
+- limita las peticiones en curso (max_en_vuelo) y, como contrapresión,
+  rechaza con ServicioSaturado las que superen max_pendientes en espera;
+- aplica Trabajofinal.LIMITADOR (por usuario y origen) antes de encolar el KDF.
+
+Ejemplo:
+    servicio = ServicioAutenticacion()
+    ok = await servicio.autenticar("ana", "Clave-Segura-1!")
+    await servicio.cerrar()
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import Trabajofinal
+
+
+class ServicioSaturado(Exception):
+    """Hay demasiadas peticiones pendientes; el cliente debe reintentar más tarde."""
+
+
+class ServicioAutenticacion:
+    def __init__(self, workers: Optional[int] = None, max_en_vuelo: Optional[int] = None,
+                 max_pendientes: int = 1024):
+        self.workers = workers or os.cpu_count() or 1
+        # Más peticiones en curso que procesos solo alarga la cola del pool.
+        self.max_en_vuelo = max_en_vuelo or self.workers * 2
+        self.max_pendientes = max_pendientes
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._semaforo = asyncio.Semaphore(self.max_en_vuelo)
+        self._pendientes = 0
+        self._store = Trabajofinal._get_store()
+
+    async def _en_pool(self, funcion, *args):
+        """Ejecuta `funcion` en el pool de procesos respetando los límites del servicio."""
+        if self._pendientes >= self.max_pendientes:
+            raise ServicioSaturado(f"Más de {self.max_pendientes} peticiones pendientes.")
+        self._pendientes += 1
+        try:
+            async with self._semaforo:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool, funcion, *args)
+        finally:
+            self._pendientes -= 1
+
+    async def _en_hilo(self, funcion, *args):
+        """E/S del almacén (bloqueo de archivo, relectura, fsync) en el pool de hilos por defecto."""
+        return await asyncio.get_running_loop().run_in_executor(None, funcion, *args)
+
+    async def registrar(self, username: str, password: str) -> Tuple[bool, str]:
+        """Equivalente asíncrono de RegistrarUsuario."""
+        if await self._en_hilo(self._store.__contains__, username):
+            return False, "El usuario ya existe."
+        registro = await self._en_pool(Trabajofinal._nuevo_registro, password, dict(Trabajofinal.KDF_PARAMS))
+        if not await self._en_hilo(self._store.add, username, registro):
+            return False, "El usuario ya existe."
+        return True, Trabajofinal._mensaje_registro(registro["evaluacion"])
+
+    async def autenticar(self, username: str, password: str, origen: Optional[str] = None) -> bool:
+        """Equivalente asíncrono de AutenticarUsuario (incluida la actualización del hash)."""
+        if not Trabajofinal.LIMITADOR.permitir(username, origen):
+            return False
+        record = await self._en_hilo(self._store.get_record, username)
+        if record is None:
+            return False
+        if not await self._en_pool(Trabajofinal._verify_raw, password, record.salt, record.hash, record.kdf):
+            return False
+        Trabajofinal.LIMITADOR.exito(username)
+        if Trabajofinal._needs_rehash(record.kdf):
+            salt_hex, hash_hex = await self._en_pool(Trabajofinal._hash_password, password, None,
+                                                     dict(Trabajofinal.KDF_PARAMS))
+            await self._en_hilo(Trabajofinal._update_hash, self._store, username, salt_hex, hash_hex)
+        return True
+
+    async def alertas(self) -> List[str]:
+        """Alertas de contraseñas débiles (GenerarAlertas lee registros del disco: va en un hilo)."""
+        return await self._en_hilo(lambda: list(Trabajofinal.GenerarAlertas(self._store)))
+
+    async def cerrar(self) -> None:
+        await self._en_hilo(self._pool.shutdown)
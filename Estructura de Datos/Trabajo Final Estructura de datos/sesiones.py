@@ -0,0 +1,93 @@
+"""
+Sesiones verificadas: evita repetir el KDF en autenticaciones seguidas.
+
+Tras una verificación correcta se emite un token de vida corta firmado con
+HMAC-SHA256. Las comprobaciones siguientes recalculan ese HMAC y lo comparan
+en tiempo constante, sin KDF. El hash actual del usuario sí se consulta en
+cada comprobación (ValidarSesion llama a get_record), pero el almacén lo sirve
+de su caché de registros decodificados: tras la primera vez no hay lectura de
+disco salvo que otro proceso haya añadido registros.
+
+- El token caduca a los `ttl` segundos.
+- La firma incluye el hash almacenado del usuario en el momento de emitirlo:
+  si el hash cambia (nueva contraseña, rehash con otros parámetros KDF), la
+  firma deja de coincidir y el token queda revocado sin más.
+- Los tokens vivos se guardan en una tabla acotada (max_sesiones); al
+  llenarse se expulsa el más antiguo, y cerrar() revoca uno concreto.
+
+Formato del token: "<id>.<expira>.<firma_hex>".
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+TTL_POR_DEFECTO = 300  # segundos
+MAX_SESIONES = 10_000
+
+
+class GestorSesiones:
+    def __init__(self, ttl: float = TTL_POR_DEFECTO, max_sesiones: int = MAX_SESIONES,
+                 clave: Optional[bytes] = None, reloj: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.max_sesiones = max_sesiones
+        # Clave de firma: por defecto aleatoria, válida solo en este proceso.
+        self._clave = clave or secrets.token_bytes(32)
+        self._reloj = reloj
+        self._sesiones: "OrderedDict[str, tuple[str, int]]" = OrderedDict()  # id -> (usuario, expira)
+        self._lock = threading.Lock()
+
+    def _firma(self, token_id: str, username: str, expira: int, hash_actual: bytes) -> str:
+        mensaje = f"{token_id}|{expira}|{username}|".encode("utf-8") + hash_actual
+        return hmac.new(self._clave, mensaje, hashlib.sha256).hexdigest()
+
+    def emitir(self, username: str, hash_actual: bytes) -> str:
+        """Crea un token para `username` ligado a su hash almacenado actual."""
+        token_id = secrets.token_urlsafe(16)
+        expira = int(self._reloj() + self.ttl)
+        with self._lock:
+            self._sesiones[token_id] = (username, expira)
+            while len(self._sesiones) > self.max_sesiones:
+                self._sesiones.popitem(last=False)  # la más antigua
+        return f"{token_id}.{expira}.{self._firma(token_id, username, expira, hash_actual)}"
+
+    def validar(self, username: str, token: str, hash_actual: bytes) -> bool:
+        """True si el token es de `username`, no ha caducado y su hash no ha cambiado."""
+        try:
+            token_id, expira_txt, firma = token.split(".")
+            expira = int(expira_txt)
+        except (AttributeError, ValueError):
+            return False
+        with self._lock:
+            sesion = self._sesiones.get(token_id)
+            if sesion is None:
+                return False
+            if self._reloj() >= sesion[1]:
+                del self._sesiones[token_id]  # caducada
+                return False
+        if sesion != (username, expira):
+            return False
+        # En bytes: compare_digest rechaza (TypeError) las cadenas str no ASCII
+        return hmac.compare_digest(firma.encode("utf-8"),
+                                   self._firma(token_id, username, expira, hash_actual).encode("utf-8"))
+
+    def cerrar(self, token: str) -> None:
+        """Revoca un token (cierre de sesión)."""
+        with self._lock:
+            self._sesiones.pop(str(token).split(".", 1)[0], None)
+
+    def purgar(self) -> int:
+        """Elimina las sesiones caducadas; devuelve cuántas quitó."""
+        ahora = self._reloj()
+        with self._lock:
+            caducadas = [t for t, (_, expira) in self._sesiones.items() if ahora >= expira]
+            for token_id in caducadas:
+                del self._sesiones[token_id]
+        return len(caducadas)
+
+    def __len__(self) -> int:
+        return len(self._sesiones)
@@ -1,56 +1,463 @@
+"""
+Gestor de Contraseñas Seguras con interfaz gráfica (tkinter).
+
+Comparte con el gestor de consola el almacén de usuarios, el KDF y el
+analizador de fuerza: esos módulos viven en DIRECTORIO_COMPARTIDO
+(Estructura de Datos/Trabajo Final Estructura de datos), que se añade a
+sys.path al importar este archivo. Es el único sitio donde esta carpeta
+apunta a la otra; en sentido contrario, auditoria.cargar_gestor_gui() es el
+único que carga este archivo desde allí.
+"""
+
+import bisect
+import hmac
+import os
+import queue
+import sys
+import threading
+import time
+
+DIRECTORIO_COMPARTIDO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..",
+                                                      "Estructura de Datos", "Trabajo Final Estructura de datos"))
+if DIRECTORIO_COMPARTIDO not in sys.path:
+    sys.path.insert(0, DIRECTORIO_COMPARTIDO)
+
+from almacen_usuarios import UserStore
+from kdf import cargar_parametros, derivar_clave
+
+# tkinter se importa al crear la interfaz (_cargar_tk): quien solo usa
+# PasswordManager (scripts, benchmarks) no paga su carga.
+tk = messagebox = simpledialog = ttk = None
+
+
+def _cargar_tk():
+    global tk, messagebox, simpledialog, ttk
+    if tk is None:
+        import tkinter
+        from tkinter import messagebox, simpledialog, ttk
+        tk = tkinter
+
+# Usuarios de la interfaz gráfica: almacén de solo-anexado con salt+hash
+# (ver almacen_usuarios.py), separado del users.log del gestor de consola
+# porque su política de contraseñas es otra.
+USERS_LOG = "usuarios_gui.log"
+KDF_CONFIG_FILE = "kdf.json"  # misma política KDF que el gestor de consola
+KDF_PARAMS = cargar_parametros(KDF_CONFIG_FILE)
+
+# Política de la interfaz gráfica: mínimo 8 caracteres, especiales de "@#$%^&+=",
+# y la contraseña solo es fuerte si cumple todos los criterios y no es fácil de
+# adivinar por sus patrones (palabras conocidas, teclado, fechas...). Se crea
+# en la primera verificación, junto con el estimador de patrones.
+ANALIZADOR = None
+
+
+def _get_analizador():
+    global ANALIZADOR
+    if ANALIZADOR is None:
+        from analizador_fuerza import AnalizadorFuerza
+        from estimador_patrones import estimador_por_defecto
+
+        ANALIZADOR = AnalizadorFuerza(
+            mensajes={
+                "longitud": "Débil: La contraseña debe tener al menos 8 caracteres.",
+                "minuscula": "Débil: Debe contener al menos una letra minúscula.",
+                "mayuscula": "Débil: Debe contener al menos una letra mayúscula.",
+                "digito": "Débil: Debe contener al menos un número.",
+                "especial": "Débil: Debe contener al menos un carácter especial.",
+                "diccionario": "Débil: Contiene una palabra o contraseña muy conocida.",
+                "teclado": "Débil: Contiene un recorrido de teclado (p. ej. qwerty).",
+                "repeticion": "Débil: Contiene repeticiones (p. ej. aaa o abcabc).",
+                "secuencia": "Débil: Contiene una secuencia (p. ej. abc o 1234).",
+                "fecha": "Débil: Contiene una fecha o un año.",
+                "adivinable": "Débil: Es fácil de adivinar; usa una contraseña más larga.",
+            },
+            longitud_minima=8,
+            especiales="@#$%^&+=",
+            umbral=5,
+            orden=("longitud", "minuscula", "mayuscula", "digito", "especial"),
+            estimador=estimador_por_defecto(),
+        )
+    return ANALIZADOR
+
+
+def _rango_prefijo(ordenados, prefijo):
+    """(inicio, fin) de los elementos de la lista ordenada que empiezan por `prefijo`."""
+    inicio = bisect.bisect_left(ordenados, prefijo)
+    base = prefijo.rstrip(chr(0x10FFFF))
+    if not base:
+        return inicio, len(ordenados)
+    # El primer texto que ya no empieza por el prefijo es el prefijo con su último carácter incrementado
+    return inicio, bisect.bisect_left(ordenados, base[:-1] + chr(ord(base[-1]) + 1), inicio)
 
-import tkinter as tk
-from tkinter import messagebox, simpledialog
-import re
 
 # Clase para el Gestor de Contraseñas
 class PasswordManager:
-    def __init__(self):
-        self.users = {}  # Almacena usuarios y contraseñas
+    """
+    Usuarios con la contraseña guardada como salt+hash (nunca en texto) en
+    un UserStore persistente. La fuerza se evalúa una sola vez al registrar
+    y se guarda con el usuario, así que las alertas salen del índice de
+    cuentas débiles del almacén sin volver a analizar ninguna contraseña.
+    El almacén se abre en el primer uso y los registros se leen a demanda.
+    """
+
+    def __init__(self, path=USERS_LOG, kdf=None, durable=True):
+        self.path = path
+        self.kdf = kdf
+        self.durable = durable
+        self._store = None
+        self._indice = None  # Nombres de usuario ordenados (paginación y búsqueda por prefijo)
+        self._generacion_indice = None  # generación del almacén con la que se construyó _indice
+        self._alertas = None  # Usuarios con alerta de la última revisión, ordenados
+
+    @property
+    def users(self):
+        """Almacén usuario -> registro (se abre la primera vez que se necesita)."""
+        if self._store is None:
+            self._store = UserStore(self.path, durable=self.durable)
+        return self._store
+
+    def close(self):
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def _nuevo_registro(self, password):
+        import secrets
+
+        params = self.kdf or KDF_PARAMS
+        salt = secrets.token_bytes(16)
+        return {
+            "salt": salt.hex(),
+            "hash": derivar_clave(password, salt, params).hex(),
+            "kdf": dict(params),
+            "evaluacion": _get_analizador().analizar(password),
+        }
 
     def register_user(self, username, password):
         """Registra un nuevo usuario con su contraseña."""
         if username in self.users:
             return False  # El usuario ya existe
-        self.users[username] = password
+        registro = self._nuevo_registro(password)
+        antes = self.users.generacion()
+        if not self.users.add(username, registro):
+            return False  # Otro proceso lo registró mientras se calculaba el hash
+        if self._indice is not None and self._generacion_indice == antes:
+            # Solo cambió este alta: basta insertarla en su sitio
+            bisect.insort(self._indice, username)
+            self._generacion_indice = self.users.generacion()
+        if self._alertas is not None and not registro["evaluacion"]["fuerte"]:
+            bisect.insort(self._alertas, username)
         return True
 
+    def verify_user(self, username, password):
+        """Comprueba la contraseña de un usuario contra su hash guardado."""
+        registro = self.users.get_record(username)
+        if registro is None:
+            return False
+        calculado = derivar_clave(password, registro.salt, registro.kdf)
+        return hmac.compare_digest(calculado, registro.hash)
+
     def check_password_strength(self, password):
         """Verifica la fuerza de la contraseña."""
-        if len(password) < 8:
-            return "Débil: La contraseña debe tener al menos 8 caracteres."
-        if not re.search("[a-z]", password):
-            return "Débil: Debe contener al menos una letra minúscula."
-        if not re.search("[A-Z]", password):
-            return "Débil: Debe contener al menos una letra mayúscula."
-        if not re.search("[0-9]", password):
-            return "Débil: Debe contener al menos un número."
-        if not re.search("[@#$%^&+=]", password):
-            return "Débil: Debe contener al menos un carácter especial."
+        resultado = _get_analizador().analizar(password)
+        if not resultado["fuerte"]:
+            return resultado["detalles"][0]
         return "Fuerte: La contraseña es segura."
 
-    def generate_alerts(self):
-        """Genera alertas para contraseñas débiles."""
-        alerts = []
-        for username, password in self.users.items():
-            strength = self.check_password_strength(password)
-            if "Débil" in strength:
-                alerts.append(f"Alerta para {username}: {strength}")
-        return alerts
+    def revisar_alertas(self, progreso=None):
+        """
+        Toma las cuentas débiles del índice del almacén (sin analizar de
+        nuevo ninguna contraseña) y las deja ordenadas por usuario; devuelve
+        cuántas hay. Como no recorre las contraseñas, `progreso(hechos, total)`
+        recibe un solo avance, el final; generate_alerts informa mientras
+        construye los textos.
+        """
+        self._alertas = sorted(self.users.usuarios_debiles())
+        if progreso is not None:
+            progreso(len(self._alertas), len(self._alertas))
+        return len(self._alertas)
+
+    def _texto_alerta(self, username):
+        evaluacion = self.users[username].get("evaluacion")
+        if evaluacion is None or not evaluacion.get("detalles"):
+            return "Débil: No se ha verificado la fortaleza de la contraseña."
+        return evaluacion["detalles"][0]
+
+    def generate_alerts(self, progreso=None):
+        """Genera alertas para contraseñas débiles; `progreso(hechos, total)` informa del avance."""
+        total = self.revisar_alertas()
+        alertas = []
+        for hechos, username in enumerate(self._alertas, 1):
+            alertas.append(f"Alerta para {username}: {self._texto_alerta(username)}")
+            if progreso is not None and (hechos % 256 == 0 or hechos == total):
+                progreso(hechos, total)
+        return alertas
+
+    def contar_alertas(self, prefijo=""):
+        """Alertas de la última revisión cuyos usuarios empiezan por `prefijo`."""
+        if self._alertas is None:
+            self.revisar_alertas()
+        inicio, fin = _rango_prefijo(self._alertas, prefijo)
+        return fin - inicio
+
+    def alertas_pagina(self, prefijo="", inicio=0, cantidad=50):
+        """Página de pares (usuario, alerta) de la última revisión; solo se leen sus registros."""
+        if self._alertas is None:
+            self.revisar_alertas()
+        desde, hasta = _rango_prefijo(self._alertas, prefijo)
+        desde = min(desde + max(inicio, 0), hasta)
+        return [(u, self._texto_alerta(u)) for u in self._alertas[desde:min(desde + cantidad, hasta)]]
 
     def get_users(self):
         """Devuelve la lista de usuarios registrados."""
-        return list(self.users.keys())
+        return self.users.keys()
+
+    def _ordenados(self):
+        # El índice ordenado se construye la primera vez que se pagina y se
+        # reconstruye si cambió la generación del almacén (altas o bajas propias
+        # o de otro proceso; el número de usuarios no basta).
+        generacion = self.users.generacion()
+        if self._indice is None or self._generacion_indice != generacion:
+            self._indice = sorted(self.users.keys())
+            self._generacion_indice = generacion
+        return self._indice
+
+    def contar_usuarios(self, prefijo=""):
+        """Número de usuarios que empiezan por `prefijo`."""
+        inicio, fin = _rango_prefijo(self._ordenados(), prefijo)
+        return fin - inicio
+
+    def usuarios_pagina(self, prefijo="", inicio=0, cantidad=50):
+        """Página de usuarios que empiezan por `prefijo`, en orden alfabético."""
+        indice = self._ordenados()
+        desde, hasta = _rango_prefijo(indice, prefijo)
+        desde = min(desde + max(inicio, 0), hasta)
+        return indice[desde:min(desde + cantidad, hasta)]
+
+
+# Puente entre el hilo de Tk y un hilo trabajador
+class TareasSegundoPlano:
+    """
+    Ejecuta el trabajo del gestor (hash, disco, alertas) en un hilo aparte
+    para que la ventana no se congele. Tk solo se puede tocar desde su
+    propio hilo, así que los resultados vuelven por una cola que se vacía
+    con master.after() cada `intervalo_ms` mientras haya tareas en curso.
+
+    Un solo trabajador: las tareas se ejecutan en el orden en que se piden
+    y el gestor nunca se usa desde dos hilos a la vez.
+    """
+
+    def __init__(self, master, intervalo_ms=20, presupuesto_ms=8.0):
+        self.master = master
+        self.intervalo_ms = intervalo_ms
+        self.presupuesto = presupuesto_ms / 1000  # tiempo máximo por sondeo en el hilo de Tk
+        self._pendientes = queue.Queue()
+        self._resultados = queue.Queue()
+        self._en_curso = 0
+        self._siguiente_id = 0
+        self._sondeando = False
+        self._trabajador = threading.Thread(target=self._trabajar, name="gestor-trabajador", daemon=True)
+        self._trabajador.start()
+
+    @property
+    def ocupado(self):
+        return self._en_curso > 0
+
+    def ejecutar(self, funcion, *args, al_terminar=None, al_fallar=None, al_progresar=None):
+        """
+        Encola funcion(*args). En el hilo de Tk se llamará a al_terminar(resultado)
+        o a al_fallar(excepción); si se da al_progresar, la función recibe
+        progreso=callable(hechos, total) y al_progresar ve el último avance.
+        """
+        self._en_curso += 1
+        self._siguiente_id += 1
+        self._pendientes.put((self._siguiente_id, funcion, args, al_terminar, al_fallar, al_progresar))
+        if not self._sondeando:
+            self._sondeando = True
+            self.master.after(self.intervalo_ms, self._sondear)
+
+    def cerrar(self):
+        """Detiene el trabajador cuando acabe las tareas ya encoladas."""
+        self._pendientes.put(None)
+
+    def _trabajar(self):
+        while True:
+            tarea = self._pendientes.get()
+            if tarea is None:
+                return
+            id_tarea, funcion, args, al_terminar, al_fallar, al_progresar = tarea
+            try:
+                if al_progresar is not None:
+                    resultado = funcion(*args, progreso=lambda hechos, total: self._resultados.put(
+                        (id_tarea, "progreso", al_progresar, (hechos, total))))
+                else:
+                    resultado = funcion(*args)
+            except Exception as e:
+                self._resultados.put((id_tarea, "fin", al_fallar, (e,)))
+            else:
+                self._resultados.put((id_tarea, "fin", al_terminar, (resultado,)))
+
+    def _sondear(self):
+        limite = time.perf_counter() + self.presupuesto
+        avances = {}  # solo el último avance de cada tarea: no tiene sentido pintar los intermedios
+        while time.perf_counter() < limite:
+            try:
+                id_tarea, tipo, callback, args = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == "progreso":
+                avances[id_tarea] = (callback, args)
+                continue
+            # El último avance de la tarea se pinta antes de su final; los de las demás siguen
+            ultimo = avances.pop(id_tarea, None)
+            if ultimo is not None:
+                ultimo[0](*ultimo[1])
+            self._en_curso -= 1
+            if callback is not None:
+                callback(*args)
+        for callback, args in avances.values():
+            callback(*args)
+        if self._en_curso > 0 or not self._resultados.empty():
+            self.master.after(self.intervalo_ms, self._sondear)
+        else:
+            self._sondeando = False
+
+
+# Ventana con una lista larga paginada
+class VistaPaginada:
+    """
+    Muestra una lista que puede tener decenas de miles de filas en un
+    ttk.Treeview que solo contiene las filas visibles. La barra de
+    desplazamiento es virtual: al moverla se pide al gestor (en el hilo
+    trabajador) solo la página que toca. La búsqueda filtra por prefijo
+    mientras se escribe.
+
+    `contar(prefijo)` devuelve cuántas filas hay y `pagina(prefijo, inicio,
+    cantidad)` las filas de esa ventana (textos o tuplas, una por columna).
+    """
+
+    def __init__(self, master, tareas, titulo, columnas, contar, pagina, filas=20):
+        self.tareas = tareas
+        self._contar = contar
+        self._pagina = pagina
+        self.filas = filas
+        self.inicio = 0
+        self.total = 0
+        self._en_vuelo = False  # hay una página pedida al trabajador
+        self._repetir = False  # la vista cambió mientras tanto: pedir otra al terminar
+        self._espera = None
+
+        self.ventana = tk.Toplevel(master)
+        self.ventana.title(titulo)
+        self.ventana.configure(bg='lightblue')
+
+        buscador = tk.Frame(self.ventana, bg='lightblue')
+        buscador.pack(fill=tk.X, padx=10, pady=(10, 5))
+        tk.Label(buscador, text="Buscar usuario:", bg='lightblue').pack(side=tk.LEFT)
+        self.busqueda = tk.StringVar()
+        self.busqueda.trace_add("write", lambda *_: self._al_escribir())
+        entrada = tk.Entry(buscador, textvariable=self.busqueda)
+        entrada.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        entrada.focus_set()
+
+        marco = tk.Frame(self.ventana)
+        marco.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.tabla = ttk.Treeview(marco, columns=columnas, show="headings", height=filas, selectmode="browse")
+        for columna in columnas:
+            self.tabla.heading(columna, text=columna)
+            self.tabla.column(columna, width=180 if columna == columnas[0] else 420, anchor=tk.W)
+        self.barra = ttk.Scrollbar(marco, orient=tk.VERTICAL, command=self._desplazar)
+        self.tabla.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.barra.pack(side=tk.RIGHT, fill=tk.Y)
+        for evento in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tabla.bind(evento, self._rueda)
+
+        pie = tk.Frame(self.ventana, bg='lightblue')
+        pie.pack(fill=tk.X, padx=10, pady=(5, 10))
+        tk.Button(pie, text="< Anterior", command=lambda: self._desplazar("scroll", -1, "pages")).pack(side=tk.LEFT)
+        tk.Button(pie, text="Siguiente >", command=lambda: self._desplazar("scroll", 1, "pages")).pack(side=tk.RIGHT)
+        self.estado = tk.Label(pie, text="Cargando...", bg='lightblue')
+        self.estado.pack()
+
+        self._cargar()
+
+    def _al_escribir(self):
+        # Espera a que se deje de teclear un momento antes de pedir la página
+        if self._espera is not None:
+            self.ventana.after_cancel(self._espera)
+        self._espera = self.ventana.after(120, self._buscar)
+
+    def _buscar(self):
+        self._espera = None
+        self.inicio = 0
+        self._cargar()
+
+    def _rueda(self, evento):
+        if evento.num == 4 or evento.delta > 0:
+            self._desplazar("scroll", -3, "units")
+        else:
+            self._desplazar("scroll", 3, "units")
+        return "break"
+
+    def _desplazar(self, accion, cantidad, unidad=None):
+        if accion == "moveto":
+            self.inicio = int(float(cantidad) * self.total)
+        else:
+            self.inicio += int(cantidad) * (self.filas if unidad == "pages" else 1)
+        self.inicio = max(0, min(self.inicio, self.total - self.filas))
+        self._cargar()
+
+    def _cargar(self):
+        if self._en_vuelo:
+            self._repetir = True
+            return
+        self._en_vuelo = True
+        self.tareas.ejecutar(self._leer, self.busqueda.get(), self.inicio,
+                             al_terminar=self._mostrar, al_fallar=self._fallo)
+
+    def _leer(self, prefijo, inicio):
+        """Se ejecuta en el hilo trabajador: solo se materializan `filas` filas."""
+        total = self._contar(prefijo)
+        inicio = max(0, min(inicio, total - self.filas))
+        return inicio, total, self._pagina(prefijo, inicio, self.filas)
+
+    def _mostrar(self, resultado):
+        self._en_vuelo = False
+        if not self.ventana.winfo_exists():
+            return
+        if self._repetir:
+            self._repetir = False
+            self._cargar()  # esta página ya no es la que se está viendo
+            return
+        self.inicio, self.total, filas = resultado
+        self.tabla.delete(*self.tabla.get_children())
+        for fila in filas:
+            self.tabla.insert("", tk.END, values=fila if isinstance(fila, tuple) else (fila,))
+        if self.total:
+            self.barra.set(self.inicio / self.total, min(self.inicio + self.filas, self.total) / self.total)
+            self.estado.config(text=f"{self.inicio + 1}-{self.inicio + len(filas)} de {self.total}")
+        else:
+            self.barra.set(0, 1)
+            self.estado.config(text="Sin resultados")
+
+    def _fallo(self, error):
+        self._en_vuelo = False
+        if self.ventana.winfo_exists():
+            self.estado.config(text=f"Error: {error}")
+
 
 # Clase para la interfaz gráfica
 class PasswordManagerGUI:
     def __init__(self, master):
+        _cargar_tk()
         self.master = master
         self.master.title("Gestor de Contraseñas Seguras")
         self.master.geometry("600x400")
         self.master.configure(bg='lightblue')
 
         self.manager = PasswordManager()
+        self.tareas = TareasSegundoPlano(master)
+        self.master.protocol("WM_DELETE_WINDOW", self.cerrar)
 
         # Etiquetas y botones
         self.label = tk.Label(master, text="Gestor de Contraseñas", font=("Arial", 24), bg='lightblue')
@@ -68,41 +475,97 @@ class PasswordManagerGUI:
         self.view_button = tk.Button(master, text="Ver Usuarios Registrados", command=self.view_users, bg='lightblue')
         self.view_button.pack(pady=10)
 
+        # Indicador de trabajo en curso (oculto mientras no hay nada que esperar)
+        self.status = tk.Label(master, text="", bg='lightblue')
+        self.progress = ttk.Progressbar(master, length=300, mode="indeterminate")
+        self.botones = (self.register_button, self.check_button, self.alert_button, self.view_button)
+
+    def _ejecutar(self, texto, funcion, *args, al_terminar, determinado=False):
+        """Lanza funcion(*args) en segundo plano mostrando el indicador de progreso."""
+        for boton in self.botones:
+            boton.config(state=tk.DISABLED)
+        self.status.config(text=texto)
+        self.status.pack(pady=(10, 0))
+        self.progress.config(mode="determinate" if determinado else "indeterminate", value=0)
+        self.progress.pack(pady=5)
+        if not determinado:
+            self.progress.start(15)
+
+        def terminar(resultado):
+            self._listo()
+            al_terminar(resultado)
+
+        def fallar(error):
+            self._listo()
+            messagebox.showerror("Error", f"No se pudo completar la operación: {error}")
+
+        self.tareas.ejecutar(funcion, *args, al_terminar=terminar, al_fallar=fallar,
+                             al_progresar=self._progreso if determinado else None)
+
+    def _progreso(self, hechos, total):
+        self.progress.config(maximum=max(total, 1), value=hechos)
+        self.status.config(text=f"Revisando contraseñas... {hechos}/{total}")
+
+    def _listo(self):
+        self.progress.stop()
+        self.progress.pack_forget()
+        self.status.pack_forget()
+        for boton in self.botones:
+            boton.config(state=tk.NORMAL)
+
+    def cerrar(self):
+        """Cierra la ventana, el hilo trabajador y el almacén de usuarios."""
+        self.tareas.ejecutar(self.manager.close)
+        self.tareas.cerrar()
+        self.master.destroy()
+
     def register_user(self):
         """Solicita al usuario que ingrese un nombre de usuario y contraseña para registrarse."""
         username = simpledialog.askstring("Registrar Usuario", "Ingrese el nombre de usuario:")
         password = simpledialog.askstring("Registrar Contraseña", "Ingrese la contraseña:")
         if username and password:
-            if self.manager.register_user(username, password):
-                messagebox.showinfo("Éxito", "Usuario registrado exitosamente.")
-            else:
-                messagebox.showwarning("Error", "El usuario ya existe.")
+            self._ejecutar("Registrando usuario...", self.manager.register_user, username, password,
+                           al_terminar=self._registrado)
+
+    def _registrado(self, ok):
+        if ok:
+            messagebox.showinfo("Éxito", "Usuario registrado exitosamente.")
+        else:
+            messagebox.showwarning("Error", "El usuario ya existe.")
 
     def check_password(self):
         """Solicita al usuario que ingrese una contraseña para verificar su fuerza."""
         password = simpledialog.askstring("Verificar Contraseña", "Ingrese la contraseña a verificar:")
         if password:
-            strength = self.manager.check_password_strength(password)
-            messagebox.showinfo("Resultado de Verificación", strength)
+            self._ejecutar("Verificando contraseña...", self.manager.check_password_strength, password,
+                           al_terminar=lambda strength: messagebox.showinfo("Resultado de Verificación", strength))
 
     def generate_alerts(self):
         """Genera alertas para contraseñas débiles y las muestra."""
-        alerts = self.manager.generate_alerts()
-        if alerts:
-            messagebox.showwarning("Alertas de Contraseña", "\n".join(alerts))
+        self._ejecutar("Revisando contraseñas...", self.manager.revisar_alertas,
+                       al_terminar=self._mostrar_alertas, determinado=True)
+
+    def _mostrar_alertas(self, total):
+        if total:
+            VistaPaginada(self.master, self.tareas, f"Alertas de Contraseña ({total})", ("Usuario", "Alerta"),
+                          self.manager.contar_alertas, self.manager.alertas_pagina)
         else:
             messagebox.showinfo("Sin Alertas", "Todas las contraseñas son fuertes.")
 
     def view_users(self):
         """Muestra la lista de usuarios registrados."""
-        users = self.manager.get_users()
-        if users:
-            messagebox.showinfo("Usuarios Registrados", "\n".join(users))
+        self._ejecutar("Cargando usuarios...", self.manager.contar_usuarios, al_terminar=self._mostrar_usuarios)
+
+    def _mostrar_usuarios(self, total):
+        if total:
+            VistaPaginada(self.master, self.tareas, f"Usuarios Registrados ({total})", ("Usuario",),
+                          self.manager.contar_usuarios, self.manager.usuarios_pagina)
         else:
             messagebox.showinfo("Sin Usuarios", "No hay usuarios registrados.")
 
 # Ejecución de la aplicación
 if __name__ == "__main__":
+    _cargar_tk()
     root = tk.Tk()
     app = PasswordManagerGUI(root)
     root.mainloop()